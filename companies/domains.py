@@ -0,0 +1,85 @@
+"""
+Domain parsing shared by every path that stores or compares company domains.
+
+Suffix lookups use the public suffix snapshot bundled with tldextract, so
+nothing is downloaded at runtime, and results are memoized per hostname in
+bounded LRU caches.
+"""
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+import tldextract
+
+# Most hostnames to keep parsed results for
+DOMAIN_CACHE_SIZE = 10000
+
+# Never fetch the public suffix list, use the snapshot shipped with tldextract
+_extractor = tldextract.TLDExtract(suffix_list_urls=(), cache_dir=None)
+
+
+def hostname(url):
+    """
+    Return the lowercased hostname of a URL, without port or trailing dot.
+
+    Args:
+        url (str): A URL, with or without a scheme, or a bare hostname
+
+    Returns:
+        str: The hostname, or None if there isn't one
+    """
+    if not url:
+        return None
+
+    url = url.strip()
+    if '://' not in url:
+        url = f"//{url}"
+
+    try:
+        host = urlsplit(url).hostname
+    except ValueError:
+        return None
+    return host.rstrip('.') if host else None
+
+
+@lru_cache(maxsize=DOMAIN_CACHE_SIZE)
+def _registered_domain_for_host(host):
+    extracted = _extractor(host)
+    # IP addresses and hosts without a known suffix are their own domain
+    return extracted.registered_domain or host
+
+
+def registered_domain(url):
+    """
+    Return the registrable domain of a URL, e.g. 'example.co.uk' for
+    'https://shop.example.co.uk/contact'.
+
+    Args:
+        url (str): A URL or hostname
+
+    Returns:
+        str: The registered domain, or None if the URL has no hostname
+    """
+    host = hostname(url)
+    return _registered_domain_for_host(host) if host else None
+
+
+def normalize_domain(url):
+    """
+    Return the domain a Company is stored under: the lowercased hostname
+    without port or leading 'www.'.
+
+    Subdomains are kept, so businesses hosted on shared platforms
+    (e.g. name.wixsite.com) stay distinct.
+
+    Args:
+        url (str): A website URL or hostname
+
+    Returns:
+        str: The normalized domain, or None if the URL has no hostname
+    """
+    host = hostname(url)
+    if not host:
+        return None
+    if host.startswith('www.') and host.count('.') > 1:
+        host = host[4:]
+    return host
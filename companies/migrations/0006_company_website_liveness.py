@@ -0,0 +1,43 @@
+# Generated by Django 5.2 on 2026-10-18 18:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0005_alter_company_website_url'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='website_checked_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='company',
+            name='website_final_url',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='company',
+            name='website_probe_error',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='company',
+            name='website_reachable',
+            field=models.BooleanField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='company',
+            name='website_response_time',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='company',
+            name='website_status_code',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 19:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0006_company_website_liveness'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='website_probe_failures',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+from .domains import normalize_domain
+
 class CompanyList(models.Model):
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True, null=True)
@@ -15,6 +17,14 @@ class Company(models.Model):
     name = models.CharField(max_length=255)
     domain = models.CharField(max_length=255, unique=True)  # Unique identifier
     website_url = models.TextField(blank=True, null=True)
+    # Website liveness, recorded by WebsiteProbeService
+    website_reachable = models.BooleanField(blank=True, null=True)
+    website_final_url = models.TextField(blank=True, null=True)
+    website_status_code = models.IntegerField(blank=True, null=True)
+    website_response_time = models.FloatField(blank=True, null=True)  # Seconds
+    website_probe_error = models.CharField(max_length=255, blank=True, null=True)
+    website_checked_at = models.DateTimeField(blank=True, null=True)
+    website_probe_failures = models.PositiveIntegerField(default=0)  # Failed probes in a row
     phone = models.CharField(max_length=20, blank=True, null=True)
     city = models.CharField(max_length=100, blank=True, null=True)
     state = models.CharField(max_length=50, blank=True, null=True)
@@ -96,11 +106,13 @@ class Company(models.Model):
         ]
     
     def save(self, *args, **kwargs):
-        # If we have an address but no city/state, try to parse them
+        self.fill_city_and_state()
+        super().save(*args, **kwargs)
+    
+    def fill_city_and_state(self):
+        """Parse the city and state from the address if either is missing, as save() does"""
         if self.address and (not self.city or not self.state):
             self.parse_address()
-        
-        super().save(*args, **kwargs)
     
     def parse_address(self):
         """Extract city and state from address using the usaddress library"""
@@ -218,17 +230,4 @@ class Company(models.Model):
     @classmethod
     def extract_domain(cls, url):
         """Extract domain from a URL"""
-        import re
-        if not url:
-            return None
-        
-        # Remove protocol (http://, https://)
-        domain = re.sub(r'^https?://', '', url)
-        
-        # Remove www.
-        domain = re.sub(r'^www\.', '', domain)
-        
-        # Remove path (everything after first /)
-        domain = domain.split('/')[0]
-        
-        return domain
\ No newline at end of file
+        return normalize_domain(url)
\ No newline at end of file
@@ -1,3 +1,100 @@
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
 
-# Create your tests here.
+from companies.domains import hostname, normalize_domain, registered_domain
+from companies.models import Company, CompanyList
+from finder.services.bulk_ingest import bulk_upsert, link_related
+
+
+class DomainParsingTests(SimpleTestCase):
+    def test_hostname(self):
+        self.assertEqual(hostname("https://Shop.Example.com:8443/contact?x=1"), "shop.example.com")
+        self.assertEqual(hostname("example.com/about"), "example.com")
+        self.assertEqual(hostname("example.com."), "example.com")
+        self.assertIsNone(hostname(""))
+        self.assertIsNone(hostname("http://[invalid"))
+
+    def test_registered_domain_uses_the_public_suffix_list(self):
+        self.assertEqual(registered_domain("https://shop.example.co.uk/contact"), "example.co.uk")
+        self.assertEqual(registered_domain("www.example.com"), "example.com")
+        self.assertEqual(registered_domain("http://127.0.0.1:8000/"), "127.0.0.1")
+        self.assertEqual(registered_domain("http://intranet/"), "intranet")
+
+    def test_normalize_domain_keeps_subdomains_but_not_www(self):
+        self.assertEqual(normalize_domain("https://www.Example.com/"), "example.com")
+        self.assertEqual(normalize_domain("https://acme.wixsite.com/home"), "acme.wixsite.com")
+        self.assertEqual(normalize_domain("www.com"), "www.com")
+        self.assertIsNone(normalize_domain(None))
+
+
+class CompanyBulkUpsertTests(TestCase):
+    def upsert(self, records):
+        def build(domain, data):
+            return Company(name=data['name'], domain=domain, phone=data.get('phone'))
+
+        def merge(company, data):
+            # Fill missing details only, like the provider services
+            if not company.phone and data.get('phone'):
+                company.phone = data['phone']
+                return True
+            return False
+
+        return bulk_upsert(Company, 'domain', records, build=build, merge=merge, merge_fields=['phone'])
+
+    def test_creates_merges_and_returns_one_instance_per_record(self):
+        existing = Company.objects.create(name="Old", domain="old.test")
+        records = [
+            ("new.test", {'name': "New"}),
+            ("old.test", {'name': "Renamed", 'phone': "555-0100"}),
+            ("new.test", {'name': "New again", 'phone': "555-0199"}),
+        ]
+        companies = self.upsert(records)
+
+        self.assertEqual([company.domain for company in companies], ["new.test", "old.test", "new.test"])
+        self.assertIs(companies[0], companies[2])
+        self.assertEqual(companies[1].pk, existing.pk)
+        self.assertTrue(all(company.pk for company in companies))
+
+        existing.refresh_from_db()
+        self.assertEqual((existing.name, existing.phone), ("Old", "555-0100"))
+        # Later records for a new key are merged into the instance the first one built
+        self.assertEqual(Company.objects.get(domain="new.test").phone, "555-0199")
+
+    def test_a_batch_takes_a_fixed_number_of_queries(self):
+        Company.objects.bulk_create([Company(name=f"C{i}", domain=f"c{i}.test") for i in range(10)])
+        records = [(f"c{i}.test", {'name': f"C{i}", 'phone': "555-0100"}) for i in range(20)]
+        # Savepoint, lookup, insert, update and release, however many rows
+        # (as long as the INSERT fits the backend's parameter limit)
+        with self.assertNumQueries(5):
+            self.upsert(records)
+        self.assertEqual(Company.objects.filter(phone="555-0100").count(), 20)
+
+    def test_empty_batch(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.upsert([]), [])
+
+
+class CompanyListLinkTests(TestCase):
+    def setUp(self):
+        self.companies = Company.objects.bulk_create([Company(name=f"C{i}", domain=f"c{i}.test") for i in range(5)])
+        self.company_list = CompanyList.objects.create(name="Prospects")
+
+    def test_queryset_is_linked_in_one_statement(self):
+        with self.assertNumQueries(1):
+            added = link_related(self.company_list.companies, Company.objects.filter(domain__in=["c0.test", "c1.test"]))
+        self.assertEqual(added, 2)
+        self.assertEqual(sorted(self.company_list.companies.values_list('domain', flat=True)), ["c0.test", "c1.test"])
+
+    def test_existing_links_are_skipped(self):
+        self.company_list.companies.add(self.companies[0])
+        self.assertEqual(link_related(self.company_list.companies, Company.objects.all()), 4)
+        self.assertEqual(link_related(self.company_list.companies, Company.objects.all()), 0)
+        self.assertEqual(self.company_list.companies.count(), 5)
+
+    def test_instances_and_primary_keys(self):
+        self.assertEqual(link_related(self.company_list.companies, [self.companies[0], self.companies[1].pk]), 2)
+        self.assertEqual(link_related(self.company_list.companies, []), 0)
+
+    def test_forward_relation(self):
+        other_list = CompanyList.objects.create(name="Other")
+        self.assertEqual(link_related(self.companies[0].company_lists, [self.company_list, other_list]), 2)
+        self.assertEqual(self.company_list.companies.get(), self.companies[0])
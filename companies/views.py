@@ -12,6 +12,7 @@ from finder.models import CompanySearch
 from contacts.models import Contact
 from deals.models import Deal
 from finder.models import ContactSearch
+from finder.services.bulk_ingest import link_related
 
 def home(request):
     """
@@ -162,8 +163,7 @@ def company_list_add_companies(request, list_id):
         form = CompanyListAddForm(request.POST)
         if form.is_valid():
             companies = form.cleaned_data['companies']
-            for company in companies:
-                company_list.companies.add(company)
+            link_related(company_list.companies, companies)
             
             company_list.save()
             messages.success(request, f"{len(companies)} companies added to '{company_list.name}'!")
@@ -186,15 +186,8 @@ def company_list_add_search_results(request, list_id, search_id):
     company_list = get_object_or_404(CompanyList, id=list_id)
     search = get_object_or_404(CompanySearch, id=search_id)
     
-    # Get companies from the search
-    search_companies = search.companies.all()
-    added_count = 0
-    
-    # Add each company to the list if not already present
-    for company in search_companies:
-        if company not in company_list.companies.all():
-            company_list.companies.add(company)
-            added_count += 1
+    # Add the search's companies to the list if not already present
+    added_count = link_related(company_list.companies, search.companies.all())
     
     messages.success(request, f"Added {added_count} companies from search #{search.id} to '{company_list.name}'!")
     return redirect('company_list_detail', list_id=company_list.id)
@@ -267,11 +260,7 @@ def company_list_add_from_filter(request):
             companies_to_add = companies
         
         # Add companies to the list
-        added_count = 0
-        for company in companies_to_add:
-            if company not in company_list.companies.all():
-                company_list.companies.add(company)
-                added_count += 1
+        added_count = link_related(company_list.companies, companies_to_add)
         
         if added_count > 0:
             messages.success(
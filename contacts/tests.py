@@ -1,3 +1,68 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
-# Create your tests here.
+from companies.models import Company
+from contacts.models import Contact, ContactList
+from finder.models import ContactSearch
+from finder.services.bulk_ingest import link_related
+from finder.services.hunter_service import HunterService
+from finder.services.webscrape_service import WebScrapeService
+
+
+@override_settings(HUNTER_API_KEY='test-key')
+class ContactIngestTests(TestCase):
+    def setUp(self):
+        self.company = Company.objects.create(name="Acme", domain="acme.test")
+
+    def hunter_results(self, *emails):
+        return {'data': {'emails': list(emails)}}
+
+    def test_hunter_results_fill_missing_details_and_refresh_hunter_fields(self):
+        Contact.objects.create(email="jane@acme.test", first_name="Janet", hunter_confidence=50)
+        contacts = HunterService().create_contacts_from_results(self.hunter_results(
+            {'value': "jane@acme.test", 'first_name': "Jane", 'position': "CEO", 'confidence': 95},
+            {'value': "john@acme.test", 'first_name': "John", 'confidence': 80},
+            {'value': None},
+        ), self.company)
+
+        self.assertEqual([contact.email for contact in contacts], ["jane@acme.test", "john@acme.test"])
+        jane = Contact.objects.get(email="jane@acme.test")
+        self.assertEqual((jane.first_name, jane.position, jane.hunter_confidence), ("Janet", "CEO", 95))
+        self.assertEqual(jane.company_id, self.company.pk)
+        john = Contact.objects.get(email="john@acme.test")
+        self.assertEqual((john.source_channel, john.company_id), (Contact.SourceChannel.HUNTER, self.company.pk))
+
+    def test_scraped_contacts_keep_their_company(self):
+        other = Company.objects.create(name="Other", domain="other.test")
+        Contact.objects.create(email="sales@acme.test", company=other)
+        Contact.objects.create(email="info@acme.test")
+        scraper = WebScrapeService({'target_url': "https://acme.test/"})
+        contacts = scraper.create_contacts_from_results(self.company, {
+            'emails': {
+                email: {'email': email, 'source_url': "https://acme.test/contact"}
+                for email in ("sales@acme.test", "info@acme.test", "jane.doe@acme.test")
+            },
+            'phones': [],
+        })
+
+        self.assertEqual(len(contacts), 3)
+        companies = dict(Contact.objects.values_list('email', 'company_id'))
+        self.assertEqual(companies, {
+            "sales@acme.test": other.pk,
+            "info@acme.test": self.company.pk,
+            "jane.doe@acme.test": self.company.pk,
+        })
+        self.assertEqual(Contact.objects.get(email="jane.doe@acme.test").first_name, "Jane")
+
+
+class ContactLinkTests(TestCase):
+    def test_search_results_are_added_to_a_list_once(self):
+        contacts = Contact.objects.bulk_create([Contact(email=f"person{i}@acme.test") for i in range(3)])
+        contact_search = ContactSearch.objects.create(method=ContactSearch.ContactSearchMethods.SCRAPE)
+        self.assertEqual(link_related(contact_search.contacts, contacts), 3)
+
+        contact_list = ContactList.objects.create(name="Outreach")
+        contact_list.contacts.add(contacts[0])
+        with self.assertNumQueries(1):
+            added = link_related(contact_list.contacts, contact_search.contacts.all())
+        self.assertEqual(added, 2)
+        self.assertEqual(contact_list.contacts.count(), 3)
@@ -8,6 +8,7 @@ import csv
 from .models import Contact, ContactList, Cohort
 from .forms import ContactForm, ContactListForm, ContactFilterForm, ContactListAddForm, CohortForm
 from finder.models import ContactSearch
+from finder.services.bulk_ingest import link_related
 
 def contact_list_list(request):
     """View for listing all contact lists"""
@@ -122,8 +123,7 @@ def contact_list_add_contacts(request, list_id):
         form = ContactListAddForm(request.POST)
         if form.is_valid():
             contacts = form.cleaned_data['contacts']
-            for contact in contacts:
-                contact_list.contacts.add(contact)
+            link_related(contact_list.contacts, contacts)
             
             contact_list.save()
             messages.success(request, f"{len(contacts)} contacts added to '{contact_list.name}'!")
@@ -146,15 +146,8 @@ def contact_list_add_search_results(request, list_id, search_id):
     contact_list = get_object_or_404(ContactList, id=list_id)
     search = get_object_or_404(ContactSearch, id=search_id)
     
-    # Get contacts from the search
-    search_contacts = search.contacts.all()
-    added_count = 0
-    
-    # Add each contact to the list if not already present
-    for contact in search_contacts:
-        if contact not in contact_list.contacts.all():
-            contact_list.contacts.add(contact)
-            added_count += 1
+    # Add the search's contacts to the list if not already present
+    added_count = link_related(contact_list.contacts, search.contacts.all())
     
     messages.success(request, f"Added {added_count} contacts from search #{search.id} to '{contact_list.name}'!")
     return redirect('contact_list_detail', list_id=contact_list.id)
@@ -228,11 +221,7 @@ def contact_list_add_from_filter(request):
             contacts_to_add = contacts
         
         # Add contacts to the list
-        added_count = 0
-        for contact in contacts_to_add:
-            if contact not in contact_list.contacts.all():
-                contact_list.contacts.add(contact)
-                added_count += 1
+        added_count = link_related(contact_list.contacts, contacts_to_add)
         
         if added_count > 0:
             messages.success(
@@ -33,6 +33,12 @@ class SerpAPISearchForm(forms.Form):
         help_text="Maximum number of results to return (1-100)"
     )
     
+    no_cache = forms.BooleanField(
+        label="Skip Cache",
+        required=False,
+        help_text="Run the search again even if an identical one was run recently (uses credits)"
+    )
+    
     def clean(self):
         cleaned_data = super().clean()
         source_type = cleaned_data.get('source_type')
@@ -208,7 +214,47 @@ class WebScrapeForm(forms.Form):
         max_value=20,
         initial=5,
         widget=forms.NumberInput(attrs={'class': 'input form-control'}),
-        help_text="Number of concurrent requests"
+        help_text="Maximum concurrent requests per website"
+    )
+    
+    global_concurrent_requests = forms.IntegerField(
+        label="Total Concurrent Requests",
+        min_value=1,
+        max_value=500,
+        initial=100,
+        widget=forms.NumberInput(attrs={'class': 'input form-control'}),
+        help_text="Concurrent requests across all websites (async engine only)"
+    )
+    
+    list_page_budget = forms.IntegerField(
+        label="List Page Budget",
+        required=False,
+        min_value=1,
+        widget=forms.NumberInput(attrs={'class': 'input form-control'}),
+        help_text="Total pages to crawl across a company list (leave empty for no limit)"
+    )
+    
+    recrawl_after_days = forms.IntegerField(
+        label="Reuse Crawls Younger Than (days)",
+        required=False,
+        min_value=0,
+        max_value=365,
+        widget=forms.NumberInput(attrs={'class': 'input form-control'}),
+        help_text="Reuse a website's last crawl instead of crawling it again if it is this recent (0 always crawls again, leave empty to reuse crawls from the last day)"
+    )
+    
+    force_refresh = forms.BooleanField(
+        label="Force Refresh",
+        required=False,
+        initial=False,
+        help_text="Crawl every website from scratch instead of reusing recent crawls"
+    )
+    
+    crawl_engine = forms.ChoiceField(
+        label="Crawl Engine",
+        choices=WebScrapeParameters.CrawlEngine.choices,
+        initial=WebScrapeParameters.CrawlEngine.THREADED,
+        help_text="The async engine is faster for large company lists"
     )
     
     def clean(self):
@@ -379,6 +425,32 @@ class HunterDomainSearchForm(forms.Form):
         help_text="Maximum number of results to return per domain (1-100)"
     )
     
+    paginate = forms.BooleanField(
+        label="Fetch All Pages",
+        required=False,
+        help_text="Keep requesting pages of results until the domain has no more, or a cap below is reached"
+    )
+    
+    max_results = forms.IntegerField(
+        label="Max Results Per Domain",
+        min_value=1,
+        required=False,
+        help_text="Stop paginating a domain after this many email addresses"
+    )
+    
+    max_credits = forms.IntegerField(
+        label="Max Credits Per Domain",
+        min_value=1,
+        required=False,
+        help_text="Stop paginating a domain after this many requests (each costs up to one credit)"
+    )
+    
+    no_cache = forms.BooleanField(
+        label="Skip Cache",
+        required=False,
+        help_text="Search again even if identical searches were run recently (uses credits)"
+    )
+    
     def clean(self):
         cleaned_data = super().clean()
         source_type = cleaned_data.get('source_type')
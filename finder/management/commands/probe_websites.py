@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from finder.tasks import probe_company_websites
+
+
+class Command(BaseCommand):
+    help = "Check which company websites resolve and respond, so web scrapes skip dead ones"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--list', type=int, dest='company_list_id', help="Only probe companies in this company list")
+        parser.add_argument('--unchecked', action='store_true', help="Only probe websites that were never checked")
+        parser.add_argument('--concurrency', type=int, default=200, help="Most websites probed at once")
+        parser.add_argument('--timeout', type=float, default=10.0, help="Seconds allowed for each DNS lookup and request")
+
+    def handle(self, *args, **options):
+        summary = probe_company_websites.call_local(
+            company_list_id=options['company_list_id'],
+            unchecked_only=options['unchecked'],
+            concurrency=options['concurrency'],
+            timeout=options['timeout'],
+        )
+        self.stdout.write(self.style.SUCCESS(summary))
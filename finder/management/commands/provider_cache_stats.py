@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from finder.services.provider_cache import ProviderCache
+
+# Providers whose responses are cached, with their TTL settings
+PROVIDERS = {
+    'serpapi': 'SERPAPI_CACHE_TTL',
+    'hunter': 'HUNTER_CACHE_TTL',
+}
+
+
+class Command(BaseCommand):
+    help = "Show hit and miss counts of the SerpAPI and Hunter response caches"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help="Reset the counts after showing them")
+
+    def handle(self, *args, **options):
+        for provider, ttl_setting in PROVIDERS.items():
+            response_cache = ProviderCache(provider, getattr(settings, ttl_setting))
+            stats = response_cache.stats()
+            lookups = stats['hits'] + stats['misses']
+            hit_rate = f"{stats['hits'] / lookups:.0%}" if lookups else "n/a"
+            self.stdout.write(
+                f"{provider}: {stats['hits']} hits, {stats['misses']} misses, hit rate {hit_rate}, "
+                f"TTL {response_cache.ttl}s"
+            )
+            if options['reset']:
+                response_cache.reset_stats()
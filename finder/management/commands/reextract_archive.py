@@ -0,0 +1,99 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from companies.domains import normalize_domain
+from companies.models import Company
+from finder.models import WebScrapeParameters
+from finder.services import WebScrapeService
+from finder.services.bulk_ingest import link_related
+from finder.services.page_archive import read_archive
+
+
+class Command(BaseCommand):
+    help = "Re-run contact extraction over archived pages, without fetching anything"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--archive',
+            default=str(settings.PAGE_ARCHIVE_DIR),
+            help="Page archive directory (defaults to PAGE_ARCHIVE_DIR)",
+        )
+        parser.add_argument(
+            '--search',
+            type=int,
+            help="ID of the contact search whose web scrape parameters to extract with (scraper defaults otherwise)",
+        )
+        parser.add_argument('--site', help="Only re-extract pages crawled for this target URL")
+        parser.add_argument('--output', help="Write the extracted emails and phones per site to this JSON file")
+        parser.add_argument(
+            '--save',
+            action='store_true',
+            help="Create contacts for the company matching each site's domain, and add them to --search if given",
+        )
+
+    def handle(self, *args, **options):
+        config = {}
+        contact_search = None
+        if options['search']:
+            try:
+                search_params = WebScrapeParameters.objects.select_related('contact_search').get(
+                    contact_search_id=options['search']
+                )
+            except WebScrapeParameters.DoesNotExist:
+                raise CommandError(f"Contact search {options['search']} has no web scrape parameters")
+            config = search_params.configuration
+            contact_search = search_params.contact_search
+
+        # Nothing is fetched, so crawl-only settings don't apply
+        config.update(archive_pages=False, parse_processes=0, stop_after_unproductive_pages=0)
+
+        started = time.monotonic()
+        scrapers = {}  # target URL -> scraper holding that site's results
+        page_count = 0
+
+        for page in read_archive(options['archive'], target_url=options['site']):
+            target_url = page.target_url or page.url
+            scraper = scrapers.get(target_url)
+            if scraper is None:
+                scraper = scrapers[target_url] = WebScrapeService({**config, 'target_url': target_url})
+
+            # Extract at the depth limit, so links are never followed
+            encoding = scraper._declared_charset(page.header('Content-Type', ''))
+            scraper._process_html(page.url, page.content, scraper.max_depth, encoding)
+            page_count += 1
+
+        email_count = sum(len(scraper.results['emails']) for scraper in scrapers.values())
+        self.stdout.write(
+            f"Re-extracted {page_count} pages from {len(scrapers)} sites in {time.monotonic() - started:.1f}s, "
+            f"found {email_count} email addresses"
+        )
+
+        if options['output']:
+            output = {
+                target_url: {
+                    'emails': list(scraper.results['emails'].values()),
+                    'phones': sorted(scraper.results['phones']),
+                }
+                for target_url, scraper in scrapers.items()
+            }
+            with open(options['output'], 'w', encoding='utf-8') as output_file:
+                json.dump(output, output_file, indent=2)
+            self.stdout.write(f"Wrote results to {options['output']}")
+
+        if options['save']:
+            contact_count = 0
+            for target_url, scraper in scrapers.items():
+                company = Company.objects.filter(domain=normalize_domain(target_url)).first()
+                if company is None:
+                    self.stderr.write(f"No company with the domain of {target_url}, skipping")
+                    continue
+
+                contacts = scraper.create_contacts_from_results(company)
+                if contact_search is not None:
+                    link_related(contact_search.contacts, contacts)
+                contact_count += len(contacts)
+
+            self.stdout.write(self.style.SUCCESS(f"Saved {contact_count} contacts"))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 18:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finder', '0005_alter_contactsearch_method'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='webscrapeparameters',
+            name='crawl_engine',
+            field=models.CharField(choices=[('threaded', 'Threaded'), ('async', 'Async (event loop)')], default='threaded', help_text='Crawl engine to use (the async engine keeps many requests in flight without a thread per request)', max_length=10),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-18 18:29
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finder', '0006_webscrapeparameters_crawl_engine'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='webscrapeparameters',
+            name='global_concurrent_requests',
+            field=models.IntegerField(default=100, help_text='Total concurrent requests across all websites when using the async engine', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(500)]),
+        ),
+    ]
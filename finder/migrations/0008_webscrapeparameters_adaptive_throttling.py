@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-18 18:30
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finder', '0007_webscrapeparameters_global_concurrent_requests'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='webscrapeparameters',
+            name='adaptive_throttling',
+            field=models.BooleanField(default=True, help_text='Adjust per-website concurrency and delay based on response times and 429/503 responses'),
+        ),
+        migrations.AlterField(
+            model_name='webscrapeparameters',
+            name='concurrent_requests',
+            field=models.IntegerField(default=5, help_text='Maximum concurrent requests per website (the crawler adapts below this limit)', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(20)]),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 18:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finder', '0008_webscrapeparameters_adaptive_throttling'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='webscrapeparameters',
+            name='use_sitemaps',
+            field=models.BooleanField(default=True, help_text='Seed the crawl with contact, about and team pages from sitemaps listed in robots.txt'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 18:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finder', '0009_webscrapeparameters_use_sitemaps'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='webscrapeparameters',
+            name='html_parser',
+            field=models.CharField(choices=[('html.parser', 'Python (html.parser)'), ('lxml', 'lxml'), ('html5lib', 'html5lib')], default='html.parser', help_text='HTML parser to build pages with (falls back to html.parser if not installed)', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='webscrapeparameters',
+            name='link_extraction',
+            field=models.CharField(choices=[('scan', 'Fast scan'), ('strainer', 'Parse links only')], default='scan', help_text='Scan raw HTML for links, or parse only <a href> elements with the HTML parser', max_length=10),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-18 18:38
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finder', '0010_webscrapeparameters_html_parser'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='webscrapeparameters',
+            name='max_page_bytes',
+            field=models.PositiveIntegerField(default=2097152, help_text='Stop downloading a page after this many bytes; non-HTML responses are never downloaded', validators=[django.core.validators.MinValueValidator(65536), django.core.validators.MaxValueValidator(52428800)]),
+        ),
+    ]
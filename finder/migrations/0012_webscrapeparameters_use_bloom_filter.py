@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finder', '0011_webscrapeparameters_max_page_bytes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='webscrapeparameters',
+            name='use_bloom_filter',
+            field=models.BooleanField(default=False, help_text='Track discovered links in a fixed-size Bloom filter (saves memory on very large crawls, may rarely skip a page)'),
+        ),
+    ]
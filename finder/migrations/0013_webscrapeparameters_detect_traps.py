@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 18:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finder', '0012_webscrapeparameters_use_bloom_filter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='webscrapeparameters',
+            name='detect_traps',
+            field=models.BooleanField(default=True, help_text='Throttle URL patterns that keep generating new pages (calendars, filters, session IDs) and skip near-duplicate pages'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-18 18:43
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finder', '0013_webscrapeparameters_detect_traps'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='webscrapeparameters',
+            name='list_page_budget',
+            field=models.IntegerField(blank=True, help_text="Total pages to crawl across all websites of a company list; pages beyond each site's share go to sites still finding contacts", null=True, validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+        migrations.AddField(
+            model_name='webscrapeparameters',
+            name='stop_after_unproductive_pages',
+            field=models.IntegerField(default=20, help_text='Stop crawling a website after this many pages in a row without a new contact (0 to disable)', validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(1000)]),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-18 18:45
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finder', '0014_webscrapeparameters_crawl_budget'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='webscrapeparameters',
+            name='parse_processes',
+            field=models.IntegerField(default=0, help_text='Worker processes to parse pages in, so parsing scales with CPU cores (0 parses in the fetch workers)', validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(64)]),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 18:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finder', '0015_webscrapeparameters_parse_processes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='webscrapeparameters',
+            name='archive_pages',
+            field=models.BooleanField(default=False, help_text='Keep a compressed copy of every fetched page on disk, so contacts can be re-extracted without re-crawling'),
+        ),
+    ]
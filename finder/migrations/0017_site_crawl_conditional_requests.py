@@ -0,0 +1,38 @@
+# Generated by Django 5.2 on 2026-10-18 18:50
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finder', '0016_webscrapeparameters_archive_pages'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SiteCrawl',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('domain', models.CharField(max_length=255, unique=True)),
+                ('crawled_at', models.DateTimeField()),
+                ('results', models.JSONField(default=dict)),
+                ('pages', models.JSONField(default=dict)),
+            ],
+            options={
+                'verbose_name': 'Site Crawl',
+                'verbose_name_plural': 'Site Crawls',
+            },
+        ),
+        migrations.AddField(
+            model_name='webscrapeparameters',
+            name='conditional_requests',
+            field=models.BooleanField(default=True, help_text="Re-validate pages from each website's last crawl with ETag/Last-Modified and reuse the contacts of unchanged pages"),
+        ),
+        migrations.AddField(
+            model_name='webscrapeparameters',
+            name='recrawl_after_days',
+            field=models.IntegerField(default=0, help_text="Reuse a website's last crawl result instead of crawling it again if it is younger than this many days (0 always crawls)", validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(365)]),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2 on 2026-10-18 18:53
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0006_remove_cohort_contacts_contact_cohort'),
+        ('finder', '0017_site_crawl_conditional_requests'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sitecrawl',
+            name='config_key',
+            field=models.CharField(default='', max_length=64),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='sitecrawl',
+            name='contacts',
+            field=models.ManyToManyField(blank=True, related_name='site_crawls', to='contacts.contact'),
+        ),
+        migrations.AddField(
+            model_name='webscrapeparameters',
+            name='force_refresh',
+            field=models.BooleanField(default=False, help_text='Crawl every website from scratch, ignoring cached crawls from this or other searches'),
+        ),
+        migrations.AlterField(
+            model_name='sitecrawl',
+            name='domain',
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='webscrapeparameters',
+            name='recrawl_after_days',
+            field=models.IntegerField(default=0, help_text="Reuse a website's last crawl result instead of crawling it again if it is younger than this many days (0 only reuses crawls within SITE_CRAWL_CACHE_TTL)", validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(365)]),
+        ),
+        migrations.AddConstraint(
+            model_name='sitecrawl',
+            constraint=models.UniqueConstraint(fields=('domain', 'config_key'), name='unique_site_crawl_per_config'),
+        ),
+    ]
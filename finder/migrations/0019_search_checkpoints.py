@@ -0,0 +1,59 @@
+# Generated by Django 5.2 on 2026-10-18 18:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0006_company_website_liveness'),
+        ('finder', '0018_site_crawl_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contactsearch',
+            name='companies_done',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='contactsearch',
+            name='companies_total',
+            field=models.IntegerField(default=0),
+        ),
+        # Searches run before progress was tracked have finished
+        migrations.AddField(
+            model_name='contactsearch',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='completed', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='contactsearch',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='contactsearch',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.CreateModel(
+            name='SearchCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('fetched', 'Fetched'), ('done', 'Done'), ('failed', 'Failed')], max_length=10)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('contacts_found', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_checkpoints', to='companies.company')),
+                ('contact_search', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkpoints', to='finder.contactsearch')),
+            ],
+            options={
+                'verbose_name': 'Search Checkpoint',
+                'verbose_name_plural': 'Search Checkpoints',
+                'constraints': [models.UniqueConstraint(fields=('contact_search', 'company'), name='unique_checkpoint_per_company')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-18 19:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finder', '0019_search_checkpoints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hunterdomainsearchparameters',
+            name='max_credits',
+            field=models.IntegerField(blank=True, help_text='Most requests, each costing up to one credit, per domain when paginating', null=True),
+        ),
+        migrations.AddField(
+            model_name='hunterdomainsearchparameters',
+            name='max_results',
+            field=models.IntegerField(blank=True, help_text='Most email addresses to fetch per domain when paginating', null=True),
+        ),
+        migrations.AddField(
+            model_name='hunterdomainsearchparameters',
+            name='paginate',
+            field=models.BooleanField(default=False, help_text='Follow result pages of limit addresses each, up to the caps below'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 19:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finder', '0020_hunter_pagination'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hunterdomainsearchparameters',
+            name='no_cache',
+            field=models.BooleanField(default=False, help_text='Force a fresh search instead of using cached results'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 19:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finder', '0021_hunter_no_cache'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='webscrapeparameters',
+            name='detect_traps',
+            field=models.BooleanField(default=False, help_text="Throttle URL patterns that keep generating new pages (calendars, filters, session IDs) and don't follow links from near-duplicate pages"),
+        ),
+    ]
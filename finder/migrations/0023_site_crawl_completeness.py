@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 19:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finder', '0022_detect_traps_off_by_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sitecrawl',
+            name='complete',
+            field=models.BooleanField(default=False, help_text="The crawl wasn't cut short, so its results can be reused"),
+        ),
+        migrations.AddField(
+            model_name='sitecrawl',
+            name='stop_reason',
+            field=models.CharField(blank=True, default='', max_length=20),
+        ),
+    ]
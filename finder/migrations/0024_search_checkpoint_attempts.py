@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 19:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finder', '0023_site_crawl_completeness'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='searchcheckpoint',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-18 19:52
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finder', '0024_search_checkpoint_attempts'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='webscrapeparameters',
+            name='recrawl_after_days',
+            field=models.IntegerField(blank=True, help_text="Reuse a website's last crawl result instead of crawling it again if it is younger than this many days (0 always crawls again, empty reuses crawls within SITE_CRAWL_CACHE_TTL)", null=True, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(365)]),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 class Search(models.Model):
@@ -11,8 +12,20 @@ class ContactSearch(Search):
         HUNTER = 'hunter', 'Hunter'
         SCRAPE = 'scrape', 'Web Scrape'
 
+    class SearchStatus(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        RUNNING = 'running', 'Running'
+        COMPLETED = 'completed', 'Completed'
+        FAILED = 'failed', 'Failed'
+
     method = models.CharField(max_length=10, choices=ContactSearchMethods.choices, default=ContactSearchMethods.HUNTER)
     contacts = models.ManyToManyField('contacts.Contact', blank=True, related_name='contact_searches')
+    status = models.CharField(max_length=20, choices=SearchStatus.choices, default=SearchStatus.PENDING)
+
+    # Progress over the companies searched, see SearchCheckpoint
+    companies_total = models.IntegerField(default=0)
+    companies_done = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Contact Search"
@@ -21,6 +34,32 @@ class ContactSearch(Search):
     def __str__(self):
         return f"{self.get_method_display()} Search - {self.created_at.strftime('%Y-%m-%d %H:%M:%S')}"
 
+    @property
+    def progress_percentage(self):
+        """Return the share of companies searched as a percentage"""
+        if not self.companies_total:
+            return 100 if self.status == self.SearchStatus.COMPLETED else 0
+        return min(100, int(self.companies_done / self.companies_total * 100))
+
+    def start_progress(self, companies_total):
+        """Mark the search as running over companies_total companies"""
+        self.status = self.SearchStatus.RUNNING
+        self.companies_total = companies_total
+        self.save(update_fields=['status', 'companies_total', 'updated_at'])
+        self.update_progress()
+
+    def update_progress(self):
+        """Recount the companies finished and contacts found so far"""
+        self.companies_done = SearchCheckpoint.finished(self).count()
+        self.results_count = self.contacts.count()
+        self.save(update_fields=['companies_done', 'results_count', 'updated_at'])
+
+    def finish_progress(self, status=SearchStatus.COMPLETED):
+        """Record the final counts and status"""
+        self.status = status
+        self.save(update_fields=['status', 'updated_at'])
+        self.update_progress()
+
 class CompanySearch(Search):
     class CompanySearchMethods(models.TextChoices):
         SERPAPI = 'serpapi', 'SerpAPI'
@@ -324,6 +363,15 @@ class HunterDomainSearchParameters(models.Model):
     # Pagination parameters
     limit = models.IntegerField(default=10, help_text="Maximum number of email addresses to return")
     offset = models.IntegerField(default=0, help_text="Number of email addresses to skip")
+    paginate = models.BooleanField(default=False,
+                                   help_text="Follow result pages of limit addresses each, up to the caps below")
+    max_results = models.IntegerField(null=True, blank=True,
+                                      help_text="Most email addresses to fetch per domain when paginating")
+    max_credits = models.IntegerField(null=True, blank=True,
+                                      help_text="Most requests, each costing up to one credit, per domain when paginating")
+    
+    # Additional search options
+    no_cache = models.BooleanField(default=False, help_text="Force a fresh search instead of using cached results")
     
     class Meta:
         verbose_name = "Hunter Domain Search Parameters"
@@ -389,6 +437,22 @@ class HunterDomainSearchParameters(models.Model):
         return params
 
 class WebScrapeParameters(models.Model):
+    # Crawl engine choices
+    class CrawlEngine(models.TextChoices):
+        THREADED = 'threaded', 'Threaded'
+        ASYNC = 'async', 'Async (event loop)'
+    
+    # HTML parser backend choices
+    class HTMLParser(models.TextChoices):
+        HTML_PARSER = 'html.parser', 'Python (html.parser)'
+        LXML = 'lxml', 'lxml'
+        HTML5LIB = 'html5lib', 'html5lib'
+    
+    # How links are found on pages crawled only to discover more links
+    class LinkExtraction(models.TextChoices):
+        SCAN = 'scan', 'Fast scan'
+        STRAINER = 'strainer', 'Parse links only'
+    
     # Link to the parent ContactSearch
     contact_search = models.OneToOneField('ContactSearch', on_delete=models.CASCADE, related_name='webscrape_parameters')
     
@@ -468,7 +532,38 @@ class WebScrapeParameters(models.Model):
     concurrent_requests = models.IntegerField(
         default=5,
         validators=[MinValueValidator(1), MaxValueValidator(20)],
-        help_text="Number of concurrent requests"
+        help_text="Maximum concurrent requests per website (the crawler adapts below this limit)"
+    )
+    
+    adaptive_throttling = models.BooleanField(
+        default=True,
+        help_text="Adjust per-website concurrency and delay based on response times and 429/503 responses"
+    )
+    
+    global_concurrent_requests = models.IntegerField(
+        default=100,
+        validators=[MinValueValidator(1), MaxValueValidator(500)],
+        help_text="Total concurrent requests across all websites when using the async engine"
+    )
+    
+    # Crawl budget
+    stop_after_unproductive_pages = models.IntegerField(
+        default=20,
+        validators=[MinValueValidator(0), MaxValueValidator(1000)],
+        help_text="Stop crawling a website after this many pages in a row without a new contact (0 to disable)"
+    )
+    
+    list_page_budget = models.IntegerField(
+        blank=True,
+        null=True,
+        validators=[MinValueValidator(1)],
+        help_text="Total pages to crawl across all websites of a company list; pages beyond each site's share go to sites still finding contacts"
+    )
+    
+    parse_processes = models.IntegerField(
+        default=0,
+        validators=[MinValueValidator(0), MaxValueValidator(64)],
+        help_text="Worker processes to parse pages in, so parsing scales with CPU cores (0 parses in the fetch workers)"
     )
     
     # Timeout settings
@@ -478,12 +573,76 @@ class WebScrapeParameters(models.Model):
         help_text="Request timeout in seconds"
     )
     
+    max_page_bytes = models.PositiveIntegerField(
+        default=2 * 1024 * 1024,
+        validators=[MinValueValidator(64 * 1024), MaxValueValidator(50 * 1024 * 1024)],
+        help_text="Stop downloading a page after this many bytes; non-HTML responses are never downloaded"
+    )
+    
     # Advanced options
+    crawl_engine = models.CharField(
+        max_length=10,
+        choices=CrawlEngine.choices,
+        default=CrawlEngine.THREADED,
+        help_text="Crawl engine to use (the async engine keeps many requests in flight without a thread per request)"
+    )
+    
+    html_parser = models.CharField(
+        max_length=20,
+        choices=HTMLParser.choices,
+        default=HTMLParser.HTML_PARSER,
+        help_text="HTML parser to build pages with (falls back to html.parser if not installed)"
+    )
+    
+    link_extraction = models.CharField(
+        max_length=10,
+        choices=LinkExtraction.choices,
+        default=LinkExtraction.SCAN,
+        help_text="Scan raw HTML for links, or parse only <a href> elements with the HTML parser"
+    )
+    
     follow_robotstxt = models.BooleanField(
         default=True,
         help_text="Respect robots.txt directives"
     )
     
+    use_sitemaps = models.BooleanField(
+        default=True,
+        help_text="Seed the crawl with contact, about and team pages from sitemaps listed in robots.txt"
+    )
+    
+    detect_traps = models.BooleanField(
+        default=False,
+        help_text="Throttle URL patterns that keep generating new pages (calendars, filters, session IDs) and don't follow links from near-duplicate pages"
+    )
+    
+    use_bloom_filter = models.BooleanField(
+        default=False,
+        help_text="Track discovered links in a fixed-size Bloom filter (saves memory on very large crawls, may rarely skip a page)"
+    )
+    
+    conditional_requests = models.BooleanField(
+        default=True,
+        help_text="Re-validate pages from each website's last crawl with ETag/Last-Modified and reuse the contacts of unchanged pages"
+    )
+    
+    recrawl_after_days = models.IntegerField(
+        blank=True,
+        null=True,
+        validators=[MinValueValidator(0), MaxValueValidator(365)],
+        help_text="Reuse a website's last crawl result instead of crawling it again if it is younger than this many days (0 always crawls again, empty reuses crawls within SITE_CRAWL_CACHE_TTL)"
+    )
+    
+    force_refresh = models.BooleanField(
+        default=False,
+        help_text="Crawl every website from scratch, ignoring cached crawls from this or other searches"
+    )
+    
+    archive_pages = models.BooleanField(
+        default=False,
+        help_text="Keep a compressed copy of every fetched page on disk, so contacts can be re-extracted without re-crawling"
+    )
+    
     user_agent = models.CharField(
         max_length=255,
         default="Mozilla/5.0 (compatible; CompanyBot/1.0)",
@@ -515,11 +674,196 @@ class WebScrapeParameters(models.Model):
             'extract_phone_numbers': self.extract_phone_numbers,
             'request_delay': self.request_delay,
             'concurrent_requests': self.concurrent_requests,
+            'global_concurrent_requests': self.global_concurrent_requests,
+            'adaptive_throttling': self.adaptive_throttling,
             'request_timeout': self.request_timeout,
+            'parse_processes': self.parse_processes,
+            'stop_after_unproductive_pages': self.stop_after_unproductive_pages,
+            'list_page_budget': self.list_page_budget,
+            'max_page_bytes': self.max_page_bytes,
+            'crawl_engine': self.crawl_engine,
+            'html_parser': self.html_parser,
+            'link_extraction': self.link_extraction,
             'follow_robotstxt': self.follow_robotstxt,
+            'use_sitemaps': self.use_sitemaps,
+            'use_bloom_filter': self.use_bloom_filter,
+            'detect_traps': self.detect_traps,
+            'conditional_requests': self.conditional_requests,
+            'recrawl_after_days': self.recrawl_after_days,
+            'force_refresh': self.force_refresh,
+            'archive_pages': self.archive_pages,
             'user_agent': self.user_agent,
         }
     
+class SiteCrawl(models.Model):
+    """
+    Result of the last crawl of a company website with a given extraction
+    configuration, shared by every search so later crawls can send
+    conditional requests and recent results are reused without crawling.
+    """
+    domain = models.CharField(max_length=255)
+    config_key = models.CharField(max_length=64)  # WebScrapeService.extraction_key
+    crawled_at = models.DateTimeField()
+    results = models.JSONField(default=dict)  # 'emails' and 'phones' found on the site
+    pages = models.JSONField(default=dict)  # WebScrapeService.page_records
+    stop_reason = models.CharField(max_length=20, blank=True, default='')  # WebScrapeService.stop_reason
+    complete = models.BooleanField(default=False, help_text="The crawl wasn't cut short, so its results can be reused")
+    contacts = models.ManyToManyField('contacts.Contact', blank=True, related_name='site_crawls')
+    
+    class Meta:
+        verbose_name = "Site Crawl"
+        verbose_name_plural = "Site Crawls"
+        constraints = [
+            models.UniqueConstraint(fields=['domain', 'config_key'], name='unique_site_crawl_per_config'),
+        ]
+    
+    def __str__(self):
+        return f"Crawl of {self.domain} at {self.crawled_at}"
+    
+    @classmethod
+    def record(cls, domain, config_key, scraper, contacts):
+        """Store a finished scraper's results, page records and contacts as the site's last crawl."""
+        site_crawl, _ = cls.objects.update_or_create(
+            domain=domain,
+            config_key=config_key,
+            defaults={
+                'crawled_at': timezone.now(),
+                'results': {
+                    'emails': scraper.results['emails'],
+                    'phones': sorted(scraper.results['phones']),
+                },
+                'pages': scraper.page_records,
+                'stop_reason': scraper.stop_reason or '',
+                'complete': scraper.crawl_complete,
+            },
+        )
+        site_crawl.contacts.set(contacts)
+        return site_crawl
+    
+    def is_fresh(self, max_age):
+        """Check the crawl is younger than max_age (a timedelta)."""
+        return self.crawled_at >= timezone.now() - max_age
+    
+    def is_reusable(self, max_age):
+        """
+        Check the crawl's contacts can stand in for a new crawl: it is
+        younger than max_age and wasn't cut short, e.g. by a list page
+        budget or failed fetches.
+        """
+        return self.complete and self.is_fresh(max_age)
+    
+class SearchCheckpoint(models.Model):
+    """
+    Progress of one company in a contact search, so an interrupted search
+    resumes where it stopped without repeating crawls or paid API calls.
+    """
+    class CheckpointStatus(models.TextChoices):
+        FETCHED = 'fetched', 'Fetched'  # Results kept, contacts not saved yet
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'  # Retried by a resumed search, up to MAX_ATTEMPTS times
+    
+    FINISHED_STATUSES = [CheckpointStatus.DONE]
+    
+    # Failed attempts after which a company is given up on
+    MAX_ATTEMPTS = 3
+    
+    contact_search = models.ForeignKey('ContactSearch', on_delete=models.CASCADE, related_name='checkpoints')
+    company = models.ForeignKey('companies.Company', on_delete=models.CASCADE, related_name='search_checkpoints')
+    status = models.CharField(max_length=10, choices=CheckpointStatus.choices)
+    result = models.JSONField(blank=True, null=True)  # Provider results, kept until contacts are saved
+    contacts_found = models.IntegerField(default=0)
+    error = models.TextField(blank=True, null=True)
+    attempts = models.PositiveIntegerField(default=0)  # Failed attempts so far
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Search Checkpoint"
+        verbose_name_plural = "Search Checkpoints"
+        constraints = [
+            models.UniqueConstraint(fields=['contact_search', 'company'], name='unique_checkpoint_per_company'),
+        ]
+    
+    def __str__(self):
+        return f"{self.company_id} in search #{self.contact_search_id}: {self.get_status_display()}"
+    
+    @classmethod
+    def finished(cls, contact_search):
+        """Return the checkpoints of companies a search is done with, including those given up on."""
+        return cls.objects.filter(contact_search=contact_search).filter(
+            models.Q(status__in=cls.FINISHED_STATUSES)
+            | models.Q(status=cls.CheckpointStatus.FAILED, attempts__gte=cls.MAX_ATTEMPTS)
+        )
+    
+    @classmethod
+    def pending_chunks(cls, contact_search, companies, chunk_size=100):
+        """
+        Iterate the companies a search hasn't finished, in primary key order.
+        
+        Companies that failed are included again until they have failed
+        MAX_ATTEMPTS times.
+        
+        Args:
+            contact_search: The ContactSearch being run
+            companies: QuerySet of the companies to search
+            chunk_size (int): Companies loaded per query
+        
+        Yields:
+            tuple: (list of companies, dict of company ID -> results kept
+                for companies fetched before an interruption or a failure)
+        """
+        finished = cls.finished(contact_search)
+        pending = companies.exclude(pk__in=finished.values('company_id')).order_by('pk')
+        
+        last_pk = None
+        while True:
+            chunk_query = pending if last_pk is None else pending.filter(pk__gt=last_pk)
+            chunk = list(chunk_query[:chunk_size])
+            if not chunk:
+                return
+            
+            fetched = dict(cls.objects.filter(
+                contact_search=contact_search, company__in=chunk, result__isnull=False
+            ).values_list('company_id', 'result'))
+            yield chunk, fetched
+            last_pk = chunk[-1].pk
+    
+    @classmethod
+    def save_result(cls, contact_search, company, result):
+        """Keep a company's results before its contacts are saved."""
+        cls.objects.update_or_create(
+            contact_search=contact_search,
+            company=company,
+            defaults={'status': cls.CheckpointStatus.FETCHED, 'result': result},
+        )
+    
+    @classmethod
+    def mark_done(cls, contact_search, company, contacts_found):
+        """Record a company as finished, dropping its kept results."""
+        cls.objects.update_or_create(
+            contact_search=contact_search,
+            company=company,
+            defaults={'status': cls.CheckpointStatus.DONE, 'result': None, 'contacts_found': contacts_found},
+        )
+    
+    @classmethod
+    def mark_failed(cls, contact_search, company, error):
+        """
+        Record a failed attempt at a company, keeping any results fetched
+        for it. A resumed search tries it again until MAX_ATTEMPTS.
+        """
+        checkpoint, created = cls.objects.get_or_create(
+            contact_search=contact_search,
+            company=company,
+            defaults={'status': cls.CheckpointStatus.FAILED, 'error': error, 'attempts': 1},
+        )
+        if not created:
+            cls.objects.filter(pk=checkpoint.pk).update(
+                status=cls.CheckpointStatus.FAILED,
+                error=error,
+                attempts=models.F('attempts') + 1,
+                updated_at=timezone.now(),
+            )
+    
 class EmailValidationBatch(models.Model):
     """
     Model for tracking batches of email validations.
@@ -0,0 +1,60 @@
+"""
+Parse worker processes for the web scraper.
+
+Lives outside finder.services, which imports Django models at import time,
+so worker processes can unpickle these entry points before Django is set up.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Scrapers built in this worker process, one per scrape configuration
+_scrapers = {}
+
+
+def _init_worker():
+    """Set up Django in a fresh worker process."""
+    import django
+    django.setup()
+
+
+def create_parse_pool(processes):
+    """
+    Create a process pool for parsing pages off the fetch workers.
+
+    Workers are started from a fork server, so they never inherit the
+    crawl's threads, locks or open connections.
+
+    Args:
+        processes (int): Number of worker processes
+
+    Returns:
+        ProcessPoolExecutor: The pool; shut it down when the crawl is done
+    """
+    return ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=multiprocessing.get_context('forkserver'),
+        initializer=_init_worker,
+    )
+
+
+def analyze_page(config, url, content, depth, encoding=None):
+    """
+    Parse a page and extract its contacts and links in a worker process.
+
+    Args:
+        config (dict): Scraper configuration, without a target_url
+        url (str): The page URL
+        content (bytes): The raw response body
+        depth (int): Link depth of the page
+        encoding (str): Declared character encoding, if any
+
+    Returns:
+        dict: See WebScrapeService._analyze_page
+    """
+    from finder.services.webscrape_service import WebScrapeService
+
+    key = repr(sorted(config.items()))
+    scraper = _scrapers.get(key)
+    if scraper is None:
+        scraper = _scrapers[key] = WebScrapeService(config)
+    return scraper._analyze_page(url, content, depth, encoding)
@@ -1,4 +1,6 @@
 from .serpapi_service import SerpAPIService
 from .webscrape_service import WebScrapeService
+from .async_webscrape_service import AsyncWebScrapeService, MultiSiteScrapeService
 from .hunter_service import HunterService
-from .zerobounce_service import ZeroBounceService
\ No newline at end of file
+from .zerobounce_service import ZeroBounceService
+from .website_probe_service import WebsiteProbeService
\ No newline at end of file
@@ -0,0 +1,390 @@
+import asyncio
+import logging
+import time
+
+import aiohttp
+from asgiref.sync import sync_to_async
+
+from .crawl_frontier import CrawlBudget, THROTTLE_STATUSES
+from .robots_service import cache_rules, get_cached_rules, parse_sitemap, robots_url, rules_from_response
+from finder.parse_workers import analyze_page, create_parse_pool
+from .webscrape_service import WebScrapeService
+
+logger = logging.getLogger(__name__)
+
+class AsyncWebScrapeService(WebScrapeService):
+    """
+    Event-loop variant of WebScrapeService built on aiohttp.
+
+    Accepts the same configuration and produces the same results shape as
+    WebScrapeService, but every fetch runs as a coroutine on a single thread,
+    so politeness delays and network waits do not hold a worker thread.
+    """
+
+    def start(self):
+        """Start the scraping process on a fresh event loop."""
+        return asyncio.run(self.crawl())
+
+    async def crawl(self, session=None):
+        """
+        Crawl the target site.
+
+        Args:
+            session (aiohttp.ClientSession): Optional shared session. When
+                omitted a session is created for this crawl and closed after.
+
+        Returns:
+            dict: The scrape results
+        """
+        logger.info(f"Starting async web scrape of {self.target_url}")
+
+        # Add initial URL and priority paths to queue
+        self._seed_queue()
+
+        owns_session = session is None
+        if owns_session:
+            session = self._create_session()
+
+        # Parse pages in worker processes, unless a shared pool was provided
+        owns_parse_pool = self.parse_pool is None and self.parse_processes > 0
+        if owns_parse_pool:
+            self.parse_pool = create_parse_pool(self.parse_processes)
+
+        tasks = set()
+        try:
+            # Load robots.txt up front and seed contact pages from its sitemaps
+            if self.follow_robotstxt or self.use_sitemaps:
+                rules = await self._load_robots_async(session, self.target_url)
+                if self.use_sitemaps:
+                    await self._seed_from_sitemaps_async(session, rules)
+
+            while (self.url_queue or tasks) and not self._stop_event.is_set():
+                # Fill the in-flight window with URLs whose host is ready
+                while len(tasks) < self.concurrent_requests:
+                    item = self.url_queue.pop_ready()
+                    if item is None:
+                        break
+                    url, depth, score = item
+                    tasks.add(asyncio.ensure_future(self._process_url_async(session, url, depth)))
+
+                # Only wake up for the next ready host if there is a free slot
+                next_ready_delay = self.url_queue.next_ready_delay()
+                if len(tasks) >= self.concurrent_requests:
+                    next_ready_delay = None
+
+                if not tasks:
+                    # Nothing in flight, wait for the next host to become ready
+                    await asyncio.sleep(next_ready_delay or 0)
+                    continue
+
+                # Wait for a fetch to complete or the next host to become ready
+                done, tasks = await asyncio.wait(
+                    tasks, timeout=next_ready_delay, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for task in done:
+                    if task.exception():
+                        logger.error(f"Error processing URL: {str(task.exception())}")
+
+                # Check if we've reached the max pages limit
+                if len(self.visited_urls) >= self.max_pages:
+                    logger.info(f"Reached maximum pages limit: {self.max_pages}")
+                    break
+
+            self._record_stop()
+        finally:
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            if owns_session:
+                await session.close()
+            if owns_parse_pool:
+                self.parse_pool.shutdown()
+                self.parse_pool = None
+            # Hand any unused share of the list budget to the other sites
+            if self.crawl_budget:
+                self.crawl_budget.finish(self.target_url)
+
+        logger.info(f"Web scrape completed. Visited {len(self.visited_urls)} pages.")
+        logger.info(f"Found {len(self.results['emails'])} email addresses and {len(self.results['phones'])} phone numbers.")
+
+        return self.results
+
+    def _create_session(self):
+        """Create an aiohttp session configured for this crawl."""
+        connector = aiohttp.TCPConnector(limit=self.concurrent_requests)
+        return aiohttp.ClientSession(
+            connector=connector,
+            headers={'User-Agent': self.user_agent},
+            timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+        )
+
+    async def _load_robots_async(self, session, url):
+        """Load robots.txt rules for a URL's host, from the cache or the network."""
+        rules = self._robots.get(robots_url(url)) or get_cached_rules(url, self.user_agent)
+        if rules is None:
+            status = text = None
+            try:
+                async with session.get(robots_url(url)) as response:
+                    status = response.status
+                    text = await response.text(errors='replace')
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"Failed to fetch robots.txt for {url}: {str(e)}")
+
+            rules, failed = rules_from_response(status, text, self.user_agent)
+            cache_rules(url, self.user_agent, rules, failed)
+
+        self._apply_robots(url, rules)
+        return rules
+
+    async def _seed_from_sitemaps_async(self, session, rules):
+        """Queue the most contact-like pages from the sitemaps listed in robots.txt."""
+        page_urls = []
+        pending = list(rules.sitemaps)
+        fetched = 0
+
+        while pending and fetched < self.MAX_SITEMAP_FETCHES:
+            sitemap_url = pending.pop(0)
+            fetched += 1
+            try:
+                async with session.get(sitemap_url, raise_for_status=True) as response:
+                    content = await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"Failed to fetch sitemap {sitemap_url}: {str(e)}")
+                continue
+
+            pages, sitemaps = parse_sitemap(content)
+            page_urls.extend(pages)
+            pending.extend(sitemaps)
+
+        self._queue_sitemap_urls(page_urls)
+
+    async def _process_url_async(self, session, url, depth):
+        """Process a single URL: fetch, extract data, find new links."""
+        if self._stop_event.is_set() or len(self.visited_urls) >= self.max_pages:
+            self._complete_fetch(url)
+            return
+
+        # First URL on a new host, check its robots.txt before fetching
+        if self._robots_allows(url) is None:
+            await self._load_robots_async(session, url)
+        if not self._robots_allows(url) or not self._acquire_page():
+            self._complete_fetch(url)
+            return
+
+        logger.debug(f"Processing {url} (depth {depth})")
+
+        # Mark as visited early to prevent duplicates
+        with self._lock:
+            self.visited_urls.add(url)
+            self.queued_urls.discard(url)
+
+        status = elapsed = retry_after = None
+        failed = False
+        try:
+            started = time.monotonic()
+            async with session.get(url, headers=self._conditional_headers(url)) as response:
+                status = response.status
+                elapsed = time.monotonic() - started
+                retry_after = response.headers.get('Retry-After')
+
+                # Host is throttling us, try again once it has backed off
+                if status in THROTTLE_STATUSES:
+                    self._requeue_throttled(url, depth)
+                    return
+
+                # Unchanged since the last crawl, reuse what was found then
+                if status == 304:
+                    self._reuse_unchanged_page(url, depth)
+                    return
+
+                # Skip non-HTML responses as soon as the headers arrive
+                content_type = response.headers.get('Content-Type', '')
+                if not self._is_html(content_type):
+                    return
+
+                content = bytearray()
+                async for chunk in response.content.iter_chunked(self.READ_CHUNK_SIZE):
+                    content += chunk
+                    if len(content) >= self.max_page_bytes:
+                        break
+
+            content = self._cap_page_size(url, content)
+            self._archive_page(url, depth, status, response.headers, content)
+            encoding = self._declared_charset(content_type)
+            if self.parse_pool is not None:
+                # Parse in a worker process while the loop keeps fetching
+                page = await asyncio.wrap_future(
+                    self.parse_pool.submit(analyze_page, self._parse_config, url, content, depth, encoding)
+                )
+                self._apply_page(url, depth, page)
+            else:
+                page = self._process_html(url, content, depth, encoding)
+            self._remember_page(url, depth, response.headers, page)
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            failed = True
+            logger.warning(f"Request failed for {url}: {str(e)}")
+        except Exception as e:
+            logger.error(f"Error processing {url}: {str(e)}")
+        finally:
+            self._complete_fetch(url, status, elapsed, retry_after, failed)
+
+
+class MultiSiteScrapeService:
+    """
+    Crawl many company websites concurrently on a single event loop.
+
+    All sites share one aiohttp session whose connector enforces a global
+    connection limit and a per-host limit, so whole-list throughput scales
+    with the concurrency setting while each site keeps its own pacing.
+    Companies are taken from the input as sites finish, so a list of any
+    size streams through one loop without waiting on its slowest sites.
+    """
+
+    def __init__(self, config, on_site_complete=None, previous_pages=None, crawl_budget=None, parse_pool=None,
+                 on_site_failed=None):
+        """
+        Initialize the multi-site crawler.
+
+        Args:
+            config (dict): Scraper configuration shared by every site
+                (target_url is replaced per company)
+            on_site_complete (callable): Optional synchronous callback invoked
+                as on_site_complete(company, scraper) as each site finishes
+            previous_pages (dict): Optional page_records from each site's
+                last crawl, keyed by company domain. Entries are taken as
+                each site starts, so a stream of companies can add them
+                as it goes
+            crawl_budget (CrawlBudget): Optional page budget shared with sites
+                crawled outside this service, instead of one from list_page_budget
+            parse_pool (ProcessPoolExecutor): Optional parse worker pool to
+                use instead of creating one
+            on_site_failed (callable): Optional synchronous callback invoked
+                as on_site_failed(company, error) when a site's crawl or its
+                on_site_complete raises; the other sites carry on
+        """
+        self.config = config
+        self.on_site_complete = on_site_complete
+        self.on_site_failed = on_site_failed
+        self.previous_pages = previous_pages if previous_pages is not None else {}
+        self.crawl_budget = crawl_budget
+        self.parse_pool = parse_pool
+        self.per_host_requests = config.get('concurrent_requests', 5)
+        self.global_requests = config.get('global_concurrent_requests', 100)
+        self.request_timeout = config.get('request_timeout', 30.0)
+        self.user_agent = config.get('user_agent', "Mozilla/5.0 (compatible; CompanyBot/1.0)")
+        self.list_page_budget = config.get('list_page_budget')
+        self.parse_processes = config.get('parse_processes', 0)
+
+    def start(self, companies):
+        """
+        Crawl the websites of the given companies.
+
+        Args:
+            companies: Iterable of Company objects, e.g. a QuerySet or a
+                generator that queries the database; those without a
+                website are skipped
+
+        Returns:
+            int: Number of sites crawled
+        """
+        sites = (company for company in companies if company.website_url)
+        if self.crawl_budget is None and self.list_page_budget:
+            # Sharing a page budget means knowing how many sites share it
+            sites = list(sites)
+        return asyncio.run(self.crawl(sites))
+
+    async def crawl(self, companies):
+        """
+        Crawl companies that all have a website URL.
+
+        Args:
+            companies: Iterable of Company objects, advanced in a worker
+                thread so it may use the ORM. Must be a list if the list
+                page budget is split here.
+
+        Returns:
+            int: Number of sites crawled
+        """
+        # Run enough sites at once to fill the global window
+        site_limit = max(1, self.global_requests // self.per_host_requests)
+        logger.info(
+            f"Starting multi-site web scrape, {site_limit} sites at a time "
+            f"({self.global_requests} global / {self.per_host_requests} per-host requests)"
+        )
+        callback = sync_to_async(self.on_site_complete) if self.on_site_complete else None
+        failed_callback = sync_to_async(self.on_site_failed) if self.on_site_failed else None
+
+        # Split the list-wide page budget, if any, as sites prove productive
+        budget = self.crawl_budget
+        if budget is None and self.list_page_budget:
+            budget = CrawlBudget(self.list_page_budget, len(companies), self.config.get('max_pages'))
+
+        next_company = sync_to_async(next)
+        companies = iter(companies)
+
+        # One parse worker pool serves every site
+        parse_pool = self.parse_pool
+        owns_parse_pool = parse_pool is None and self.parse_processes > 0
+        if owns_parse_pool:
+            parse_pool = create_parse_pool(self.parse_processes)
+
+        connector = aiohttp.TCPConnector(limit=self.global_requests, limit_per_host=self.per_host_requests)
+        async with aiohttp.ClientSession(
+            connector=connector,
+            headers={'User-Agent': self.user_agent},
+            timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+        ) as session:
+
+            async def crawl_site(company):
+                try:
+                    scraper = AsyncWebScrapeService(
+                        dict(self.config, target_url=company.website_url), budget, parse_pool,
+                        self.previous_pages.pop(company.domain, None),
+                    )
+                    await scraper.crawl(session)
+                except Exception as e:
+                    logger.error(f"Error scraping {company.website_url}: {str(e)}")
+                    if failed_callback:
+                        await failed_callback(company, e)
+                    return 0
+
+                if callback:
+                    try:
+                        await callback(company, scraper)
+                    except Exception as e:
+                        logger.error(f"Error saving results for {company.website_url}: {str(e)}")
+                        if failed_callback:
+                            await failed_callback(company, e)
+                return 1
+
+            running = set()
+            started = crawled = 0
+            more_companies = True
+            try:
+                while True:
+                    # Top up the sites in flight as others finish
+                    while more_companies and len(running) < site_limit:
+                        company = await next_company(companies, None)
+                        if company is None:
+                            more_companies = False
+                            break
+                        running.add(asyncio.ensure_future(crawl_site(company)))
+                        started += 1
+                    if not running:
+                        break
+
+                    done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                    crawled += sum(task.result() for task in done)
+            finally:
+                for task in running:
+                    task.cancel()
+                if running:
+                    await asyncio.gather(*running, return_exceptions=True)
+                if owns_parse_pool:
+                    parse_pool.shutdown()
+
+        logger.info(f"Multi-site web scrape completed. Crawled {crawled} of {started} sites.")
+        return crawled
@@ -0,0 +1,139 @@
+"""
+Set-based create-or-merge of provider records.
+
+Providers return records in batches, each identified by a unique field
+(a company's domain, a contact's email). bulk_upsert loads every existing
+row for a batch with one IN query, merges records into those rows with the
+caller's fill-missing rules, and writes the new and changed rows with
+bulk_create and bulk_update in one transaction, so a batch costs a handful
+of queries however large it is.
+
+link_related does the same for many-to-many membership, adding a batch of
+rows to a search or list with a single INSERT ... SELECT.
+"""
+import logging
+
+from django.db import connections, router, transaction
+from django.db.models import F, QuerySet
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Rows per INSERT or UPDATE statement
+BATCH_SIZE = 500
+
+
+def bulk_upsert(model, key_field, records, build, merge, merge_fields, batch_size=BATCH_SIZE):
+    """
+    Create or merge a batch of records identified by a unique field.
+
+    Records sharing a key are merged in order into the same instance, the
+    first one building or merging it. A row inserted by another worker
+    after the existing rows were loaded is left as that worker wrote it.
+
+    Args:
+        model: Model class to ingest into
+        key_field (str): Unique field identifying a record, e.g. 'email'
+        records (list): (key, data) pairs, in order
+        build (callable): build(key, data) returning an unsaved instance for a new key
+        merge (callable): merge(instance, data) applying a record to an
+            existing instance, returning True if it changed anything
+        merge_fields (list): Fields merge may change, written for changed rows
+        batch_size (int): Rows per INSERT or UPDATE statement
+
+    Returns:
+        list: The saved instance for each record, in order
+    """
+    if not records:
+        return []
+
+    instances = {}  # key -> instance
+    created = []
+    changed = {}  # key -> existing instance to update
+
+    with transaction.atomic():
+        existing = model.objects.in_bulk(
+            list(dict.fromkeys(key for key, _ in records)),
+            field_name=key_field,
+        )
+
+        for key, data in records:
+            instance = instances.get(key)
+            if instance is None:
+                instance = existing.get(key)
+                if instance is None:
+                    instances[key] = build(key, data)
+                    created.append(instances[key])
+                    continue
+                instances[key] = instance
+            if merge(instance, data) and instance.pk is not None:
+                changed[key] = instance
+
+        if created:
+            # A key inserted since the lookup leaves its row alone instead of failing
+            # the batch, and its id is still returned
+            model.objects.bulk_create(
+                created,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=[key_field],
+                update_fields=[key_field],
+            )
+
+        if changed:
+            fields = list(merge_fields)
+            # bulk_update skips auto_now, so stamp the rows here
+            if any(field.name == 'updated_at' for field in model._meta.concrete_fields):
+                now = timezone.now()
+                for instance in changed.values():
+                    instance.updated_at = now
+                fields.append('updated_at')
+            model.objects.bulk_update(list(changed.values()), fields, batch_size=batch_size)
+
+    logger.debug(
+        f"Upserted {len(instances)} {model._meta.verbose_name_plural}: "
+        f"{len(created)} created, {len(changed)} updated"
+    )
+    return [instances[key] for key, _ in records]
+
+
+def link_related(manager, objects):
+    """
+    Add objects to a many-to-many relation, skipping those already linked.
+
+    The links are written by one INSERT ... SELECT ... ON CONFLICT DO NOTHING,
+    so adding a whole filtered queryset never loads it into Python. Unlike
+    manager.add(), m2m_changed is not sent.
+
+    Args:
+        manager: Many-to-many related manager, e.g. company_list.companies
+        objects: QuerySet of the related model, or an iterable of its
+            instances or primary keys
+
+    Returns:
+        int: Number of links added
+    """
+    if not isinstance(objects, QuerySet):
+        pks = [getattr(obj, 'pk', obj) for obj in objects]
+        if not pks:
+            return 0
+        objects = manager.model._base_manager.filter(pk__in=pks)
+
+    through = manager.through
+    using = router.db_for_write(through, instance=manager.instance)
+    connection = connections[using]
+    quote = connection.ops.quote_name
+
+    select_sql, params = objects.values(linked_pk=F('pk')).query.get_compiler(using).as_sql()
+    source_column = through._meta.get_field(manager.source_field_name).column
+    target_column = through._meta.get_field(manager.target_field_name).column
+
+    # WHERE lets SQLite parse ON CONFLICT after a SELECT
+    sql = (
+        f"INSERT INTO {quote(through._meta.db_table)} ({quote(source_column)}, {quote(target_column)}) "
+        f"SELECT %s, linked.linked_pk FROM ({select_sql}) AS linked "
+        f"WHERE true ON CONFLICT DO NOTHING"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, (manager.related_val[0], *params))
+        return cursor.rowcount
@@ -0,0 +1,330 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+# Responses that mean the host wants us to slow down
+THROTTLE_STATUSES = {429, 503}
+
+# Keywords that mark a URL as likely to list contacts, best first
+CONTACT_PAGE_KEYWORDS = ['contact', 'team', 'staff', 'people', 'leadership', 'about']
+
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header value.
+
+    Args:
+        value (str): Either a number of seconds or an HTTP date
+
+    Returns:
+        float: Seconds to wait, or None if the value can't be parsed
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class HostState:
+    """Scheduling and throttling state for a single host."""
+
+    def __init__(self, host, concurrency, delay):
+        self.host = host
+        # Heap of (-score, sequence, url, depth)
+        self.queue = []
+        self.next_fetch_at = 0.0
+        self.in_flight = 0
+        self.concurrency = concurrency
+        self.delay = delay
+        self.min_delay = 0.0
+        self.latency = None
+        self.best_latency = None
+        self.successes = 0
+        self.in_heap = False
+
+
+class CrawlFrontier:
+    """
+    Queue of URLs waiting to be crawled, scheduled per host.
+
+    Each host has its own priority queue, a next-allowed-fetch time and a
+    limit on requests in flight. Within a host the highest-scoring URL is
+    handed out first, in insertion order among equal scores. A URL is only
+    handed out once its host is ready, and
+    handing one out pushes that host's next fetch back by its delay. Workers
+    therefore never sleep before a fetch, and politeness holds per host
+    however many workers run.
+
+    With adaptive throttling the per-host limit and delay follow AIMD: every
+    window of healthy responses adds one request of parallelism and trims
+    the delay, while 429/503 responses, errors and timeouts halve the
+    parallelism and double the delay. Retry-After is always honored.
+    """
+
+    # Delay bounds relative to and on top of the configured request delay
+    MIN_DELAY_FACTOR = 0.25
+    MAX_DELAY = 60.0
+    MAX_RETRY_AFTER = 300.0
+    # Responses this much slower than the best seen count as congestion,
+    # once they take long enough for the difference to matter
+    SLOW_RESPONSE_FACTOR = 2.0
+    SLOW_RESPONSE_MIN = 0.5
+
+    def __init__(self, request_delay=1.0, max_concurrency=1, adaptive=True):
+        """
+        Initialize the frontier.
+
+        Args:
+            request_delay (float): Starting average delay in seconds between
+                two fetches to the same host
+            max_concurrency (int): Upper bound on requests in flight per host
+            adaptive (bool): Adjust per-host concurrency and delay from responses
+        """
+        self.request_delay = request_delay
+        self.max_concurrency = max(1, max_concurrency)
+        self.adaptive = adaptive
+        self.min_delay = request_delay * self.MIN_DELAY_FACTOR
+        self._hosts = {}
+        # (ready_at, host) for hosts that have queued URLs and a free slot
+        self._ready_heap = []
+        self._size = 0
+        self._sequence = itertools.count()
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    @staticmethod
+    def host_for(url):
+        """Return the scheduling key (host) for a URL."""
+        return urlparse(url).netloc.lower()
+
+    def host_state(self, url):
+        """Return the HostState for a URL's host, creating it if needed."""
+        host = self.host_for(url)
+        state = self._hosts.get(host)
+        if state is None:
+            concurrency = 1 if self.adaptive else self.max_concurrency
+            state = self._hosts[host] = HostState(host, concurrency, self.request_delay)
+        return state
+
+    def set_crawl_delay(self, url, delay):
+        """Never fetch from a URL's host more often than every `delay` seconds."""
+        state = self.host_state(url)
+        state.min_delay = delay
+        state.delay = max(state.delay, delay)
+
+    def push(self, url, depth, score=0.0):
+        """Add a URL to its host's queue; higher scores are fetched first."""
+        state = self.host_state(url)
+        heapq.heappush(state.queue, (-score, next(self._sequence), url, depth))
+        self._size += 1
+        self._schedule(state)
+
+    def pop_ready(self, now=None):
+        """
+        Take the next URL whose host is ready to be fetched.
+
+        Every URL handed out must later be passed to complete().
+
+        Returns:
+            tuple: (url, depth, score), or None if no host is ready yet
+        """
+        now = time.monotonic() if now is None else now
+
+        while self._ready_heap:
+            ready_at, host = self._ready_heap[0]
+            if ready_at > now:
+                return None
+
+            heapq.heappop(self._ready_heap)
+            state = self._hosts[host]
+            state.in_heap = False
+
+            # The host was pushed back (e.g. Retry-After) since it was scheduled
+            if state.next_fetch_at > ready_at:
+                self._schedule(state)
+                continue
+
+            # The host filled up since it was scheduled; complete() re-adds it
+            if state.in_flight >= state.concurrency or not state.queue:
+                continue
+
+            negative_score, _, url, depth = heapq.heappop(state.queue)
+            self._size -= 1
+            state.in_flight += 1
+
+            # Reserve the host's next slot, with jitter so fetches don't look scripted
+            state.next_fetch_at = now + state.delay * (0.5 + random.random())
+            self._schedule(state)
+            return url, depth, -negative_score
+
+        return None
+
+    def complete(self, url, status=None, elapsed=None, retry_after=None, failed=False):
+        """
+        Record the outcome of a fetch handed out by pop_ready().
+
+        Args:
+            url (str): The fetched URL
+            status (int): HTTP status code, if a response was received
+            elapsed (float): Seconds until the response headers arrived
+            retry_after (str): Raw Retry-After header value, if any
+            failed (bool): The request errored or timed out
+        """
+        state = self.host_state(url)
+        state.in_flight = max(0, state.in_flight - 1)
+        now = time.monotonic()
+
+        wait = parse_retry_after(retry_after)
+        if wait is not None:
+            state.next_fetch_at = max(state.next_fetch_at, now + min(wait, self.MAX_RETRY_AFTER))
+
+        if self.adaptive:
+            if failed or status in THROTTLE_STATUSES:
+                self._decrease(state)
+            elif status is not None:
+                self._record_latency(state, elapsed)
+                if (elapsed is not None and elapsed > self.SLOW_RESPONSE_MIN
+                        and elapsed > state.best_latency * self.SLOW_RESPONSE_FACTOR):
+                    # Slow but successful, hold parallelism and ease off the delay
+                    state.successes = 0
+                    state.delay = min(self.MAX_DELAY, state.delay * 1.5)
+                else:
+                    self._increase(state)
+
+        self._schedule(state)
+
+    def next_ready_delay(self, now=None):
+        """
+        Seconds until some host is ready.
+
+        Returns:
+            float: 0 if a URL may be takeable now, None if no host is scheduled
+        """
+        if not self._ready_heap:
+            return None
+
+        now = time.monotonic() if now is None else now
+        return max(0.0, self._ready_heap[0][0] - now)
+
+    def _schedule(self, state):
+        """Put a host on the ready heap if it has work and a free slot."""
+        if state.queue and not state.in_heap and state.in_flight < state.concurrency:
+            heapq.heappush(self._ready_heap, (state.next_fetch_at, state.host))
+            state.in_heap = True
+
+    def _record_latency(self, state, elapsed):
+        """Track a moving average and the best observed response time."""
+        if elapsed is None:
+            return
+        state.latency = elapsed if state.latency is None else 0.8 * state.latency + 0.2 * elapsed
+        state.best_latency = elapsed if state.best_latency is None else min(state.best_latency, elapsed)
+
+    def _increase(self, state):
+        """Additive increase: one more request in flight per healthy window."""
+        state.successes += 1
+        if state.successes >= state.concurrency:
+            state.successes = 0
+            state.concurrency = min(self.max_concurrency, state.concurrency + 1)
+        state.delay = max(self.min_delay, state.min_delay, state.delay * 0.9)
+
+    def _decrease(self, state):
+        """Multiplicative decrease after throttling, errors or timeouts."""
+        state.successes = 0
+        state.concurrency = max(1, state.concurrency // 2)
+        state.delay = min(self.MAX_DELAY, max(state.delay, self.request_delay) * 2)
+
+
+class CrawlBudget:
+    """
+    Page budget shared by every site of a list crawl.
+
+    Each site is guaranteed an equal share of the budget, capped at its own
+    max_pages. Pages beyond its share come from a shared pool (budget no
+    site has reserved, plus shares left over by sites that finished early)
+    and only go to sites that found a new contact within their last
+    PRODUCTIVE_WINDOW pages. The total number of pages fetched never
+    exceeds total_pages.
+    """
+
+    PRODUCTIVE_WINDOW = 10
+
+    def __init__(self, total_pages, site_count, max_pages_per_site=None):
+        """
+        Initialize the budget.
+
+        Args:
+            total_pages (int): Pages to fetch across all sites
+            site_count (int): Number of sites sharing the budget
+            max_pages_per_site (int): Per-site page limit, if any
+        """
+        self.total_pages = total_pages
+        self.share = total_pages // max(1, site_count)
+        if max_pages_per_site:
+            self.share = min(self.share, max_pages_per_site)
+        self.spent = 0
+        # Pages still guaranteed to sites that haven't used their share
+        self._reserved = self.share * site_count
+        self._sites = {}
+        self._lock = threading.Lock()
+
+    def _site(self, key):
+        return self._sites.setdefault(key, {'used': 0, 'dry_pages': 0, 'finished': False})
+
+    def acquire(self, key):
+        """
+        Take one page from the budget for a site.
+
+        Args:
+            key (str): Identifies the site, e.g. its target URL
+
+        Returns:
+            bool: True if the site may fetch another page
+        """
+        with self._lock:
+            site = self._site(key)
+            if site['finished']:
+                return False
+
+            if site['used'] < self.share:
+                self._reserved -= 1
+            elif site['dry_pages'] >= self.PRODUCTIVE_WINDOW:
+                return False
+            elif self.total_pages - self.spent - self._reserved <= 0:
+                return False
+
+            site['used'] += 1
+            self.spent += 1
+            return True
+
+    def record(self, key, new_contacts):
+        """Record how many new contacts a site's latest page produced."""
+        with self._lock:
+            site = self._site(key)
+            site['dry_pages'] = 0 if new_contacts else site['dry_pages'] + 1
+
+    def finish(self, key):
+        """Return the unused part of a finished site's share to the pool."""
+        with self._lock:
+            site = self._site(key)
+            if not site['finished']:
+                site['finished'] = True
+                self._reserved -= max(0, self.share - site['used'])
@@ -0,0 +1,155 @@
+import hashlib
+import re
+from collections import Counter, defaultdict
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+
+_DIGITS_PATTERN = re.compile(r'\d+')
+_HEX_ID_PATTERN = re.compile(r'^[0-9a-f]{16,}$|^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$')
+_WORD_PATTERN = re.compile(r'\w+')
+
+
+class TrapDetector:
+    """
+    Spots URL patterns that keep generating new pages.
+
+    Calendars, faceted filters and session IDs produce endless URLs that
+    differ only in numbers, IDs or query values. URLs are grouped by a
+    pattern with those parts masked out; once a pattern has produced more
+    than PATTERN_SOFT_LIMIT URLs its new URLs are scored down, and past
+    PATTERN_HARD_LIMIT they are dropped. Paths that are very deep or
+    repeat segments, and paths with too many query variants, are dropped.
+    """
+
+    PATTERN_SOFT_LIMIT = 10
+    PATTERN_HARD_LIMIT = 50
+    # Score penalty per URL beyond the soft limit
+    PATTERN_PENALTY = 0.5
+    MAX_PATH_SEGMENTS = 12
+    MAX_SEGMENT_REPEATS = 2
+    MAX_QUERY_VARIANTS = 25
+
+    def __init__(self):
+        self._pattern_counts = Counter()
+        self._query_variants = defaultdict(set)
+
+    @staticmethod
+    def _mask_segment(segment):
+        if _HEX_ID_PATTERN.match(segment.lower()):
+            return '{id}'
+        return _DIGITS_PATTERN.sub('{n}', segment)
+
+    def assess(self, url):
+        """
+        Record a newly discovered URL and judge whether it looks like a trap.
+
+        Args:
+            url (str): A canonical URL not seen before
+
+        Returns:
+            float: Score penalty for the URL (0 for normal URLs), or None
+                if the URL should not be crawled at all
+        """
+        parts = urlsplit(url)
+        segments = [segment for segment in parts.path.split('/') if segment]
+
+        if len(segments) > self.MAX_PATH_SEGMENTS:
+            return None
+        if segments and max(Counter(segments).values()) > self.MAX_SEGMENT_REPEATS:
+            return None
+
+        path_pattern = '/'.join(self._mask_segment(segment) for segment in segments)
+        query_keys = sorted({key for key, _ in parse_qsl(parts.query, keep_blank_values=True)})
+
+        # Faceted filters combine parameters endlessly on the same path
+        if query_keys:
+            variants = self._query_variants[(parts.netloc, path_pattern)]
+            variants.add(parts.query)
+            if len(variants) > self.MAX_QUERY_VARIANTS:
+                return None
+
+        pattern = (parts.netloc, path_pattern, tuple(query_keys))
+        self._pattern_counts[pattern] += 1
+        count = self._pattern_counts[pattern]
+
+        if count > self.PATTERN_HARD_LIMIT:
+            return None
+        return max(0, count - self.PATTERN_SOFT_LIMIT) * self.PATTERN_PENALTY
+
+
+def simhash(text, shingle_size=3):
+    """
+    64-bit simhash of a text's word shingles.
+
+    Texts that differ in a few words get fingerprints a few bits apart.
+    """
+    words = _WORD_PATTERN.findall(text.lower())
+    if len(words) < shingle_size:
+        shingles = Counter([' '.join(words)])
+    else:
+        shingles = Counter(' '.join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1))
+
+    # One row of 64 bits per shingle hash, each bit voting +count or -count
+    digests = b''.join(hashlib.blake2b(shingle.encode(), digest_size=8).digest() for shingle in shingles)
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(-1, 8), axis=1).astype(np.int64)
+    counts = np.fromiter(shingles.values(), dtype=np.int64, count=len(shingles))
+    weights = counts @ (2 * bits - 1)
+
+    return int.from_bytes(np.packbits(weights > 0).tobytes(), 'big')
+
+
+class BoilerplateFilter:
+    """
+    Strips a site's shared template text from its pages.
+
+    Pages are compared as lists of text blocks. A block found on MIN_PAGES
+    earlier pages of the site, such as a navigation menu, header or footer
+    built from a shared template, is boilerplate, so what is left is the
+    page's own content.
+    """
+
+    MIN_PAGES = 2
+
+    def __init__(self):
+        # Block -> number of pages it was found on
+        self._block_pages = Counter()
+
+    def main_content(self, blocks):
+        """
+        Record a page's text blocks and return the ones that aren't boilerplate.
+
+        Args:
+            blocks (list): The page's text blocks, in order
+
+        Returns:
+            str: The page's own text, blank if it only repeats other pages
+        """
+        content = ' '.join(block for block in blocks if self._block_pages[block] < self.MIN_PAGES)
+        self._block_pages.update(set(blocks))
+        return content
+
+
+class NearDuplicateIndex:
+    """Remembers page fingerprints and spots pages close to one already seen."""
+
+    def __init__(self, max_distance=3):
+        """
+        Args:
+            max_distance (int): Most differing simhash bits for two pages
+                to count as near-duplicates
+        """
+        self.max_distance = max_distance
+        self._fingerprints = []
+
+    def check_and_add(self, fingerprint):
+        """
+        Returns:
+            bool: True if a near-duplicate was seen before; otherwise the
+                fingerprint is remembered and False is returned
+        """
+        for seen in self._fingerprints:
+            if (seen ^ fingerprint).bit_count() <= self.max_distance:
+                return True
+        self._fingerprints.append(fingerprint)
+        return False
@@ -1,10 +1,34 @@
 import requests
 import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
 from django.conf import settings
 from contacts.models import Contact
+from finder.services.bulk_ingest import bulk_upsert
+from finder.services.crawl_frontier import parse_retry_after
+from finder.services.provider_cache import ProviderCache
+from finder.services.rate_limiter import RateLimiter
 
 logger = logging.getLogger(__name__)
 
+# Rate limiters by API key, shared by every HunterService in the process
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def _rate_limiter(api_key):
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(api_key)
+        if limiter is None:
+            limiter = _rate_limiters[api_key] = RateLimiter([
+                (settings.HUNTER_REQUESTS_PER_SECOND, 1),
+                (settings.HUNTER_REQUESTS_PER_MINUTE, 60),
+            ])
+        return limiter
+
 class HunterService:
     """
     Service for interacting with the Hunter.io API to find contact information
@@ -13,11 +37,62 @@ class HunterService:
     
     BASE_URL = "https://api.hunter.io/v2"
     
-    def __init__(self, api_key=None):
-        """Initialize with API key from settings if not provided"""
+    # Contact fields _update_contact_from_hunter_data may change
+    MERGE_FIELDS = [
+        'first_name', 'last_name', 'position', 'company', 'twitter', 'linkedin_url', 'phone_number',
+        'hunter_confidence', 'hunter_type', 'hunter_sources', 'hunter_department', 'hunter_seniority',
+        'verification_status', 'verification_date',
+    ]
+    
+    # Attempts at a request Hunter answers 429 to, and the first backoff in seconds
+    MAX_ATTEMPTS = 5
+    BACKOFF_BASE = 1.0
+    
+    def __init__(self, api_key=None, concurrency=None, use_cache=True):
+        """
+        Initialize with API key from settings if not provided
+        
+        Args:
+            api_key (str): Hunter API key
+            concurrency (int): Most domain searches run at once by domain_search_many,
+                HUNTER_CONCURRENCY by default
+            use_cache (bool): Reuse cached responses to identical domain searches;
+                fresh responses are cached either way
+        """
         self.api_key = api_key or getattr(settings, 'HUNTER_API_KEY', None)
         if not self.api_key:
             raise ValueError("Hunter API key is required")
+        self.concurrency = concurrency or settings.HUNTER_CONCURRENCY
+        self.rate_limiter = _rate_limiter(self.api_key)
+        self.use_cache = use_cache
+        self.response_cache = ProviderCache('hunter', settings.HUNTER_CACHE_TTL)
+        
+        # Pooled keep-alive connections, one per concurrent search
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency))
+    
+    def _get(self, path, params):
+        """
+        Make a rate-limited API request, backing off and retrying on 429.
+        
+        Returns:
+            requests.Response: The successful response
+        """
+        for attempt in range(1, self.MAX_ATTEMPTS + 1):
+            self.rate_limiter.acquire()
+            response = self.session.get(f"{self.BASE_URL}/{path}", params=params, timeout=30)
+            if response.status_code != 429 or attempt == self.MAX_ATTEMPTS:
+                break
+            
+            delay = parse_retry_after(response.headers.get('Retry-After'))
+            if delay is None:
+                delay = self.BACKOFF_BASE * 2 ** (attempt - 1) * random.uniform(1, 1.5)
+            logger.warning(f"Hunter rate limited the request, retrying in {delay:.1f}s")
+            # Every thread sharing the key backs off, not just this one
+            self.rate_limiter.pause(delay)
+        
+        response.raise_for_status()  # Raise exception for HTTP errors
+        return response
         
     def get_account_info(self):
         """
@@ -27,8 +102,7 @@ class HunterService:
             dict: Account information
         """
         try:
-            response = requests.get(f"{self.BASE_URL}/account", params={'api_key': self.api_key})
-            response.raise_for_status()  # Raise exception for HTTP errors
+            response = self._get('account', {'api_key': self.api_key})
             return response.json()['data']['requests']
         except requests.RequestException as e:
             logger.error(f"Hunter API request error: {str(e)}")
@@ -40,6 +114,9 @@ class HunterService:
         """
         Search for email addresses at a specific domain or company.
         
+        Identical searches made within HUNTER_CACHE_TTL are answered from
+        the response cache, without a request, unless use_cache is off.
+        
         Args:
             domain (str): Domain name to search (e.g., 'stripe.com')
             company (str): Company name to search (e.g., 'Stripe')
@@ -92,15 +169,107 @@ class HunterService:
             else:
                 params['required_field'] = required_fields
         
-        # Make the API request
+        # Make the API request, unless an identical one was made recently
+        cache_params = {key: value for key, value in params.items() if key != 'api_key'}
         try:
-            response = requests.get(f"{self.BASE_URL}/domain-search", params=params)
-            response.raise_for_status()  # Raise exception for HTTP errors
-            return response.json()
+            return self.response_cache.fetch(
+                cache_params,
+                lambda: self._get('domain-search', params).json(),
+                use_cache=self.use_cache,
+            )
         except requests.RequestException as e:
             logger.error(f"Hunter API request error: {str(e)}")
             raise
     
+    def domain_search_pages(self, max_results=None, max_credits=None, **search_kwargs):
+        """
+        Follow a domain search page by page, as reported by meta.results.
+        
+        Pages are requested one at a time, so a caller saving each page as
+        it arrives holds only one page in memory.
+        
+        Args:
+            max_results (int): Stop once this many email addresses were fetched
+            max_credits (int): Stop after this many requests, each costing up to one credit
+            **search_kwargs: domain_search arguments; limit is the page size and
+                offset where the first page starts
+            
+        Yields:
+            dict: Each page's API response data
+        """
+        page_size = search_kwargs.pop('limit', 10)
+        offset = search_kwargs.pop('offset', 0)
+        fetched = 0
+        requests_made = 0
+        
+        while True:
+            limit = page_size if max_results is None else min(page_size, max_results - fetched)
+            page = self.domain_search(limit=limit, offset=offset, **search_kwargs)
+            requests_made += 1
+            yield page
+            
+            emails = page.get('data', {}).get('emails') or []
+            fetched += len(emails)
+            offset += len(emails)
+            total = page.get('meta', {}).get('results') or 0
+            if not emails or offset >= total:
+                return
+            if max_results is not None and fetched >= max_results:
+                return
+            if max_credits is not None and requests_made >= max_credits:
+                logger.info(f"Stopped paginating after {requests_made} requests, {total - offset} results left")
+                return
+    
+    def domain_search_all(self, max_results=None, max_credits=None, **search_kwargs):
+        """
+        Fetch every page of a domain search and combine them.
+        
+        Takes the same arguments as domain_search_pages.
+        
+        Returns:
+            dict: The first page's response data, with the emails of every page
+        """
+        combined = None
+        for page in self.domain_search_pages(max_results, max_credits, **search_kwargs):
+            if combined is None:
+                combined = page
+            else:
+                combined['data']['emails'].extend(page.get('data', {}).get('emails') or [])
+        return combined
+    
+    def domain_search_many(self, domains, paginate=False, **search_kwargs):
+        """
+        Run domain searches for many domains concurrently.
+        
+        Up to self.concurrency searches run at once on pooled connections,
+        within Hunter's rate limits.
+        
+        Args:
+            domains (list): Domains to search
+            paginate (bool): Fetch every page of each domain's results, see domain_search_all
+            **search_kwargs: Other domain_search arguments, applied to every domain, plus
+                max_results and max_credits when paginating
+            
+        Yields:
+            tuple: (domain, results, error) as each search finishes, with
+                either the API response data or the exception it raised
+        """
+        search = self.domain_search_all if paginate else self.domain_search
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        try:
+            futures = {
+                executor.submit(search, domain=domain, **search_kwargs): domain
+                for domain in domains
+            }
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result(), None
+                except Exception as e:
+                    yield futures[future], None, e
+        finally:
+            # Stop searches nobody will read if the caller gave up early
+            executor.shutdown(wait=True, cancel_futures=True)
+    
     def create_contacts_from_results(self, results, company=None):
         """
         Create Contact objects from Hunter API results
@@ -112,37 +281,24 @@ class HunterService:
         Returns:
             list: List of created/updated Contact objects
         """
-        created_contacts = []
-        
         # Check if we have any results
         if 'data' not in results or 'emails' not in results['data']:
-            return created_contacts
+            return []
         
-        # Process each email
-        for email_data in results['data']['emails']:
-            email = email_data.get('value')
-            if not email:
-                continue
-            
-            # Try to find existing contact
-            try:
-                contact = Contact.objects.get(email=email)
-                # Update existing contact with new data
-                updated = self._update_contact_from_hunter_data(contact, email_data, company)
-                if updated:
-                    contact.save()
-                    
-                created_contacts.append(contact)
-                continue
-            except Contact.DoesNotExist:
-                # Create new contact
-                contact = self._create_contact_from_hunter_data(email_data, company)
-                created_contacts.append(contact)
-        
-        return created_contacts
+        records = [
+            (email_data['value'], email_data)
+            for email_data in results['data']['emails']
+            if email_data.get('value')
+        ]
+        return bulk_upsert(
+            Contact, 'email', records,
+            build=lambda email, email_data: self._create_contact_from_hunter_data(email_data, company),
+            merge=lambda contact, email_data: self._update_contact_from_hunter_data(contact, email_data, company),
+            merge_fields=self.MERGE_FIELDS,
+        )
     
     def _create_contact_from_hunter_data(self, email_data, company=None):
-        """Create a new Contact from Hunter API data"""
+        """Build an unsaved Contact from Hunter API data"""
         email = email_data.get('value')
         first_name = email_data.get('first_name', '')
         last_name = email_data.get('last_name', '')
@@ -189,7 +345,6 @@ class HunterService:
                 contact.verification_status = verification.get('status')
                 contact.verification_date = verification.get('date')
         
-        contact.save()
         return contact
     
     def _update_contact_from_hunter_data(self, contact, email_data, company=None):
@@ -210,7 +365,7 @@ class HunterService:
             updated = True
             
         # Update company if provided and not already set
-        if company and not contact.company:
+        if company and not contact.company_id:
             contact.company = company
             updated = True
             
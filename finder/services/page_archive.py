@@ -0,0 +1,223 @@
+"""
+Append-only on-disk archive of fetched pages.
+
+Pages are written as WARC/1.1 response records, each compressed as its own
+gzip member, to segment files named <prefix>.warc.gz. Every segment has a
+JSON-lines index, <prefix>.idx, giving each record's offset and length
+along with the URL, crawl target, depth, status and fetch time, so an
+archive can be scanned or filtered without decompressing it.
+
+Each process writes its own segments, so concurrent crawls can share an
+archive directory without coordinating.
+"""
+import gzip
+import json
+import logging
+import os
+import threading
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from http import HTTPStatus
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = '.warc.gz'
+INDEX_SUFFIX = '.idx'
+
+# Hop-by-hop and encoding headers that no longer describe the stored body,
+# which is kept decoded and possibly truncated
+_DROPPED_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length', 'connection', 'keep-alive'}
+
+_archives = {}
+_archives_lock = threading.Lock()
+
+
+@dataclass
+class ArchivedPage:
+    """A page read back from an archive."""
+    url: str
+    status: int
+    fetched_at: datetime
+    content: bytes
+    headers: list = field(default_factory=list)  # (name, value) pairs
+    target_url: str = None
+    depth: int = 0
+
+    def header(self, name, default=None):
+        """Return the first value of a header, matched case-insensitively."""
+        name = name.lower()
+        for key, value in self.headers:
+            if key.lower() == name:
+                return value
+        return default
+
+
+class PageArchive:
+    """Writer for one process's segments in an archive directory."""
+
+    def __init__(self, path, segment_bytes=1024 ** 3):
+        """
+        Args:
+            path (str): Archive directory, created if missing
+            segment_bytes (int): Size at which a new segment is started
+        """
+        self.path = Path(path)
+        self.segment_bytes = segment_bytes
+        self._lock = threading.Lock()
+        self._segment = None
+        self._index = None
+        self._sequence = 0
+
+    def _open_segment(self):
+        """Start a new segment and its index. Called with the lock held."""
+        self._close_segment()
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._sequence += 1
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')
+        prefix = f"pages-{stamp}-{os.getpid()}-{self._sequence:05d}"
+        self._segment = open(self.path / f"{prefix}{SEGMENT_SUFFIX}", 'ab')
+        self._index = open(self.path / f"{prefix}{INDEX_SUFFIX}", 'a', encoding='utf-8')
+
+    def _close_segment(self):
+        for handle in (self._segment, self._index):
+            if handle is not None:
+                handle.close()
+        self._segment = self._index = None
+
+    def close(self):
+        """Close the current segment; the next write starts a new one."""
+        with self._lock:
+            self._close_segment()
+
+    def write(self, url, status, headers, content, target_url=None, depth=0, fetched_at=None):
+        """
+        Append a fetched page to the archive.
+
+        Args:
+            url (str): The page URL
+            status (int): HTTP status code
+            headers: Response headers, as a mapping or (name, value) pairs
+            content (bytes): The response body as it was processed
+            target_url (str): Site the page was crawled for
+            depth (int): Link depth of the page
+            fetched_at (datetime): Fetch time, now if omitted
+        """
+        fetched_at = fetched_at or datetime.now(timezone.utc)
+        if hasattr(headers, 'items'):
+            headers = headers.items()
+        headers = [(name, value) for name, value in headers if name.lower() not in _DROPPED_HEADERS]
+
+        # Compress outside the lock so fetch workers don't queue behind each other
+        record = gzip.compress(self._build_record(url, status, headers, content, target_url, depth, fetched_at))
+
+        with self._lock:
+            if self._segment is None or self._segment.tell() >= self.segment_bytes:
+                self._open_segment()
+            offset = self._segment.tell()
+            self._segment.write(record)
+            self._segment.flush()
+            # Index the record only once it is fully written
+            self._index.write(json.dumps({
+                'url': url,
+                'target_url': target_url,
+                'depth': depth,
+                'status': status,
+                'fetched_at': fetched_at.isoformat(),
+                'offset': offset,
+                'length': len(record),
+            }) + '\n')
+            self._index.flush()
+
+    @staticmethod
+    def _build_record(url, status, headers, content, target_url, depth, fetched_at):
+        """Serialize a page as a WARC response record."""
+        try:
+            reason = HTTPStatus(status).phrase
+        except ValueError:
+            reason = ''
+        http_block = f"HTTP/1.1 {status} {reason}\r\n".encode('latin-1')
+        http_block += b''.join(f"{name}: {value}\r\n".encode('latin-1', 'replace') for name, value in headers)
+        http_block += f"Content-Length: {len(content)}\r\n\r\n".encode('latin-1') + content
+
+        warc_headers = [
+            ('WARC-Type', 'response'),
+            ('WARC-Record-ID', f"<urn:uuid:{uuid.uuid4()}>"),
+            ('WARC-Date', fetched_at.strftime('%Y-%m-%dT%H:%M:%SZ')),
+            ('WARC-Target-URI', url),
+            ('WARC-X-Crawl-Target', target_url or ''),
+            ('WARC-X-Crawl-Depth', str(depth)),
+            ('Content-Type', 'application/http; msgtype=response'),
+            ('Content-Length', str(len(http_block))),
+        ]
+        header_block = 'WARC/1.1\r\n' + ''.join(f"{name}: {value}\r\n" for name, value in warc_headers)
+        return header_block.encode('utf-8') + b'\r\n' + http_block + b'\r\n\r\n'
+
+
+def open_page_archive(path, segment_bytes=1024 ** 3):
+    """
+    Return this process's writer for an archive directory.
+
+    Scrapers crawling in the same process share the writer, and so its
+    segments, instead of each starting their own.
+    """
+    key = (str(path), os.getpid())
+    with _archives_lock:
+        archive = _archives.get(key)
+        if archive is None:
+            archive = _archives[key] = PageArchive(path, segment_bytes)
+        return archive
+
+
+def _parse_record(data):
+    """Split a decompressed WARC response record into its HTTP headers and body."""
+    _, _, http_block = data.partition(b'\r\n\r\n')
+    head, _, body = http_block.partition(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    headers = []
+    length = None
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+        else:
+            headers.append((name, value.strip()))
+    return headers, body[:length] if length is not None else body
+
+
+def read_archive(path, target_url=None):
+    """
+    Read the pages in an archive, segment by segment in write order.
+
+    Args:
+        path (str): Archive directory
+        target_url (str): Only read pages crawled for this site
+
+    Yields:
+        ArchivedPage: Each archived page
+    """
+    for index_path in sorted(Path(path).glob(f"*{INDEX_SUFFIX}")):
+        segment_path = index_path.with_name(index_path.name[:-len(INDEX_SUFFIX)] + SEGMENT_SUFFIX)
+        with open(index_path, encoding='utf-8') as index, open(segment_path, 'rb') as segment:
+            for line in index:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Partially written line from an interrupted crawl
+                    logger.warning(f"Skipping malformed index line in {index_path}")
+                    continue
+                if target_url is not None and entry['target_url'] != target_url:
+                    continue
+
+                segment.seek(entry['offset'])
+                headers, content = _parse_record(gzip.decompress(segment.read(entry['length'])))
+                yield ArchivedPage(
+                    url=entry['url'],
+                    status=entry['status'],
+                    fetched_at=datetime.fromisoformat(entry['fetched_at']),
+                    content=content,
+                    headers=headers,
+                    target_url=entry['target_url'],
+                    depth=entry['depth'],
+                )
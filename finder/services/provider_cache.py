@@ -0,0 +1,99 @@
+import hashlib
+import json
+import logging
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderCache:
+    """
+    Cache of paid API responses, so repeating a search costs no credits.
+
+    Responses are stored in the Django cache under a hash of the request's
+    canonical parameters, and expire after the provider's TTL. Hits and
+    misses are counted per provider. Like the robots cache, failures to
+    read or write the cache only cost the call it would have saved.
+    """
+
+    def __init__(self, provider, ttl):
+        """
+        Args:
+            provider (str): Provider name, e.g. 'hunter', used in keys and stats
+            ttl (int): Seconds a response stays cached
+        """
+        self.provider = provider
+        self.ttl = ttl
+
+    def key(self, params):
+        """Return the cache key of a request's parameters, independent of their order."""
+        canonical = json.dumps(params, sort_keys=True, separators=(',', ':'), default=str)
+        return f"provider:{self.provider}:{hashlib.sha256(canonical.encode()).hexdigest()}"
+
+    def get(self, params):
+        """Return the cached response to a request, or None, counting a hit or miss."""
+        try:
+            response = cache.get(self.key(params))
+        except Exception as e:
+            logger.warning(f"{self.provider} response cache lookup failed: {str(e)}")
+            return None
+        self._count('hits' if response is not None else 'misses')
+        return response
+
+    def set(self, params, response):
+        """Cache the response to a request."""
+        try:
+            cache.set(self.key(params), response, self.ttl)
+        except Exception as e:
+            logger.warning(f"{self.provider} response cache update failed: {str(e)}")
+
+    def fetch(self, params, call, use_cache=True):
+        """
+        Return the response to a request, from the cache if there is one.
+
+        Args:
+            params (dict): Request parameters identifying the response, without credentials
+            call (callable): Makes the request when the response isn't cached
+            use_cache (bool): If False, always make the request, then cache its response
+
+        Returns:
+            The response
+        """
+        if use_cache:
+            response = self.get(params)
+            if response is not None:
+                return response
+
+        response = call()
+        # Empty responses are often failures, so they are asked for again next time
+        if response:
+            self.set(params, response)
+        return response
+
+    def _stats_key(self, outcome):
+        return f"provider_stats:{self.provider}:{outcome}"
+
+    def _count(self, outcome):
+        try:
+            cache.add(self._stats_key(outcome), 0, timeout=None)
+            cache.incr(self._stats_key(outcome))
+        except Exception as e:
+            logger.warning(f"{self.provider} response cache stats update failed: {str(e)}")
+
+    def stats(self):
+        """
+        Return the hit and miss counts recorded for this provider.
+
+        Returns:
+            dict: 'hits' and 'misses'
+        """
+        counts = cache.get_many([self._stats_key('hits'), self._stats_key('misses')])
+        return {
+            'hits': counts.get(self._stats_key('hits'), 0),
+            'misses': counts.get(self._stats_key('misses'), 0),
+        }
+
+    def reset_stats(self):
+        """Start counting hits and misses from zero."""
+        cache.delete_many([self._stats_key('hits'), self._stats_key('misses')])
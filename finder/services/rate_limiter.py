@@ -0,0 +1,50 @@
+import threading
+import time
+from collections import deque
+
+
+class RateLimiter:
+    """
+    Client-side limit on how often an API is called, shared by threads.
+
+    Holds callers back so that no more than a given number of calls start
+    within any window of each configured length, e.g. 15 per second and
+    500 per minute at once.
+    """
+
+    def __init__(self, limits):
+        """
+        Args:
+            limits (list): (calls, seconds) pairs that must all be respected
+        """
+        self._windows = [(calls, seconds, deque()) for calls, seconds in limits if calls]
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a call may start, and count it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = self._resume_at - now
+                for calls, seconds, starts in self._windows:
+                    while starts and starts[0] <= now - seconds:
+                        starts.popleft()
+                    if len(starts) >= calls:
+                        wait = max(wait, starts[0] + seconds - now)
+                if wait <= 0:
+                    for _, _, starts in self._windows:
+                        starts.append(now)
+                    return
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """
+        Hold every caller back for a while, e.g. after the API answered 429.
+
+        Args:
+            seconds (float): How long no call may start
+        """
+        with self._lock:
+            # Calls already made still count, and a shorter pause never cuts a longer one short
+            self._resume_at = max(self._resume_at, time.monotonic() + seconds)
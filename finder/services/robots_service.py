@@ -0,0 +1,256 @@
+import gzip
+import hashlib
+import io
+import logging
+import re
+import xml.etree.ElementTree as ET
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .crawl_frontier import CONTACT_PAGE_KEYWORDS
+
+logger = logging.getLogger(__name__)
+
+# How long parsed robots.txt files are cached, in seconds
+ROBOTS_CACHE_TTL = getattr(settings, 'ROBOTS_CACHE_TTL', 60 * 60 * 24)
+# Shorter TTL when robots.txt couldn't be fetched, so we retry sooner
+ROBOTS_ERROR_CACHE_TTL = 60 * 10
+# Largest sitemap accepted once decompressed, the limit set by the sitemap protocol
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024
+
+
+class RobotsRules:
+    """
+    Compiled robots.txt rules for one user agent.
+
+    Rules follow the longest-match semantics used by the major search
+    engines, including '*' wildcards and '$' end anchors.
+    """
+
+    def __init__(self, rules=None, crawl_delay=None, sitemaps=None):
+        """
+        Args:
+            rules (list): (allow, pattern) tuples for the matching group
+            crawl_delay (float): Crawl-delay for the matching group, if any
+            sitemaps (list): Sitemap URLs listed in the file
+        """
+        self.crawl_delay = crawl_delay
+        self.sitemaps = sitemaps or []
+        # Longest pattern wins and allow wins ties, so check in that order
+        self._rules = [
+            (allow, self._compile(pattern))
+            for allow, pattern in sorted(rules or [], key=lambda rule: (len(rule[1]), rule[0]), reverse=True)
+        ]
+
+    @classmethod
+    def allow_all(cls):
+        """Rules for a host without a usable robots.txt."""
+        return cls()
+
+    @classmethod
+    def parse(cls, text, user_agent):
+        """
+        Parse a robots.txt file.
+
+        Args:
+            text (str): The robots.txt content
+            user_agent (str): Our full User-Agent header
+
+        Returns:
+            RobotsRules: Rules for the most specific group matching user_agent
+        """
+        groups = []
+        sitemaps = []
+        group = None
+        in_agent_lines = False
+
+        for line in text.splitlines():
+            line = line.split('#', 1)[0].strip()
+            if ':' not in line:
+                continue
+            key, value = line.split(':', 1)
+            key = key.strip().lower()
+            value = value.strip()
+
+            if key == 'user-agent':
+                # Consecutive user-agent lines share one group
+                if group is None or not in_agent_lines:
+                    group = {'agents': [], 'rules': [], 'crawl_delay': None}
+                    groups.append(group)
+                group['agents'].append(value.lower())
+                in_agent_lines = True
+                continue
+
+            in_agent_lines = False
+            if key == 'sitemap':
+                sitemaps.append(value)
+            elif group is None:
+                continue
+            elif key in ('allow', 'disallow'):
+                # An empty Disallow allows everything, so it adds no rule
+                if value:
+                    group['rules'].append((key == 'allow', value))
+            elif key == 'crawl-delay':
+                try:
+                    group['crawl_delay'] = float(value)
+                except ValueError:
+                    pass
+
+        user_agent = (user_agent or '').lower()
+        best_group = None
+        best_length = -1
+        for candidate in groups:
+            for agent in candidate['agents']:
+                if agent == '*':
+                    length = 0
+                elif agent in user_agent:
+                    length = len(agent)
+                else:
+                    continue
+                if length > best_length:
+                    best_group, best_length = candidate, length
+
+        if best_group is None:
+            return cls(sitemaps=sitemaps)
+        return cls(best_group['rules'], best_group['crawl_delay'], sitemaps)
+
+    @staticmethod
+    def _compile(pattern):
+        """Compile a robots.txt path pattern into a regex."""
+        anchored = pattern.endswith('$')
+        if anchored:
+            pattern = pattern[:-1]
+        regex = '.*'.join(re.escape(part) for part in pattern.split('*'))
+        return re.compile(regex + ('$' if anchored else ''))
+
+    def is_allowed(self, url):
+        """Check whether a URL may be fetched."""
+        parsed = urlparse(url)
+        path = parsed.path or '/'
+        if path == '/robots.txt':
+            return True
+        if parsed.query:
+            path = f"{path}?{parsed.query}"
+
+        for allow, regex in self._rules:
+            if regex.match(path):
+                return allow
+        return True
+
+
+def robots_url(url):
+    """Return the robots.txt URL for the origin of a URL."""
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+
+
+def _cache_key(url, user_agent):
+    agent_hash = hashlib.md5((user_agent or '').encode()).hexdigest()[:12]
+    return f"robots:{agent_hash}:{robots_url(url).lower()}"
+
+
+def get_cached_rules(url, user_agent):
+    """Return cached RobotsRules for a URL's origin, or None."""
+    try:
+        return cache.get(_cache_key(url, user_agent))
+    except Exception as e:
+        # The cache is only an optimization, fall back to fetching
+        logger.warning(f"Robots cache lookup failed: {str(e)}")
+        return None
+
+
+def cache_rules(url, user_agent, rules, failed=False):
+    """Cache RobotsRules for a URL's origin."""
+    timeout = ROBOTS_ERROR_CACHE_TTL if failed else ROBOTS_CACHE_TTL
+    try:
+        cache.set(_cache_key(url, user_agent), rules, timeout)
+    except Exception as e:
+        logger.warning(f"Robots cache update failed: {str(e)}")
+
+
+def rules_from_response(status, text, user_agent):
+    """
+    Build RobotsRules from a robots.txt fetch.
+
+    A missing robots.txt (4xx) allows everything. Server errors also fall
+    back to allowing everything, but are reported as failures so they are
+    cached for a shorter time.
+
+    Returns:
+        tuple: (RobotsRules, failed)
+    """
+    if status is None or status >= 500:
+        return RobotsRules.allow_all(), True
+    if status >= 400:
+        return RobotsRules.allow_all(), False
+    return RobotsRules.parse(text or '', user_agent), False
+
+
+def parse_sitemap(content, max_bytes=MAX_SITEMAP_BYTES):
+    """
+    Parse a sitemap or sitemap index.
+
+    Corrupt, truncated or oversized sitemaps yield nothing rather than
+    failing the crawl.
+
+    Args:
+        content (bytes): Raw sitemap content, optionally gzipped
+        max_bytes (int): Largest sitemap accepted after decompression
+
+    Returns:
+        tuple: (page URLs, child sitemap URLs)
+    """
+    page_urls = []
+    sitemap_urls = []
+
+    if content[:2] == b'\x1f\x8b':
+        try:
+            with gzip.GzipFile(fileobj=io.BytesIO(content)) as sitemap_file:
+                # Read one byte past the limit to tell a sitemap at the limit from a larger one
+                content = sitemap_file.read(max_bytes + 1)
+        except (OSError, EOFError) as e:
+            logger.debug(f"Could not decompress sitemap: {str(e)}")
+            return page_urls, sitemap_urls
+
+    if len(content) > max_bytes:
+        logger.debug(f"Skipping sitemap larger than {max_bytes} bytes")
+        return page_urls, sitemap_urls
+
+    try:
+        root = ET.fromstring(content)
+    except ET.ParseError as e:
+        logger.debug(f"Could not parse sitemap: {str(e)}")
+        return page_urls, sitemap_urls
+
+    is_index = root.tag.endswith('sitemapindex')
+    for element in root.iter():
+        if element.tag.endswith('loc') and element.text:
+            (sitemap_urls if is_index else page_urls).append(element.text.strip())
+
+    return page_urls, sitemap_urls
+
+
+def rank_sitemap_urls(urls, keywords=None):
+    """
+    Rank sitemap URLs by how likely they are to list contacts.
+
+    Args:
+        urls (list): Page URLs from a sitemap
+        keywords (list): Extra keywords from the scrape configuration
+
+    Returns:
+        list: Relevant URLs, best first; URLs matching no keyword are dropped
+    """
+    keywords = CONTACT_PAGE_KEYWORDS + [k.lower() for k in (keywords or []) if k.lower() not in CONTACT_PAGE_KEYWORDS]
+    scored = []
+    for url in urls:
+        path = urlparse(url).path.lower()
+        for rank, keyword in enumerate(keywords):
+            if keyword in path:
+                # Earlier keywords and shallower paths rank first
+                scored.append((rank, path.count('/'), url))
+                break
+
+    return [url for _, _, url in sorted(scored)]
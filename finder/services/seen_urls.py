@@ -0,0 +1,131 @@
+import hashlib
+import math
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track where a visitor came from
+TRACKING_PARAMS = {
+    'gclid', 'dclid', 'gbraid', 'wbraid', 'fbclid', 'msclkid', 'yclid', 'igshid', 'twclid',
+    'mc_cid', 'mc_eid', '_ga', '_gl', '_hsenc', '_hsmi', 'hsctatracking', 'mkt_tok',
+    'ref_src', 'phpsessid', 'jsessionid', 'sessionid', 'sid',
+}
+TRACKING_PARAM_PREFIXES = ('utm_', 'pk_', 'mtm_')
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Session IDs embedded in the path, e.g. /page;jsessionid=ABC123
+_PATH_SESSION_PATTERN = re.compile(r';(?:jsessionid|phpsessid|sid)=[^/?#]*', re.IGNORECASE)
+
+
+def canonicalize_url(url):
+    """
+    Reduce a URL to the form used to decide whether a page was already seen.
+
+    Lowercases the scheme and host, drops default ports, fragments,
+    trailing slashes, session IDs and tracking parameters, and sorts the
+    remaining query parameters.
+
+    Args:
+        url (str): An absolute URL
+
+    Returns:
+        str: The canonical URL
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+
+    netloc = (parts.hostname or '').rstrip('.')
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port and port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{netloc}:{port}"
+
+    path = _PATH_SESSION_PATTERN.sub('', parts.path).rstrip('/')
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PARAM_PREFIXES)
+    )
+
+    return urlunsplit((scheme, netloc, path, urlencode(query), ''))
+
+
+def url_fingerprint(url):
+    """Return a 64-bit hash of a URL."""
+    return int.from_bytes(hashlib.blake2b(url.encode(), digest_size=8).digest(), 'big')
+
+
+class UrlFingerprintSet:
+    """
+    Set of URLs stored as 64-bit hashes instead of full strings.
+
+    Collisions are possible but negligible at crawl sizes (about one in
+    10^10 for a million URLs).
+    """
+
+    def __init__(self):
+        self._hashes = set()
+
+    def __contains__(self, url):
+        return url_fingerprint(url) in self._hashes
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def add(self, url):
+        self._hashes.add(url_fingerprint(url))
+
+    def discard(self, url):
+        self._hashes.discard(url_fingerprint(url))
+
+
+class BloomFilter:
+    """
+    Fixed-size probabilistic set of URLs.
+
+    Never reports a URL it has seen as new; reports a new URL as seen with
+    roughly the configured error rate once `capacity` URLs were added.
+    Memory stays constant however many URLs are added. URLs can't be
+    removed, so discard() is a no-op.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        """
+        Args:
+            capacity (int): Expected number of URLs
+            error_rate (float): Acceptable false positive rate at capacity
+        """
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self._count = 0
+
+    def _positions(self, url):
+        # Double hashing: k positions from two independent 64-bit hashes
+        digest = hashlib.blake2b(url.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'big')
+        second = int.from_bytes(digest[8:], 'big') | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def __contains__(self, url):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(url))
+
+    def __len__(self):
+        """Approximate number of distinct URLs added."""
+        return self._count
+
+    def add(self, url):
+        added = False
+        for position in self._positions(url):
+            byte, bit = position >> 3, 1 << (position & 7)
+            if not self._bits[byte] & bit:
+                self._bits[byte] |= bit
+                added = True
+        if added:
+            self._count += 1
+
+    def discard(self, url):
+        pass
@@ -1,9 +1,11 @@
 import requests
 import re
-from urllib.parse import urlparse, parse_qs
 from django.conf import settings
 from finder.models import CompanySearch, SerpAPISearchParameters
 from companies.models import Company
+from companies.domains import normalize_domain
+from finder.services.bulk_ingest import bulk_upsert, link_related
+from finder.services.provider_cache import ProviderCache
 import serpapi
 from geopy.geocoders import Nominatim
 import logging
@@ -14,6 +16,9 @@ logger = logging.getLogger(__name__)
 class SerpAPIService:
     BASE_URL = "https://serpapi.com/search"
     
+    # Company fields _merge_company may fill in
+    MERGE_FIELDS = ['place_id', 'address', 'phone', 'city', 'state', 'state_code']
+    
     def __init__(self):
         logger.info("Initializing SerpAPIService")
         self.api_key = settings.SERPAPI_API_KEY
@@ -22,12 +27,32 @@ class SerpAPIService:
         logger.info("Geolocator initialized")
         if not self.api_key:
             raise ValueError("SerpAPI API key is required")
+        self.response_cache = ProviderCache('serpapi', settings.SERPAPI_CACHE_TTL)
     
     def get_account_info(self):
         client = serpapi.Client(api_key=self.api_key)
         return client.account()
     
     def search_all_pages(self, search_params: SerpAPISearchParameters, max_results=None):
+        """
+        Run a search and collect its results across pages.
+        
+        Results are reused from the response cache for an identical search,
+        unless search_params.no_cache is set.
+        """
+        cache_params = {
+            'query': search_params.query,
+            'place_name': search_params.place_name,
+            'zoom': search_params.zoom,
+            'max_results': max_results,
+        }
+        return self.response_cache.fetch(
+            cache_params,
+            lambda: self._search_all_pages(search_params, max_results),
+            use_cache=not search_params.no_cache,
+        )
+    
+    def _search_all_pages(self, search_params: SerpAPISearchParameters, max_results=None):
         client = serpapi.Client(api_key=self.api_key)
         logger.info("Starting search_all_pages")
         all_results = []
@@ -38,6 +63,9 @@ class SerpAPIService:
             "type": "search",
             "q": search_params.query,
         }
+        if search_params.no_cache:
+            # Skip SerpAPI's own cache too
+            params["no_cache"] = "true"
 
         if search_params.place_name:
             # Use separate parameter for location
@@ -76,102 +104,89 @@ class SerpAPIService:
             company_search.save()
             return created_companies
         
+        # Key each result by its domain, which the Company model requires
+        records = []
         for result in results:
-            # Extract domain from website if available
-            domain = None
-            website_url = result.get("website")
-            if website_url:
-                try:
-                    parsed = urlparse(website_url)
-                    if parsed.netloc:
-                        # Remove www. prefix if present
-                        domain_value = parsed.netloc
-                        if domain_value.startswith('www.'):
-                            domain_value = domain_value[4:]
-                        domain = domain_value
-                except Exception:
-                    # In case of parsing errors, leave domain as None
-                    pass
-            
-            # Skip if no domain was found - domain is required for Company model
+            domain = normalize_domain(result.get("website"))
             if not domain:
                 print(f"Skipping business '{result.get('title')}' - no domain available")
                 continue
-            
-            # Check if company already exists by domain
-            try:
-                company = Company.objects.get(domain=domain)
-                # Update existing company details if needed
-                updated = False
-                
-                # Add missing details if needed
-                if not company.place_id and result.get("place_id"):
-                    company.place_id = result.get("place_id")
-                    updated = True
-                    
-                if not company.address and result.get("address"):
-                    company.address = result.get("address")
-                    updated = True
-                    
-                if not company.phone and result.get("phone"):
-                    company.phone = result.get("phone")
-                    updated = True
-                    
-                if updated:
-                    company.save()
-            except Company.DoesNotExist:
-                # Create coordinates model if available
-                coords = None
-                if "gps_coordinates" in result:
-                    coords = result["gps_coordinates"]
-                
-                # Create the company
-                company = Company(
-                    name=clean_company_name(result.get("title", "")),
-                    domain=domain,
-                    website_url=website_url,
-                    phone=result.get("phone"),
-                    serp_position=result.get("position"),
-                    place_id=result.get("place_id"),
-                    data_id=result.get("data_id"),
-                    data_cid=result.get("data_cid"),
-                    provider_id=result.get("provider_id"),
-                    rating=result.get("rating"),
-                    reviews_count=result.get("reviews"),
-                    primary_type=result.get("type"),
-                    types=result.get("types", []),
-                    type_ids=result.get("type_ids", []),
-                    address=result.get("address"),
-                    description=result.get("description"),
-                )
-                
-                # Add coordinate data if available
-                if coords:
-                    company.latitude = coords.get("latitude")
-                    company.longitude = coords.get("longitude")
-                
-                # Add service options if available
-                if "service_options" in result:
-                    options = result["service_options"]
-                    company.dine_in_available = options.get("dine_in", False)
-                    company.takeout_available = options.get("takeout", False)
-                    company.no_contact_delivery_available = options.get("no_contact_delivery", False)
-                
-                # Add thumbnail if available
-                if "thumbnail" in result:
-                    company.thumbnail_url = result.get("thumbnail")
-                
-                # Save the company
-                company.save()
-            
-            # Add company to the company search if not already there
-            if company not in company_search.companies.all():
-                company_search.companies.add(company)
-                
-            created_companies.append(company)
-                
+            records.append((domain, result))
+        
+        created_companies = bulk_upsert(
+            Company, 'domain', records,
+            build=self._build_company,
+            merge=self._merge_company,
+            merge_fields=self.MERGE_FIELDS,
+        )
+        
+        # Add companies to the company search if not already there
+        link_related(company_search.companies, created_companies)
+        
         # Update results count
         company_search.results_count = len(created_companies)
         company_search.save()
         
-        return created_companies
\ No newline at end of file
+        return created_companies
+    
+    def _build_company(self, domain, result):
+        """Build an unsaved Company from a SerpAPI result"""
+        company = Company(
+            name=clean_company_name(result.get("title", "")),
+            domain=domain,
+            website_url=result.get("website"),
+            phone=result.get("phone"),
+            serp_position=result.get("position"),
+            place_id=result.get("place_id"),
+            data_id=result.get("data_id"),
+            data_cid=result.get("data_cid"),
+            provider_id=result.get("provider_id"),
+            rating=result.get("rating"),
+            reviews_count=result.get("reviews"),
+            primary_type=result.get("type"),
+            types=result.get("types", []),
+            type_ids=result.get("type_ids", []),
+            address=result.get("address"),
+            description=result.get("description"),
+        )
+        
+        # Add coordinate data if available
+        coords = result.get("gps_coordinates")
+        if coords:
+            company.latitude = coords.get("latitude")
+            company.longitude = coords.get("longitude")
+        
+        # Add service options if available
+        if "service_options" in result:
+            options = result["service_options"]
+            company.dine_in_available = options.get("dine_in", False)
+            company.takeout_available = options.get("takeout", False)
+            company.no_contact_delivery_available = options.get("no_contact_delivery", False)
+        
+        # Add thumbnail if available
+        if "thumbnail" in result:
+            company.thumbnail_url = result.get("thumbnail")
+        
+        # Bulk inserts skip Company.save()
+        company.fill_city_and_state()
+        return company
+    
+    def _merge_company(self, company, result):
+        """Fill an existing Company's missing details from a SerpAPI result, return True if updated"""
+        updated = False
+        
+        if not company.place_id and result.get("place_id"):
+            company.place_id = result.get("place_id")
+            updated = True
+            
+        if not company.address and result.get("address"):
+            company.address = result.get("address")
+            updated = True
+            
+        if not company.phone and result.get("phone"):
+            company.phone = result.get("phone")
+            updated = True
+            
+        if updated:
+            company.fill_city_and_state()
+        return updated
@@ -1,18 +1,41 @@
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.builder import builder_registry
 import requests
 import re
+import hashlib
+import json
 import logging
+from html import unescape
 from urllib.parse import urljoin, urlparse
-import time
-import random
-from collections import deque
 import threading
-from concurrent.futures import ThreadPoolExecutor
-import tldextract
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from django.conf import settings
+from companies.domains import normalize_domain, registered_domain
 from contacts.models import Contact
+from finder.parse_workers import analyze_page, create_parse_pool
+from .bulk_ingest import bulk_upsert
+from .crawl_frontier import CONTACT_PAGE_KEYWORDS, CrawlFrontier, THROTTLE_STATUSES
+from .crawl_traps import BoilerplateFilter, NearDuplicateIndex, TrapDetector, simhash
+from .page_archive import open_page_archive
+from .robots_service import (
+    cache_rules, get_cached_rules, parse_sitemap, rank_sitemap_urls,
+    robots_url, rules_from_response,
+)
+from .seen_urls import BloomFilter, UrlFingerprintSet, canonicalize_url
 
 logger = logging.getLogger(__name__)
 
+
+@lru_cache(maxsize=None)
+def resolve_html_parser(name):
+    """Return the requested BeautifulSoup parser, or html.parser if it isn't installed."""
+    if builder_registry.lookup(name) is None:
+        logger.warning(f"HTML parser {name} is not installed, falling back to html.parser")
+        return 'html.parser'
+    return name
+
+
 class WebScrapeService:
     """
     Service to scrape websites for contact information, particularly email addresses.
@@ -25,12 +48,59 @@ class WebScrapeService:
         'live.com', 'msn.com', 'me.com', 'gmx.com', 'inbox.com'
     }
     
-    def __init__(self, config):
+    # Most sitemap files to fetch when seeding from robots.txt
+    MAX_SITEMAP_FETCHES = 5
+    
+    # Media types parsed as HTML, anything else is skipped before download
+    HTML_CONTENT_TYPES = {'text/html', 'application/xhtml+xml'}
+    READ_CHUNK_SIZE = 64 * 1024
+    # How far into a page to look for a <meta> charset
+    META_CHARSET_SCAN_BYTES = 4096
+    
+    # Settings that change which pages are crawled or what is extracted from them
+    EXTRACTION_CONFIG_KEYS = (
+        'max_depth', 'max_pages', 'stay_within_domain', 'follow_subdomains',
+        'priority_paths', 'exclude_paths', 'target_keywords',
+        'extract_names', 'extract_job_titles', 'extract_phone_numbers',
+        'follow_robotstxt', 'use_sitemaps', 'detect_traps', 'stop_after_unproductive_pages',
+        # Bound coverage: links found, bytes read, pages per list, robots.txt group
+        'list_page_budget', 'link_extraction', 'html_parser', 'max_page_bytes',
+        'use_bloom_filter', 'user_agent',
+    )
+    
+    # Why a crawl stopped, see stop_reason
+    STOP_EXHAUSTED = 'exhausted'  # No pages left to visit
+    STOP_FETCH_ERRORS = 'fetch_errors'  # No pages left, but some could not be fetched
+    STOP_MAX_PAGES = 'max_pages'
+    STOP_UNPRODUCTIVE = 'unproductive'  # stop_after_unproductive_pages
+    STOP_BUDGET = 'budget'  # List page budget allocated to other sites
+    STOP_STOPPED = 'stopped'  # stop() was called
+    # Stops that depend only on the site and the extraction settings, so
+    # another crawl with the same settings would find the same contacts
+    COMPLETE_STOP_REASONS = {STOP_EXHAUSTED, STOP_MAX_PAGES, STOP_UNPRODUCTIVE}
+    
+    # Expected links discovered per fetched page, used to size the Bloom filter
+    BLOOM_LINKS_PER_PAGE = 100
+    
+    # Frontier scoring weights, higher scores are fetched first
+    PRIORITY_SCORE = 10.0  # Priority paths and ranked sitemap pages
+    ANCHOR_KEYWORD_SCORE = 4.0
+    PATH_KEYWORD_SCORE = 3.0
+    DEPTH_PENALTY = 1.0
+    YIELD_SCORE = 5.0  # Per email found per page in the same site section
+    
+    def __init__(self, config, crawl_budget=None, parse_pool=None, previous_pages=None):
         """
         Initialize the web scraper with configuration.
         
         Args:
             config (dict): Configuration for the scraper
+            crawl_budget (CrawlBudget): Optional page budget shared with
+                the other sites of a list crawl
+            parse_pool (ProcessPoolExecutor): Optional parse worker pool
+                shared with other scrapers, see create_parse_pool
+            previous_pages (dict): Optional page_records from the site's
+                last crawl, re-validated with conditional requests
         """
         self.target_url = config.get('target_url')
         self.max_depth = config.get('max_depth', 2)
@@ -46,24 +116,65 @@ class WebScrapeService:
         self.request_delay = config.get('request_delay', 1.0)
         self.concurrent_requests = config.get('concurrent_requests', 5)
         self.request_timeout = config.get('request_timeout', 30.0)
+        self.max_page_bytes = config.get('max_page_bytes', 2 * 1024 * 1024)
+        self.adaptive_throttling = config.get('adaptive_throttling', True)
         self.follow_robotstxt = config.get('follow_robotstxt', True)
+        self.use_sitemaps = config.get('use_sitemaps', True)
+        self.use_bloom_filter = config.get('use_bloom_filter', False)
+        self.detect_traps = config.get('detect_traps', False)
+        self.stop_after_unproductive_pages = config.get('stop_after_unproductive_pages', 0)
+        self.crawl_budget = crawl_budget
+        self.parse_processes = config.get('parse_processes', 0)
+        self.parse_pool = parse_pool
+        # Parse workers serve every site, so they get the config without a target
+        self._parse_config = {key: value for key, value in config.items() if key != 'target_url'}
+        self.html_parser = resolve_html_parser(config.get('html_parser', 'html.parser'))
+        self.link_extraction = config.get('link_extraction', 'scan')
+        self.archive_pages = config.get('archive_pages', False)
+        self.conditional_requests = config.get('conditional_requests', True)
+        self.previous_pages = previous_pages or {}
         self.user_agent = config.get('user_agent', "Mozilla/5.0 (compatible; CompanyBot/1.0)")
         
         # Extract base domain for filtering
-        self.base_domain = self._extract_base_domain(self.target_url)
+        self.base_domain = registered_domain(self.target_url)
+        self.base_host = normalize_domain(self.target_url)
         
         # Set up threading primitives
         self._lock = threading.Lock()
         self._stop_event = threading.Event()
+        # Set as the crawl stops, None if it failed before stopping
+        self.stop_reason = None
+        self._failed_fetches = 0
         
         # Initialize results and tracking sets
         self.results = {
             'emails': {},  # Will store emails mapped to page details
             'phones': set(),
         }
-        self.visited_urls = set()
-        self.queued_urls = set()
-        self.url_queue = deque()
+        # Seen URLs are kept as 64-bit hashes; discovered links can use a Bloom filter instead
+        self.visited_urls = UrlFingerprintSet()
+        # Canonical URL -> validators, depth and contacts of pages that can be re-validated
+        self.page_records = {}
+        if self.use_bloom_filter:
+            self.queued_urls = BloomFilter(self.max_pages * self.BLOOM_LINKS_PER_PAGE)
+        else:
+            self.queued_urls = UrlFingerprintSet()
+        self.url_queue = CrawlFrontier(
+            self.request_delay,
+            max_concurrency=self.concurrent_requests,
+            adaptive=self.adaptive_throttling,
+        )
+        self._retried_urls = set()
+        self._traps = TrapDetector()
+        self._near_duplicates = NearDuplicateIndex()
+        self._boilerplate = BoilerplateFilter()
+        self._robots = {}  # robots.txt URL -> RobotsRules
+        self._section_yield = {}  # first path segment -> [pages, emails]
+        self._pages_without_contacts = 0
+        self._score_keywords = {k.lower() for k in self.target_keywords} | set(CONTACT_PAGE_KEYWORDS)
+        self._page_archive = None
+        if self.archive_pages:
+            self._page_archive = open_page_archive(settings.PAGE_ARCHIVE_DIR, settings.PAGE_ARCHIVE_SEGMENT_BYTES)
         
         # Compile regex patterns
         self.email_pattern = re.compile(r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}')
@@ -74,53 +185,119 @@ class WebScrapeService:
             re.IGNORECASE
         )
         
-    def _extract_base_domain(self, url):
-        """Extract the base domain for comparison."""
-        extracted = tldextract.extract(url)
-        return f"{extracted.domain}.{extracted.suffix}"
+        # Raw-bytes prefilters that decide how much work a page needs
+        self.email_marker_pattern = re.compile(rb'@|&#0*64;|&#x0*40;|&commat;', re.IGNORECASE)
+        self.anchor_marker_pattern = re.compile(rb'<a[\s>]', re.IGNORECASE)
+        self.header_charset_pattern = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+        self.meta_charset_pattern = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([\w.:-]+)', re.IGNORECASE)
+        
+        # Fast-path scanning for pages that don't need a DOM
+        self.link_pattern = re.compile(
+            r'<a\s[^>]*?\bhref\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))[^>]*>(.*?)</a\s*>',
+            re.IGNORECASE | re.DOTALL
+        )
+        self.page_title_pattern = re.compile(r'<title[^>]*>(.*?)</title\s*>', re.IGNORECASE | re.DOTALL)
+        self.hidden_content_pattern = re.compile(
+            r'<!--.*?-->|<(script|style|template)\b[^>]*>.*?</\1\s*>',
+            re.IGNORECASE | re.DOTALL
+        )
+        self.tag_pattern = re.compile(r'<[^>]*>')
+        # Page regions that hold site-wide template content rather than the page's own
+        self.boilerplate_element_pattern = re.compile(
+            r'<(nav|header|footer|aside)\b[^>]*>.*?</\1\s*>',
+            re.IGNORECASE | re.DOTALL
+        )
+        self.whitespace_pattern = re.compile(r'\s+')
+        
+    @classmethod
+    def extraction_key(cls, config):
+        """
+        Hash the settings that affect a crawl's results, so results of
+        crawls that would find the same contacts can be shared.
+        
+        Args:
+            config (dict): Scraper configuration
+        
+        Returns:
+            str: Hex digest of the extraction-relevant settings
+        """
+        relevant = {key: config.get(key) for key in cls.EXTRACTION_CONFIG_KEYS}
+        return hashlib.sha256(json.dumps(relevant, sort_keys=True).encode()).hexdigest()
+    
+    def _in_crawl_scope(self, url):
+        """Check a URL is on the target site, or one of its subdomains if enabled."""
+        if registered_domain(url) != self.base_domain:
+            return False
+        return self.follow_subdomains or normalize_domain(url) == self.base_host
     
     def start(self):
         """Start the scraping process."""
         logger.info(f"Starting web scrape of {self.target_url}")
         
-        # Add initial URL to queue
-        self._add_url_to_queue(self.target_url, depth=0)
+        # Add initial URL and priority paths to queue
+        self._seed_queue()
         
-        # If we have priority paths, add them first
-        if self.priority_paths:
-            base_url = self.target_url.rstrip('/')
-            for path in self.priority_paths:
-                path = path.lstrip('/')
-                priority_url = f"{base_url}/{path}"
-                self._add_url_to_queue(priority_url, depth=0, priority=True)
+        # Load robots.txt up front and seed contact pages from its sitemaps
+        if self.follow_robotstxt or self.use_sitemaps:
+            rules = self._load_robots(self.target_url)
+            if self.use_sitemaps:
+                self._seed_from_sitemaps(rules)
         
-        # Process queue using thread pool
-        with ThreadPoolExecutor(max_workers=self.concurrent_requests) as executor:
-            futures = set()
-            
-            while (self.url_queue or futures) and not self._stop_event.is_set():
-                # Fill worker pool
-                while self.url_queue and len(futures) < self.concurrent_requests:
-                    try:
-                        url, depth, priority = self.url_queue.popleft()
-                        futures.add(executor.submit(self._process_url, url, depth))
-                    except IndexError:
-                        break  # Queue emptied by another thread
-                
-                # Wait for at least one worker to complete
-                done, futures = wait_for_any(futures)
+        # Parse pages in worker processes, unless a shared pool was provided
+        owns_parse_pool = self.parse_pool is None and self.parse_processes > 0
+        if owns_parse_pool:
+            self.parse_pool = create_parse_pool(self.parse_processes)
+        
+        try:
+            # Process queue using thread pool
+            with ThreadPoolExecutor(max_workers=self.concurrent_requests) as executor:
+                futures = set()
                 
-                # Check results of completed futures
-                for future in done:
-                    try:
-                        future.result()  # Get result to catch exceptions
-                    except Exception as e:
-                        logger.error(f"Error processing URL: {str(e)}")
+                while (self.url_queue or futures) and not self._stop_event.is_set():
+                    # Fill worker pool with URLs whose host is ready
+                    while len(futures) < self.concurrent_requests:
+                        with self._lock:
+                            item = self.url_queue.pop_ready()
+                        if item is None:
+                            break
+                        url, depth, score = item
+                        futures.add(executor.submit(self._process_url, url, depth))
+                    
+                    # Only wake up for the next ready host if there is a free worker
+                    with self._lock:
+                        next_ready_delay = self.url_queue.next_ready_delay()
+                    if len(futures) >= self.concurrent_requests:
+                        next_ready_delay = None
+                    
+                    if not futures:
+                        # Nothing in flight, wait for the next host to become ready
+                        self._stop_event.wait(next_ready_delay or 0)
+                        continue
+                    
+                    # Wait for a worker to complete or the next host to become ready
+                    done, futures = wait(futures, timeout=next_ready_delay, return_when=FIRST_COMPLETED)
+                    
+                    # Check results of completed futures
+                    for future in done:
+                        try:
+                            future.result()  # Get result to catch exceptions
+                        except Exception as e:
+                            logger.error(f"Error processing URL: {str(e)}")
+                    
+                    # Check if we've reached the max pages limit
+                    if len(self.visited_urls) >= self.max_pages:
+                        logger.info(f"Reached maximum pages limit: {self.max_pages}")
+                        break
                 
-                # Check if we've reached the max pages limit
-                if len(self.visited_urls) >= self.max_pages:
-                    logger.info(f"Reached maximum pages limit: {self.max_pages}")
-                    break
+                self._record_stop()
+        finally:
+            if owns_parse_pool:
+                self.parse_pool.shutdown()
+                self.parse_pool = None
+        
+        # Hand any unused share of the list budget to the other sites
+        if self.crawl_budget:
+            self.crawl_budget.finish(self.target_url)
         
         logger.info(f"Web scrape completed. Visited {len(self.visited_urls)} pages.")
         logger.info(f"Found {len(self.results['emails'])} email addresses and {len(self.results['phones'])} phone numbers.")
@@ -129,138 +306,624 @@ class WebScrapeService:
     
     def stop(self):
         """Stop the scraping process."""
+        self._stop(self.STOP_STOPPED)
+    
+    @property
+    def crawl_complete(self):
+        """Check the crawl stopped for a reason a repeat crawl would also stop for."""
+        return self.stop_reason in self.COMPLETE_STOP_REASONS
+    
+    def _stop(self, reason):
+        """Stop the crawl, keeping the first reason given."""
+        with self._lock:
+            if self.stop_reason is None:
+                self.stop_reason = reason
         self._stop_event.set()
     
-    def _add_url_to_queue(self, url, depth=0, priority=False):
+    def _record_stop(self):
+        """Record why the crawl loop ended, if nothing stopped it earlier."""
+        if self.stop_reason is not None:
+            return
+        if len(self.visited_urls) >= self.max_pages:
+            self.stop_reason = self.STOP_MAX_PAGES
+        elif self._failed_fetches:
+            self.stop_reason = self.STOP_FETCH_ERRORS
+        else:
+            self.stop_reason = self.STOP_EXHAUSTED
+    
+    def _seed_queue(self):
+        """Queue the target URL and any configured priority paths."""
+        self._add_url_to_queue(self.target_url, depth=0)
+        
+        # Priority paths score above anything found by following links
+        if self.priority_paths:
+            base_url = self.target_url.rstrip('/')
+            for path in self.priority_paths:
+                path = path.lstrip('/')
+                priority_url = f"{base_url}/{path}"
+                self._add_url_to_queue(priority_url, depth=0, priority=True)
+    
+    def _load_robots(self, url):
+        """Load robots.txt rules for a URL's host, from the cache or the network."""
+        rules = self._robots.get(robots_url(url)) or get_cached_rules(url, self.user_agent)
+        if rules is None:
+            status = text = None
+            try:
+                response = requests.get(
+                    robots_url(url),
+                    headers={'User-Agent': self.user_agent},
+                    timeout=self.request_timeout
+                )
+                status, text = response.status_code, response.text
+            except requests.RequestException as e:
+                logger.warning(f"Failed to fetch robots.txt for {url}: {str(e)}")
+            
+            rules, failed = rules_from_response(status, text, self.user_agent)
+            cache_rules(url, self.user_agent, rules, failed)
+        
+        self._apply_robots(url, rules)
+        return rules
+    
+    def _apply_robots(self, url, rules):
+        """Remember a host's robots.txt rules and honor its Crawl-delay."""
+        with self._lock:
+            self._robots[robots_url(url)] = rules
+            if self.follow_robotstxt and rules.crawl_delay:
+                self.url_queue.set_crawl_delay(url, rules.crawl_delay)
+    
+    def _robots_allows(self, url):
+        """
+        Check a URL against its host's robots.txt.
+        
+        Returns:
+            bool: Whether the URL may be fetched, or None if the host's
+                rules haven't been loaded yet
+        """
+        if not self.follow_robotstxt:
+            return True
+        
+        rules = self._robots.get(robots_url(url))
+        if rules is None:
+            rules = get_cached_rules(url, self.user_agent)
+            if rules is None:
+                return None
+            self._apply_robots(url, rules)
+        
+        return rules.is_allowed(url)
+    
+    def _seed_from_sitemaps(self, rules):
+        """Queue the most contact-like pages from the sitemaps listed in robots.txt."""
+        page_urls = []
+        pending = list(rules.sitemaps)
+        fetched = 0
+        
+        while pending and fetched < self.MAX_SITEMAP_FETCHES:
+            sitemap_url = pending.pop(0)
+            fetched += 1
+            try:
+                response = requests.get(
+                    sitemap_url,
+                    headers={'User-Agent': self.user_agent},
+                    timeout=self.request_timeout
+                )
+                response.raise_for_status()
+            except requests.RequestException as e:
+                logger.warning(f"Failed to fetch sitemap {sitemap_url}: {str(e)}")
+                continue
+            
+            pages, sitemaps = parse_sitemap(response.content)
+            page_urls.extend(pages)
+            pending.extend(sitemaps)
+        
+        self._queue_sitemap_urls(page_urls)
+    
+    def _queue_sitemap_urls(self, urls):
+        """Queue the most relevant sitemap URLs ahead of discovered links."""
+        ranked = rank_sitemap_urls(urls, self.target_keywords)[:self.max_pages]
+        logger.debug(f"Seeding {len(ranked)} of {len(urls)} sitemap URLs")
+        
+        for url in ranked:
+            self._add_url_to_queue(url, depth=1, priority=True)
+    
+    def _score_url(self, url, anchor_text='', depth=0, priority=False):
+        """
+        Score a URL by how likely it is to list contacts.
+        
+        Combines keyword hits in the anchor text and path, link depth, and
+        the emails per page seen so far in the same section of the site.
+        """
+        path = urlparse(url).path.lower()
+        anchor_text = anchor_text.lower()
+        
+        score = self.PRIORITY_SCORE if priority else 0.0
+        for keyword in self._score_keywords:
+            if keyword in anchor_text:
+                score += self.ANCHOR_KEYWORD_SCORE
+            if keyword in path:
+                score += self.PATH_KEYWORD_SCORE
+        score -= self.DEPTH_PENALTY * depth
+        
+        pages, emails = self._section_yield.get(self._section_for(url), (0, 0))
+        if pages:
+            score += self.YIELD_SCORE * min(emails / pages, 2.0)
+        
+        return score
+    
+    @staticmethod
+    def _section_for(url):
+        """Return the first path segment of a URL, used to group pages by site section."""
+        return urlparse(url).path.strip('/').split('/', 1)[0].lower()
+    
+    def _record_yield(self, url, new_emails):
+        """
+        Learn how many new emails pages in this URL's section produce, and
+        stop the crawl once pages have kept coming back empty.
+        """
+        with self._lock:
+            section = self._section_yield.setdefault(self._section_for(url), [0, 0])
+            section[0] += 1
+            section[1] += new_emails
+            
+            self._pages_without_contacts = 0 if new_emails else self._pages_without_contacts + 1
+            exhausted = (self.stop_after_unproductive_pages
+                         and self._pages_without_contacts >= self.stop_after_unproductive_pages)
+        
+        if self.crawl_budget:
+            self.crawl_budget.record(self.target_url, new_emails)
+        
+        if exhausted and not self._stop_event.is_set():
+            logger.info(f"Stopping {self.target_url}: no new contacts in the last {self._pages_without_contacts} pages")
+            self._stop(self.STOP_UNPRODUCTIVE)
+    
+    def _acquire_page(self):
+        """Take a page from the shared list budget, stopping the crawl once it is refused."""
+        if self.crawl_budget is None or self.crawl_budget.acquire(self.target_url):
+            return True
+        if not self._stop_event.is_set():
+            logger.info(f"Stopping {self.target_url}: list page budget allocated to other sites")
+            self._stop(self.STOP_BUDGET)
+        return False
+    
+    def _add_url_to_queue(self, url, depth=0, priority=False, anchor_text=''):
         """Add a URL to the processing queue if it hasn't been visited or queued."""
-        # Normalize URL
-        url = url.split('#')[0]  # Remove fragment
-        url = url.rstrip('/')  # Standardize trailing slash
+        # Normalize URL so tracking and formatting variants count as one page
+        url = canonicalize_url(url)
+        
+        # Skip URLs disallowed by robots.txt (unknown hosts are checked before fetching)
+        if self._robots_allows(url) is False:
+            return False
+        
+        # Check if within domain constraint (memoized, so kept outside the lock)
+        if self.stay_within_domain and not self._in_crawl_scope(url):
+            return False
+        
+        # Check if path is excluded
+        for exclude_path in self.exclude_paths:
+            if exclude_path in url:
+                return False
         
         with self._lock:
             if url in self.visited_urls or url in self.queued_urls:
                 return False
             
-            # Check if within domain constraint
-            if self.stay_within_domain:
-                parsed_url = urlparse(url)
-                if not parsed_url.netloc:  # Handle relative URLs
-                    return False
-                
-                # Check domain matching
-                url_domain = self._extract_base_domain(url)
-                if url_domain != self.base_domain:
-                    # If following subdomains, check if subdomain of base
-                    if not (self.follow_subdomains and url_domain.endswith(f".{self.base_domain}")):
-                        return False
-            
-            # Check if path is excluded
-            for exclude_path in self.exclude_paths:
-                if exclude_path in url:
+            # Throttle URL patterns that keep producing new pages
+            penalty = 0.0
+            if self.detect_traps:
+                penalty = self._traps.assess(url)
+                if penalty is None:
+                    logger.debug(f"Skipping likely crawler trap {url}")
                     return False
             
             # Add to queue
             self.queued_urls.add(url)
-            if priority:
-                self.url_queue.appendleft((url, depth, priority))
-            else:
-                self.url_queue.append((url, depth, priority))
+            self.url_queue.push(url, depth, self._score_url(url, anchor_text, depth, priority) - penalty)
             
             return True
     
     def _process_url(self, url, depth):
         """Process a single URL: fetch, extract data, find new links."""
         if self._stop_event.is_set() or len(self.visited_urls) >= self.max_pages:
+            self._complete_fetch(url)
+            return
+        
+        # First URL on a new host, check its robots.txt before fetching
+        if self._robots_allows(url) is None:
+            self._load_robots(url)
+        if not self._robots_allows(url) or not self._acquire_page():
+            self._complete_fetch(url)
             return
         
         logger.debug(f"Processing {url} (depth {depth})")
         
+        status = elapsed = retry_after = None
+        failed = False
         try:
             # Mark as visited early to prevent duplicates
             with self._lock:
                 self.visited_urls.add(url)
                 self.queued_urls.discard(url)
             
-            # Random delay to be polite
-            if self.request_delay > 0:
-                time.sleep(self.request_delay * (0.5 + random.random()))
-            
-            # Make the request
-            headers = {'User-Agent': self.user_agent}
-            response = requests.get(url, headers=headers, timeout=self.request_timeout)
-            
-            # Skip non-HTML responses
-            content_type = response.headers.get('Content-Type', '').lower()
-            if 'text/html' not in content_type:
-                return
-            
-            # Parse HTML content
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Extract contact information
-            self._extract_contact_info(url, soup)
+            # Stream the response so non-HTML bodies are never downloaded
+            headers = {'User-Agent': self.user_agent, **self._conditional_headers(url)}
+            with requests.get(url, headers=headers, timeout=self.request_timeout, stream=True) as response:
+                status = response.status_code
+                elapsed = response.elapsed.total_seconds()
+                retry_after = response.headers.get('Retry-After')
+                
+                # Host is throttling us, try again once it has backed off
+                if status in THROTTLE_STATUSES:
+                    self._requeue_throttled(url, depth)
+                    return
+                
+                # Unchanged since the last crawl, reuse what was found then
+                if status == 304:
+                    self._reuse_unchanged_page(url, depth)
+                    return
+                
+                # Skip non-HTML responses as soon as the headers arrive
+                content_type = response.headers.get('Content-Type', '')
+                if not self._is_html(content_type):
+                    return
+                
+                content = bytearray()
+                for chunk in response.iter_content(chunk_size=self.READ_CHUNK_SIZE):
+                    content += chunk
+                    if len(content) >= self.max_page_bytes:
+                        break
             
-            # Follow links if we haven't reached max depth
-            if depth < self.max_depth:
-                self._extract_links(url, soup, depth + 1)
+            content = self._cap_page_size(url, content)
+            self._archive_page(url, depth, status, response.headers, content)
+            page = self._process_html(url, content, depth, self._declared_charset(content_type))
+            self._remember_page(url, depth, response.headers, page)
                 
         except requests.RequestException as e:
+            failed = True
             logger.warning(f"Request failed for {url}: {str(e)}")
         except Exception as e:
             logger.error(f"Error processing {url}: {str(e)}")
+        finally:
+            self._complete_fetch(url, status, elapsed, retry_after, failed)
+    
+    def _complete_fetch(self, url, status=None, elapsed=None, retry_after=None, failed=False):
+        """Report a fetch outcome to the frontier so it can adapt the host's pace."""
+        with self._lock:
+            self.url_queue.complete(url, status=status, elapsed=elapsed, retry_after=retry_after, failed=failed)
+            if failed:
+                self._failed_fetches += 1
+    
+    def _requeue_throttled(self, url, depth):
+        """Give a throttled URL one more chance once its host has backed off."""
+        with self._lock:
+            if url in self._retried_urls:
+                return
+            self._retried_urls.add(url)
+            self.visited_urls.discard(url)
+            self.queued_urls.add(url)
+            self.url_queue.push(url, depth, self._score_url(url, depth=depth))
     
-    def _extract_contact_info(self, url, soup):
-        """Extract contact information from the page."""
-        # Look for emails in the page content
-        content_text = soup.get_text()
-        page_emails = set(self.email_pattern.findall(content_text))
+    def _archive_page(self, url, depth, status, headers, content):
+        """Keep a copy of a fetched page in the page archive, if enabled."""
+        if self._page_archive is None:
+            return
+        try:
+            self._page_archive.write(url, status, headers, content, target_url=self.target_url, depth=depth)
+        except OSError as e:
+            logger.error(f"Failed to archive {url}: {str(e)}")
+    
+    def _conditional_headers(self, url):
+        """Return If-None-Match/If-Modified-Since headers for a page seen in the last crawl."""
+        record = self.previous_pages.get(url) if self.conditional_requests else None
+        if not record:
+            return {}
         
+        headers = {}
+        if record.get('etag'):
+            headers['If-None-Match'] = record['etag']
+        if record.get('last_modified'):
+            headers['If-Modified-Since'] = record['last_modified']
+        return headers
+    
+    def _remember_page(self, url, depth, headers, page):
+        """Record a page's validators, contacts and links so the next crawl can re-validate it."""
+        if not self.conditional_requests:
+            return
+        etag, last_modified = headers.get('ETag'), headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+        
+        with self._lock:
+            self.page_records[url] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'depth': depth,
+                'emails': page['emails'],
+                'phones': sorted(page['phones']),
+                # Queued again if the page is unchanged, as it won't be parsed then
+                'links': [] if page['duplicate'] else [list(link) for link in page['links']],
+            }
+    
+    def _reuse_unchanged_page(self, url, depth):
+        """Apply the contacts found last crawl on a page that answered 304 Not Modified."""
+        record = self.previous_pages.get(url)
+        if record is None:
+            return
+        
+        with self._lock:
+            self.page_records[url] = dict(record, depth=depth)
+        # Its links are followed as they were last crawl, pages without validators included
+        links = [tuple(link) for link in record.get('links', [])] if depth < self.max_depth else []
+        page = {'blocks': None, 'duplicate': False, 'emails': record['emails'], 'phones': set(record['phones']), 'links': links}
+        self._apply_page(url, depth, page)
+    
+    def _process_html(self, url, content, depth, encoding=None):
+        """
+        Extract contacts and queue links from a fetched HTML page.
+        
+        With a parse pool the page is analyzed in a worker process and this
+        thread only waits for the result.
+        
+        Args:
+            url (str): The page URL
+            content (bytes): The raw response body
+            depth (int): Link depth of the page
+            encoding (str): Declared character encoding, if any
+        
+        Returns:
+            dict: The analyzed page, see _analyze_page
+        """
+        if self.parse_pool is not None:
+            page = self.parse_pool.submit(analyze_page, self._parse_config, url, content, depth, encoding).result()
+        else:
+            page = self._analyze_page(url, content, depth, encoding)
+        self._apply_page(url, depth, page)
+        return page
+    
+    def _analyze_page(self, url, content, depth, encoding=None):
+        """
+        Parse a fetched HTML page and extract its contacts and links.
+        
+        Only reads configuration, never crawl state, so it can run in a
+        parse worker process. The raw bytes are scanned first, so pages
+        without emails or followable links are never decoded or parsed, and
+        a BeautifulSoup tree is only built when names or titles need
+        element context.
+        
+        Args:
+            url (str): The page URL
+            content (bytes): The raw response body
+            depth (int): Link depth of the page
+            encoding (str): Declared character encoding, if any
+        
+        Returns:
+            dict: 'blocks' (text blocks for near-duplicate detection, None if
+                off), 'duplicate' (None until _apply_page checks it), 'emails'
+                (email -> details), 'phones' and 'links' ((url, anchor text) pairs)
+        """
+        page = {'blocks': None, 'duplicate': None, 'emails': {}, 'phones': set(), 'links': []}
+        
+        needs_contacts = bool(self.email_marker_pattern.search(content))
+        needs_links = depth < self.max_depth and bool(self.anchor_marker_pattern.search(content))
+        
+        if not needs_contacts and not needs_links:
+            return page
+        
+        html = self._decode_html(content, encoding)
+        soup = None
+        
+        # Checked against the crawl's other pages once the page is applied
+        if self.detect_traps:
+            page['blocks'] = self._text_blocks(html)
+        
+        # Extract contact information
+        if needs_contacts:
+            if self.extract_names or self.extract_job_titles:
+                soup = BeautifulSoup(html, self.html_parser)
+                # Walk the text nodes once, indexing each email to its surrounding text
+                content_text, email_contexts = self._index_page_text(soup)
+                page_title = str(soup.title.string) if soup.title and soup.title.string else "No Title"
+            else:
+                content_text = self._visible_text(html)
+                email_contexts = {email: [] for email in self.email_pattern.findall(content_text)}
+                title_match = self.page_title_pattern.search(html)
+                page_title = unescape(title_match.group(1)) if title_match else "No Title"
+            
+            page['emails'], page['phones'] = self._extract_contact_info(url, page_title, content_text, email_contexts)
+        
+        # Follow links if we haven't reached max depth
+        if needs_links:
+            if soup is None and self.link_extraction == 'strainer':
+                # Only build the <a href> elements, the rest of the page is skipped
+                soup = BeautifulSoup(html, self.html_parser, parse_only=SoupStrainer('a', href=True))
+            if soup is not None:
+                page['links'] = self._extract_links(url, soup)
+            else:
+                page['links'] = self._extract_links_fast(url, html)
+        
+        return page
+    
+    def _apply_page(self, url, depth, page):
+        """Merge an analyzed page into the crawl: store contacts, learn its yield and queue its links."""
+        if page['duplicate'] is None:
+            page['duplicate'] = page['blocks'] is not None and self._is_near_duplicate(url, page['blocks'])
+        
+        # Store contact information and learn which site sections pay off
+        new_emails = self._store_contact_info(page['emails'], page['phones'])
+        self._record_yield(url, new_emails)
+        
+        # A near-duplicate's contacts still count, but its links lead where the
+        # page it duplicates already did
+        if page['duplicate']:
+            return
+        
+        # The anchor text feeds the score, so contact-like links are fetched first
+        for link, anchor_text in page['links']:
+            self._add_url_to_queue(link, depth + 1, anchor_text=anchor_text)
+    
+    def _is_html(self, content_type):
+        """Check a Content-Type header for an HTML media type."""
+        return content_type.split(';', 1)[0].strip().lower() in self.HTML_CONTENT_TYPES
+    
+    def _declared_charset(self, content_type):
+        """Return the charset declared in a Content-Type header, if any."""
+        match = self.header_charset_pattern.search(content_type)
+        return match.group(1) if match else None
+    
+    def _cap_page_size(self, url, content):
+        """Truncate a streamed body to max_page_bytes."""
+        if len(content) > self.max_page_bytes:
+            logger.debug(f"Truncated {url} to {self.max_page_bytes} bytes")
+        return bytes(content[:self.max_page_bytes])
+    
+    def _decode_html(self, content, encoding=None):
+        """
+        Decode a response body without running charset detection.
+        
+        Uses the charset declared in the headers, then a byte order mark or
+        <meta> charset near the top of the page, then UTF-8. Undecodable
+        bytes are replaced.
+        """
+        if not encoding:
+            if content.startswith(b'\xef\xbb\xbf'):
+                encoding = 'utf-8-sig'
+            else:
+                match = self.meta_charset_pattern.search(content, 0, self.META_CHARSET_SCAN_BYTES)
+                encoding = match.group(1).decode('ascii') if match else 'utf-8'
+        
+        try:
+            return content.decode(encoding, errors='replace')
+        except LookupError:
+            # Unknown charset name
+            return content.decode('utf-8', errors='replace')
+    
+    def _visible_text(self, html):
+        """Strip tags, comments, scripts and styles from raw HTML."""
+        return unescape(self.tag_pattern.sub(' ', self.hidden_content_pattern.sub(' ', html)))
+    
+    def _text_blocks(self, html):
+        """Split a page's visible text into blocks, leaving out navigation, headers, footers and asides."""
+        html = self.boilerplate_element_pattern.sub(' ', self.hidden_content_pattern.sub(' ', html))
+        blocks = (self.whitespace_pattern.sub(' ', unescape(text)).strip() for text in self.tag_pattern.split(html))
+        return [block for block in blocks if block]
+    
+    def _is_near_duplicate(self, url, blocks):
+        """
+        Check whether a page's own content is close to a page already crawled.
+        
+        The site's shared template text is removed first, so pages built
+        from one template are compared by what differs between them.
+        """
+        with self._lock:
+            content = self._boilerplate.main_content(blocks)
+            # Nothing but text from other pages
+            duplicate = not content or self._near_duplicates.check_and_add(simhash(content))
+        if duplicate:
+            logger.debug(f"Not following links of near-duplicate page {url}")
+        return duplicate
+    
+    def _extract_contact_info(self, url, page_title, content_text, email_contexts):
+        """
+        Build contact details for a page's business emails.
+        
+        The name and title heuristics run from the email index, and are
+        skipped for emails already found on earlier pages.
+        
+        Args:
+            url (str): The page URL
+            page_title (str): The page title
+            content_text (str): Visible text of the page
+            email_contexts (dict): Email -> texts of the elements it appears in
+        
+        Returns:
+            tuple: (dict mapping each new email to its details, set of phone numbers)
+        """
         # Filter out webmail addresses
-        business_emails = self._filter_business_emails(page_emails)
+        business_emails = self._filter_business_emails(email_contexts)
         
         # Check if any emails found
         if not business_emails:
-            return
+            return {}, set()
+        
+        emails = {}
+        for email in business_emails:
+            if email in self.results['emails']:
+                continue
+            
+            email_data = {
+                'email': email,
+                'source_url': url,
+                'page_title': page_title,
+            }
+            
+            for parent_text in email_contexts[email]:
+                # Extract name if enabled
+                if self.extract_names:
+                    name_match = self._extract_name_near_email(parent_text, email)
+                    if name_match:
+                        email_data['name'] = name_match
+                
+                # Extract title if enabled
+                if self.extract_job_titles:
+                    title_match = self._extract_title_near_email(parent_text, email)
+                    if title_match:
+                        email_data['title'] = title_match
+            
+            emails[email] = email_data
         
-        # Extract the page title and relevant page text
-        page_title = soup.title.string if soup.title else "No Title"
+        # Extract phone numbers if enabled
+        phones = set()
+        if self.extract_phone_numbers:
+            phones = set(self.phone_pattern.findall(content_text))
+        
+        return emails, phones
+    
+    def _store_contact_info(self, emails, phones):
+        """
+        Record a page's emails and phone numbers in the results.
         
-        # Store emails with associated page details
+        Returns:
+            int: Number of emails not seen on earlier pages
+        """
+        new_emails = 0
         with self._lock:
-            for email in business_emails:
+            # Another page may have found the same email in the meantime
+            for email, email_data in emails.items():
                 if email not in self.results['emails']:
-                    email_data = {
-                        'email': email,
-                        'source_url': url,
-                        'page_title': page_title,
-                    }
-                    
-                    # Try to find name and title near the email
-                    if self.extract_names or self.extract_job_titles:
-                        # Get context around email by finding elements containing the email
-                        for element in soup.find_all(string=re.compile(re.escape(email))):
-                            parent_text = element.parent.get_text()
-                            
-                            # Extract name if enabled
-                            if self.extract_names:
-                                name_match = self._extract_name_near_email(parent_text, email)
-                                if name_match:
-                                    email_data['name'] = name_match
-                            
-                            # Extract title if enabled
-                            if self.extract_job_titles:
-                                title_match = self._extract_title_near_email(parent_text, email)
-                                if title_match:
-                                    email_data['title'] = title_match
-                    
-                    # Store the data
+                    new_emails += 1
                     self.results['emails'][email] = email_data
+            self.results['phones'].update(phones)
         
-        # Extract phone numbers if enabled
-        if self.extract_phone_numbers:
-            phone_numbers = set(self.phone_pattern.findall(content_text))
-            with self._lock:
-                self.results['phones'].update(phone_numbers)
+        return new_emails
+    
+    def _index_page_text(self, soup):
+        """
+        Scan every text node of a page once.
+        
+        Returns:
+            tuple: (page text, dict mapping each email to the texts of the
+                elements it appears in)
+        """
+        texts = []
+        email_contexts = {}
+        parent_texts = {}  # id(parent) -> text, so shared parents are read once
+        want_context = self.extract_names or self.extract_job_titles
+        
+        for text in soup.strings:
+            texts.append(text)
+            if '@' not in text:
+                continue
+            
+            for email in self.email_pattern.findall(text):
+                contexts = email_contexts.setdefault(email, [])
+                if not want_context or text.parent is None:
+                    continue
+                key = id(text.parent)
+                if key not in parent_texts:
+                    parent_texts[key] = text.parent.get_text()
+                if parent_texts[key] not in contexts:
+                    contexts.append(parent_texts[key])
+        
+        # Separate text nodes so emails don't run into neighbouring words
+        return ' '.join(texts), email_contexts
     
     def _filter_business_emails(self, emails):
         """Filter out common webmail addresses to focus on business emails."""
@@ -328,134 +991,109 @@ class WebScrapeService:
         
         return None
     
-    def _extract_links(self, base_url, soup, depth):
-        """Extract links from the page to follow."""
-        # Prioritize links that may contain contact information
-        priority_links = []
-        regular_links = []
+    def _resolve_link(self, base_url, href):
+        """Return the absolute URL of a followable link, or None."""
+        href = href.strip()
         
-        for a_tag in soup.find_all('a', href=True):
-            href = a_tag.get('href', '').strip()
-            
-            # Skip empty links and javascript
-            if not href or href.startswith(('javascript:', 'mailto:', 'tel:')):
-                continue
-            
-            # Convert relative URLs to absolute
-            full_url = urljoin(base_url, href)
-            
-            # Skip non-HTTP protocols
-            if not full_url.startswith(('http://', 'https://')):
-                continue
-            
-            # Check if the link might contain contact information
-            link_text = a_tag.get_text().lower()
-            
-            is_priority = False
-            for keyword in self.target_keywords:
-                if keyword.lower() in link_text or keyword.lower() in full_url.lower():
-                    is_priority = True
-                    break
-            
-            if is_priority:
-                priority_links.append(full_url)
-            else:
-                regular_links.append(full_url)
+        # Skip empty links and javascript
+        if not href or href.startswith(('javascript:', 'mailto:', 'tel:')):
+            return None
+        
+        # Convert relative URLs to absolute
+        full_url = urljoin(base_url, href)
+        
+        # Skip non-HTTP protocols
+        if not full_url.startswith(('http://', 'https://')):
+            return None
+        
+        return full_url
+    
+    def _extract_links(self, base_url, soup):
+        """
+        Extract links to follow from a parsed page.
         
-        # Add priority links first
-        for link in priority_links:
-            self._add_url_to_queue(link, depth, priority=True)
+        Returns:
+            list: (url, anchor text) pairs
+        """
+        links = []
+        for a_tag in soup.find_all('a', href=True):
+            full_url = self._resolve_link(base_url, a_tag.get('href', ''))
+            if full_url:
+                links.append((full_url, a_tag.get_text()))
+        return links
+
+    def _extract_links_fast(self, base_url, html):
+        """
+        Extract links to follow from raw HTML without building a DOM.
         
-        # Then regular links
-        for link in regular_links:
-            self._add_url_to_queue(link, depth, priority=False)
+        Returns:
+            list: (url, anchor text) pairs
+        """
+        links = []
+        for match in self.link_pattern.finditer(html):
+            href = unescape(next(group for group in match.groups()[:3] if group is not None))
+            full_url = self._resolve_link(base_url, href)
+            if full_url:
+                links.append((full_url, unescape(self.tag_pattern.sub('', match.group(4)))))
+        return links
 
-    def create_contacts_from_results(self, company):
+    def create_contacts_from_results(self, company, results=None):
         """
         Create Contact objects from scraping results
         
         Args:
             company: Company object to associate contacts with
+            results: Results of an earlier scrape to use instead of this one's
             
         Returns:
             List of created Contact objects
         """
-        created_contacts = []
+        results = results or self.results
+        records = [(email_data['email'], email_data) for email_data in results['emails'].values()]
         
-        for email_data in self.results['emails'].values():
-            email = email_data['email']
-            
-            # Check if this contact already exists
-            try:
-                contact = Contact.objects.get(email=email)
-                # Update existing contact if needed
-                if not contact.company:
-                    contact.company = company
-                    contact.save()
-                created_contacts.append(contact)
-                continue
-            except Contact.DoesNotExist:
-                pass
-            
-            # Extract name parts if available
-            first_name = ''
-            last_name = ''
-            if 'name' in email_data:
-                name_parts = email_data['name'].split()
-                if name_parts:
-                    first_name = name_parts[0]
-                    if len(name_parts) > 1:
-                        last_name = ' '.join(name_parts[1:])
-            
-            # If no name found, try to get from email
-            if not first_name:
-                username = email.split('@')[0]
-                if '.' in username:
-                    name_parts = username.split('.')
-                    if len(name_parts) >= 2:
-                        first_name = name_parts[0].title()
-                        last_name = name_parts[1].title()
-            
-            # Create the contact
-            contact = Contact(
-                first_name=first_name,
-                last_name=last_name,
-                email=email,
-                position=email_data.get('title', ''),
-                company=company,
-                source_channel=Contact.SourceChannel.SCRAPED,
-                status=Contact.ContactStatus.NEW,
-                organization_name=company.name
-            )
-            contact.save()
-            created_contacts.append(contact)
-        
-        return created_contacts
-
-
-def wait_for_any(futures):
-    """
-    Wait for any of the futures to complete.
-    
-    Args:
-        futures: Set of futures to wait on
-        
-    Returns:
-        Tuple of (done, not_done) futures
-    """
-    if not futures:
-        return set(), set()
+        return bulk_upsert(
+            Contact, 'email', records,
+            build=lambda email, email_data: self._build_contact(company, email, email_data),
+            merge=lambda contact, email_data: self._merge_contact(contact, company),
+            merge_fields=['company'],
+        )
     
-    done = set()
-    while not done:
-        for future in list(futures):
-            if future.done():
-                done.add(future)
-                futures.remove(future)
+    def _build_contact(self, company, email, email_data):
+        """Build an unsaved Contact from a scraped email"""
+        # Extract name parts if available
+        first_name = ''
+        last_name = ''
+        if 'name' in email_data:
+            name_parts = email_data['name'].split()
+            if name_parts:
+                first_name = name_parts[0]
+                if len(name_parts) > 1:
+                    last_name = ' '.join(name_parts[1:])
         
-        if done:
-            break
+        # If no name found, try to get from email
+        if not first_name:
+            username = email.split('@')[0]
+            if '.' in username:
+                name_parts = username.split('.')
+                if len(name_parts) >= 2:
+                    first_name = name_parts[0].title()
+                    last_name = name_parts[1].title()
         
-        time.sleep(0.1)  # Short sleep to avoid CPU spinning
+        return Contact(
+            first_name=first_name,
+            last_name=last_name,
+            email=email,
+            position=email_data.get('title', ''),
+            company=company,
+            source_channel=Contact.SourceChannel.SCRAPED,
+            status=Contact.ContactStatus.NEW,
+            organization_name=company.name
+        )
     
-    return done, futures
\ No newline at end of file
+    def _merge_contact(self, contact, company):
+        """Set an existing Contact's company if missing, return True if updated"""
+        if contact.company_id:
+            return False
+        contact.company = company
+        return True
+
@@ -0,0 +1,203 @@
+import asyncio
+import logging
+import socket
+import time
+from datetime import timedelta
+
+import aiohttp
+from django.conf import settings
+from django.utils import timezone
+
+from companies.domains import hostname
+from companies.models import Company
+
+logger = logging.getLogger(__name__)
+
+
+class WebsiteProbeService:
+    """
+    Checks which company websites are up before they are crawled.
+
+    Each site's hostname is resolved first, so dead domains fail fast, then
+    a HEAD request is sent following redirects, falling back to GET for
+    servers that reject HEAD. Many sites are probed at once on one event loop.
+
+    Failures that may be transient (timeouts, refused connections, 5xx
+    answers, DNS servers not answering) are retried before they count. A
+    website is only recorded as dead once FAILURES_BEFORE_DEAD probes in a
+    row have failed, or at once if its domain doesn't exist.
+    """
+
+    # Statuses some servers answer HEAD with although GET works
+    HEAD_UNSUPPORTED_STATUSES = {403, 404, 405, 501}
+
+    # getaddrinfo errors meaning the domain has no address, as opposed to a lookup that failed
+    NXDOMAIN_ERRNOS = {socket.EAI_NONAME, getattr(socket, 'EAI_NODATA', socket.EAI_NONAME)}
+
+    # Failed probes in a row before a website is recorded as unreachable
+    FAILURES_BEFORE_DEAD = 3
+
+    # Company fields written by probe_companies
+    PROBE_FIELDS = [
+        'website_reachable', 'website_final_url', 'website_status_code',
+        'website_response_time', 'website_probe_error', 'website_checked_at',
+        'website_probe_failures',
+    ]
+
+    def __init__(self, concurrency=200, timeout=10.0, user_agent="Mozilla/5.0 (compatible; CompanyBot/1.0)",
+                 resolver=None, retries=2, retry_delay=1.0):
+        """
+        Args:
+            concurrency (int): Most sites probed at once
+            timeout (float): Seconds allowed for each of the DNS lookup and the request
+            user_agent (str): User agent string to send
+            resolver (aiohttp.abc.AbstractResolver): Optional resolver used for
+                both the DNS check and connections, aiohttp's threaded
+                resolver by default
+            retries (int): Further attempts after a failure that may be transient
+            retry_delay (float): Seconds before the first retry, doubling for each one after
+        """
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.resolver = resolver
+        self.retries = retries
+        self.retry_delay = retry_delay
+
+    @staticmethod
+    def exclude_dead(companies):
+        """
+        Leave out companies whose website a recent probe found dead.
+
+        Probes older than WEBSITE_PROBE_TTL have expired, so those websites
+        are crawled again.
+
+        Args:
+            companies: QuerySet of companies
+
+        Returns:
+            QuerySet: The companies whose website may be up
+        """
+        expired_before = timezone.now() - timedelta(seconds=settings.WEBSITE_PROBE_TTL)
+        return companies.exclude(website_reachable=False, website_checked_at__gte=expired_before)
+
+    def probe_companies(self, companies, batch_size=500):
+        """
+        Probe the websites of companies and record the outcome on each.
+
+        Args:
+            companies: Iterable of Company objects; those without a website are skipped
+            batch_size (int): Companies saved per query
+
+        Returns:
+            dict: 'probed' and 'reachable' site counts
+        """
+        companies = [company for company in companies if company.website_url]
+        results = self.probe([company.website_url for company in companies])
+
+        checked_at = timezone.now()
+        for company, result in zip(companies, results):
+            if result['reachable']:
+                company.website_reachable = True
+                company.website_probe_failures = 0
+            else:
+                company.website_probe_failures += 1
+                dead = result['definitive'] or company.website_probe_failures >= self.FAILURES_BEFORE_DEAD
+                # Unknown until the failure has repeated, so the website is still crawled
+                company.website_reachable = False if dead else None
+            company.website_final_url = result['final_url']
+            company.website_status_code = result['status_code']
+            company.website_response_time = result['response_time']
+            company.website_probe_error = result['error'][:255] if result['error'] else None
+            company.website_checked_at = checked_at
+
+        Company.objects.bulk_update(companies, self.PROBE_FIELDS, batch_size=batch_size)
+
+        reachable = sum(1 for result in results if result['reachable'])
+        logger.info(f"Probed {len(companies)} websites, {reachable} reachable")
+        return {'probed': len(companies), 'reachable': reachable}
+
+    def probe(self, urls):
+        """
+        Probe a list of website URLs.
+
+        Args:
+            urls (list): Website URLs
+
+        Returns:
+            list: One dict per URL, in order, with 'reachable', 'final_url',
+                'status_code', 'response_time' (seconds), 'error' and
+                'definitive' (the failure won't go away by retrying, e.g.
+                the domain doesn't exist)
+        """
+        return asyncio.run(self._probe_all(urls))
+
+    async def _probe_all(self, urls):
+        resolver = self.resolver or aiohttp.ThreadedResolver()
+        limit = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, resolver=resolver, ttl_dns_cache=300)
+
+        async with aiohttp.ClientSession(
+            connector=connector,
+            headers={'User-Agent': self.user_agent},
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        ) as session:
+
+            async def probe_site(url):
+                async with limit:
+                    return await self._probe_url(session, resolver, url)
+
+            return await asyncio.gather(*(probe_site(url) for url in urls))
+
+    async def _probe_url(self, session, resolver, url):
+        """Probe a site, retrying failures that may be transient."""
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(self.retry_delay * 2 ** (attempt - 1))
+            result = await self._probe_once(session, resolver, url)
+            if result['reachable'] or result['definitive']:
+                break
+        return result
+
+    async def _probe_once(self, session, resolver, url):
+        """Resolve a site's hostname and request its URL."""
+        result = {
+            'reachable': False, 'final_url': None, 'status_code': None, 'response_time': None,
+            'error': None, 'definitive': False,
+        }
+
+        if '://' not in url:
+            url = f"http://{url}"
+        host = hostname(url)
+        if not host:
+            result.update(error="Invalid URL", definitive=True)
+            return result
+
+        try:
+            await asyncio.wait_for(resolver.resolve(host, 0, socket.AF_UNSPEC), self.timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            result['error'] = f"DNS lookup failed: {str(e) or type(e).__name__}"
+            result['definitive'] = isinstance(e, socket.gaierror) and e.errno in self.NXDOMAIN_ERRNOS
+            return result
+
+        started = time.monotonic()
+        try:
+            async with session.head(url, allow_redirects=True) as response:
+                status, final_url = response.status, str(response.url)
+            if status in self.HEAD_UNSUPPORTED_STATUSES:
+                # The body is never read, the connection is dropped once the headers arrive
+                async with session.get(url, allow_redirects=True) as response:
+                    status, final_url = response.status, str(response.url)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            result['error'] = f"Request failed: {str(e) or type(e).__name__}"
+            return result
+
+        result.update(
+            # Servers that answer at all are worth crawling, unless they are failing
+            reachable=status < 500,
+            error=f"HTTP {status}" if status >= 500 else None,
+            final_url=final_url,
+            status_code=status,
+            response_time=time.monotonic() - started,
+        )
+        return result
@@ -1,10 +1,19 @@
+from contextlib import nullcontext
+from datetime import timedelta
+
 from huey.contrib.djhuey import task
 from django.conf import settings
 
-from .models import CompanySearch, SerpAPISearchParameters, ContactSearch, WebScrapeParameters 
+from .models import CompanySearch, SerpAPISearchParameters, ContactSearch, WebScrapeParameters, SiteCrawl, SearchCheckpoint
 from .services.serpapi_service import SerpAPIService
 from .services.webscrape_service import WebScrapeService
+from .services.async_webscrape_service import MultiSiteScrapeService
+from .services.website_probe_service import WebsiteProbeService
+from .services.crawl_frontier import CrawlBudget
+from .services.bulk_ingest import link_related
+from .parse_workers import create_parse_pool
 from companies.models import Company
+from companies.domains import normalize_domain
 import logging
 
 logger = logging.getLogger(__name__)
@@ -47,6 +56,9 @@ def execute_webscrape_search(contact_search_id, company_list_id=None):
     """
     Execute a web scrape as a background task
     
+    Progress is checkpointed per company, so enqueueing the task again for
+    the same search resumes it without crawling finished sites again.
+    
     Args:
         contact_search_id: ID of the ContactSearch to process
         company_list_id: Optional ID of a CompanyList to limit scope
@@ -65,15 +77,10 @@ def execute_webscrape_search(contact_search_id, company_list_id=None):
             # If scraping a single website URL directly
             if search_params.target_url:
                 # Try to find a company with this domain
-                from urllib.parse import urlparse
-                parsed_url = urlparse(search_params.target_url)
-                domain = parsed_url.netloc
-                if domain.startswith('www.'):
-                    domain = domain[4:]
+                domain = normalize_domain(search_params.target_url)
                 
                 try:
                     company = Company.objects.get(domain=domain)
-                    companies = [company]
                 except Company.DoesNotExist:
                     # Create a temporary company object for this domain
                     company = Company(
@@ -82,53 +89,167 @@ def execute_webscrape_search(contact_search_id, company_list_id=None):
                         website_url=search_params.target_url
                     )
                     company.save()
-                    companies = [company]
+                companies = Company.objects.filter(pk=company.pk)
             else:
                 # Get all companies with website URLs
-                companies = Company.objects.exclude(website_url__isnull=True).exclude(website_url='')
-        
-        total_contacts = 0
-        
-        # Process each company
-        for company in companies:
-            # Skip companies without websites
-            if not company.website_url:
-                continue
-            
-            # Configure the scraper for this company
-            config = search_params.configuration
-            config['target_url'] = company.website_url
-            
-            # Create and run the scraper
-            scraper = WebScrapeService(config)
-            scraper.start()
-            
-            # Create contacts from results
+                companies = Company.objects.all()
+        
+        # Skip companies without websites
+        companies = companies.exclude(website_url__isnull=True).exclude(website_url='')
+        if company_list_id or not search_params.target_url:
+            # Skip websites probe_company_websites recently found dead, unless one was asked for explicitly
+            companies = WebsiteProbeService.exclude_dead(companies)
+        
+        def link_contacts(company, contacts):
+            """Attach a site's contacts to the search and checkpoint the site as done"""
+            link_related(contact_search.contacts, contacts)
+            SearchCheckpoint.mark_done(contact_search, company, len(contacts))
+        
+        def save_site_results(company, scraper):
+            """Save a finished site's contacts and cache the crawl for other searches"""
+            # Keep the results first, so a crash from here on never means crawling the site again
+            SearchCheckpoint.save_result(contact_search, company, {
+                'emails': scraper.results['emails'],
+                'phones': sorted(scraper.results['phones']),
+            })
             contacts = scraper.create_contacts_from_results(company)
-            
-            # Add contacts to the search
-            for contact in contacts:
-                contact_search.contacts.add(contact)
-            
-            total_contacts += len(contacts)
+            SiteCrawl.record(company.domain, config_key, scraper, contacts)
+            link_contacts(company, contacts)
+            contact_search.update_progress()
+        
+        def mark_site_failed(company, error):
+            """Checkpoint a site whose crawl or save failed, so a resumed search tries it again"""
+            SearchCheckpoint.mark_failed(contact_search, company, str(error))
+        
+        # Crawls of the same sites with the same extraction settings are shared across searches
+        config_key = WebScrapeService.extraction_key(search_params.configuration)
+        # Zero days never reuses a crawl, but still re-validates its pages
+        if search_params.recrawl_after_days is None:
+            max_age = timedelta(seconds=settings.SITE_CRAWL_CACHE_TTL)
+        else:
+            max_age = timedelta(days=search_params.recrawl_after_days)
+        
+        # Companies finished before an interruption are not searched again
+        contact_search.start_progress(companies.count())
+        pending_count = contact_search.companies_total - contact_search.companies_done
+        
+        # Split the list-wide page budget, if any, as sites prove productive
+        budget = None
+        if search_params.list_page_budget:
+            budget = CrawlBudget(search_params.list_page_budget, pending_count, search_params.max_pages)
+        
+        # Page records of earlier crawls, re-validated with conditional requests
+        previous_pages = {}
+        
+        def stale_companies():
+            """Yield the companies left to crawl, linking the contacts of the others on the way"""
+            for chunk, fetched in SearchCheckpoint.pending_chunks(contact_search, companies):
+                site_crawls = {}
+                if not search_params.force_refresh:
+                    site_crawls = {
+                        site_crawl.domain: site_crawl
+                        for site_crawl in SiteCrawl.objects.filter(
+                            domain__in=[company.domain for company in chunk], config_key=config_key
+                        ).prefetch_related('contacts')
+                    }
+                
+                stale = []
+                for company in chunk:
+                    site_crawl = site_crawls.get(company.domain)
+                    if company.pk in fetched:
+                        # Crawled before an interruption, only the contacts are left to save
+                        scraper = WebScrapeService(search_params.configuration)
+                        link_contacts(company, scraper.create_contacts_from_results(company, fetched[company.pk]))
+                    elif site_crawl and max_age and site_crawl.is_reusable(max_age):
+                        # Link the contacts of a recent crawl instead of crawling again
+                        link_contacts(company, list(site_crawl.contacts.all()))
+                    else:
+                        stale.append(company)
+                        if site_crawl:
+                            previous_pages[company.domain] = site_crawl.pages
+                        continue
+                    # Counted in the list budget, so give back the share it won't crawl
+                    if budget is not None:
+                        budget.finish(company.website_url)
+                if len(stale) < len(chunk):
+                    logger.info(f"Reusing earlier crawls of {len(chunk) - len(stale)} websites")
+                contact_search.update_progress()
+                
+                yield from stale
+        
+        # One parse worker pool, if enabled, serves every company
+        parse_processes = search_params.parse_processes
+        with (create_parse_pool(parse_processes) if parse_processes else nullcontext()) as parse_pool:
+            if search_params.crawl_engine == WebScrapeParameters.CrawlEngine.ASYNC:
+                # Crawl sites concurrently on one event loop, starting the next as each
+                # finishes and saving its contacts
+                service = MultiSiteScrapeService(
+                    search_params.configuration,
+                    on_site_complete=save_site_results,
+                    on_site_failed=mark_site_failed,
+                    previous_pages=previous_pages,
+                    crawl_budget=budget,
+                    parse_pool=parse_pool,
+                )
+                service.start(stale_companies())
+            else:
+                # Process each company
+                for company in stale_companies():
+                    # Configure the scraper for this company
+                    config = search_params.configuration
+                    config['target_url'] = company.website_url
+                    
+                    # Create and run the scraper, continuing with other companies if it fails
+                    try:
+                        scraper = WebScrapeService(config, budget, parse_pool, previous_pages.pop(company.domain, None))
+                        scraper.start()
+                        
+                        save_site_results(company, scraper)
+                    except Exception as e:
+                        logger.error(f"Error scraping {company.website_url}: {str(e)}")
+                        mark_site_failed(company, e)
         
-        # Update results count
-        contact_search.results_count = total_contacts
-        contact_search.save()
+        contact_search.finish_progress()
         
-        return f"Found {total_contacts} contacts for search #{contact_search_id}"
+        return f"Found {contact_search.results_count} contacts for search #{contact_search_id}"
         
     except Exception as e:
         # Log the error
         print(f"Error executing web scrape search #{contact_search_id}: {str(e)}")
+        ContactSearch.objects.filter(id=contact_search_id).update(status=ContactSearch.SearchStatus.FAILED)
         # Re-raise to mark task as failed
         raise
 
+@task()
+def probe_company_websites(company_list_id=None, unchecked_only=False, concurrency=200, timeout=10.0):
+    """
+    Check which company websites are reachable, so web scrapes can skip dead ones
+    
+    Args:
+        company_list_id: ID of a CompanyList to probe (all companies with a website if omitted)
+        unchecked_only: Only probe websites that were never checked
+        concurrency: Most websites probed at once
+        timeout: Seconds allowed for each DNS lookup and request
+    """
+    companies = Company.objects.exclude(website_url__isnull=True).exclude(website_url='')
+    if company_list_id:
+        companies = companies.filter(company_lists__id=company_list_id)
+    if unchecked_only:
+        companies = companies.filter(website_checked_at__isnull=True)
+    
+    summary = WebsiteProbeService(concurrency=concurrency, timeout=timeout).probe_companies(
+        companies.only('id', 'website_url', 'website_probe_failures')
+    )
+    return f"{summary['reachable']} of {summary['probed']} websites reachable"
+
 @task()
 def execute_hunter_search(contact_search_id, domain=None, company=None, company_list_id=None):
     """
     Execute a Hunter.io domain search as a background task
     
+    List searches are checkpointed per company, so enqueueing the task again
+    for the same search resumes it without repeating any API call.
+    
     Args:
         contact_search_id: ID of the ContactSearch to process
         domain: Domain to search (if specific domain)
@@ -153,49 +274,70 @@ def execute_hunter_search(contact_search_id, domain=None, company=None, company_
             contact_search.save()
         
         # Create Hunter service
-        hunter_service = HunterService()
-        
-        # Track total contacts found
-        total_contacts = 0
+        hunter_service = HunterService(use_cache=not search_params.no_cache)
+        
+        search_kwargs = dict(
+            limit=search_params.limit,
+            offset=search_params.offset,
+            email_type=search_params.type if search_params.type != 'all' else None,
+            seniority=search_params.seniority_levels,
+            department=search_params.departments,
+            required_fields=search_params.required_fields
+        )
+        if search_params.paginate:
+            search_kwargs.update(max_results=search_params.max_results, max_credits=search_params.max_credits)
         
         # Process either a single domain/company or all domains in a list
         if company_list_id:
-            # Get all companies from the list
+            # Get the companies from the list, skipping companies without domains
             company_list = CompanyList.objects.get(id=company_list_id)
-            companies = company_list.companies.all()
+            companies = company_list.companies.exclude(domain__isnull=True).exclude(domain='')
             
-            # Process each company
-            for company_obj in companies:
-                # Skip companies without domains
-                if not company_obj.domain:
-                    continue
-                
-                # Execute domain search for this company
+            # Companies finished before an interruption are not searched again
+            contact_search.start_progress(companies.count())
+            
+            def save_company_results(company_obj, results):
+                """Merge a company's Hunter results into contacts and checkpoint it as done"""
                 try:
-                    logger.info(f"Searching Hunter for company {company_obj.name} (domain: {company_obj.domain})")
-                    results = hunter_service.domain_search(
-                        domain=company_obj.domain,
-                        limit=search_params.limit,
-                        offset=search_params.offset,
-                        email_type=search_params.type if search_params.type != 'all' else None,
-                        seniority=search_params.seniority_levels,
-                        department=search_params.departments,
-                        required_fields=search_params.required_fields
-                    )
-                    
                     # Create contacts from results
                     contacts = hunter_service.create_contacts_from_results(results, company_obj)
                     
                     # Add contacts to the search
-                    for contact in contacts:
-                        contact_search.contacts.add(contact)
+                    link_related(contact_search.contacts, contacts)
                     
-                    total_contacts += len(contacts)
+                    SearchCheckpoint.mark_done(contact_search, company_obj, len(contacts))
                     logger.info(f"Found {len(contacts)} contacts for {company_obj.name}")
                 except Exception as e:
-                    logger.error(f"Error searching Hunter for company {company_obj.name}: {str(e)}")
-                    # Continue with other companies
-                    continue
+                    logger.error(f"Error saving Hunter results for company {company_obj.name}: {str(e)}")
+                    SearchCheckpoint.mark_failed(contact_search, company_obj, str(e))
+                contact_search.update_progress()
+            
+            for chunk, fetched in SearchCheckpoint.pending_chunks(contact_search, companies):
+                # Results paid for before an interruption are used as they are
+                by_domain = {}
+                for company_obj in chunk:
+                    if company_obj.pk in fetched:
+                        save_company_results(company_obj, fetched[company_obj.pk])
+                    else:
+                        by_domain[company_obj.domain] = company_obj
+                
+                logger.info(f"Searching Hunter for {len(by_domain)} companies")
+                searches = hunter_service.domain_search_many(
+                    list(by_domain), paginate=search_params.paginate, **search_kwargs
+                )
+                # Merge each company's results as soon as its search finishes
+                for search_domain, results, error in searches:
+                    company_obj = by_domain[search_domain]
+                    if error is not None:
+                        logger.error(f"Error searching Hunter for company {company_obj.name}: {str(error)}")
+                        # Continue with other companies
+                        SearchCheckpoint.mark_failed(contact_search, company_obj, str(error))
+                        contact_search.update_progress()
+                        continue
+                    
+                    # Keep the paid results first, so a crash from here on never repeats the call
+                    SearchCheckpoint.save_result(contact_search, company_obj, results)
+                    save_company_results(company_obj, results)
         else:
             # Search for a specific domain or company
             domain_param = domain or search_params.domain
@@ -214,37 +356,33 @@ def execute_hunter_search(contact_search_id, domain=None, company=None, company_
             search_value = domain_param if domain_param else company_param
             logger.info(f"Searching Hunter by {search_type}: {search_value}")
             
-            # Execute domain search
-            results = hunter_service.domain_search(
-                domain=domain_param,
-                company=company_param,
-                limit=search_params.limit,
-                offset=search_params.offset,
-                email_type=search_params.type if search_params.type != 'all' else None,
-                seniority=search_params.seniority_levels,
-                department=search_params.departments,
-                required_fields=search_params.required_fields
-            )
-            
-            # Create contacts from results
-            contacts = hunter_service.create_contacts_from_results(results, company_obj)
+            # Execute domain search, following every page if asked to
+            if search_params.paginate:
+                pages = hunter_service.domain_search_pages(domain=domain_param, company=company_param, **search_kwargs)
+            else:
+                pages = [hunter_service.domain_search(domain=domain_param, company=company_param, **search_kwargs)]
             
-            # Add contacts to the search
-            for contact in contacts:
-                contact_search.contacts.add(contact)
+            # Save each page as it arrives
+            contact_count = 0
+            for results in pages:
+                # Create contacts from results
+                contacts = hunter_service.create_contacts_from_results(results, company_obj)
+                
+                # Add contacts to the search
+                link_related(contact_search.contacts, contacts)
+                contact_count += len(contacts)
             
-            total_contacts = len(contacts)
-            logger.info(f"Found {total_contacts} contacts for {search_type} {search_value}")
+            logger.info(f"Found {contact_count} contacts for {search_type} {search_value}")
         
         # Update results count
-        contact_search.results_count = total_contacts
-        contact_search.save()
+        contact_search.finish_progress()
         
-        return f"Found {total_contacts} contacts for Hunter search #{contact_search_id}"
+        return f"Found {contact_search.results_count} contacts for Hunter search #{contact_search_id}"
         
     except Exception as e:
         # Log the error
         logger.error(f"Error executing Hunter search #{contact_search_id}: {str(e)}")
+        ContactSearch.objects.filter(id=contact_search_id).update(status=ContactSearch.SearchStatus.FAILED)
         # Re-raise to mark task as failed
         raise
 
@@ -1,131 +1,1504 @@
-#!/usr/bin/env python
-import os
-import sys
-import logging
-import json
-from datetime import datetime
-
-# Set up Django environment
-import django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'leads_generator.settings')
-django.setup()
-
-# Import models
-from finder.models import CompanySearch, SerpAPISearchParameters
-from finder.services import SerpAPIService
-
-# Import the debug service
-from .tasks import debug_execute_serpapi_search
-import logging
-
-logger = logging.getLogger(__name__)
-# Add a file handler for persistent logging
-log_filename = f'serpapi_debug_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'
-file_handler = logging.FileHandler(log_filename)
-file_handler.setLevel(logging.DEBUG)
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-file_handler.setFormatter(formatter)
-logger.addHandler(file_handler)
-
-def test_direct_pagination():
+import gzip
+import socket
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from aiohttp.abc import AbstractResolver
+from bs4 import BeautifulSoup, SoupStrainer
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+import requests
+
+from companies.models import Company, CompanyList
+from finder.models import ContactSearch, HunterDomainSearchParameters, SearchCheckpoint, SiteCrawl, WebScrapeParameters
+from finder.parse_workers import analyze_page, create_parse_pool
+from finder.services.async_webscrape_service import AsyncWebScrapeService, MultiSiteScrapeService
+from finder.services.crawl_frontier import CrawlBudget, CrawlFrontier
+from finder.services.crawl_traps import BoilerplateFilter, NearDuplicateIndex, TrapDetector, simhash
+from finder.services.hunter_service import HunterService
+from finder.services.page_archive import PageArchive, read_archive
+from finder.services.provider_cache import ProviderCache
+from finder.services.rate_limiter import RateLimiter
+from finder.services.robots_service import RobotsRules, parse_sitemap, rank_sitemap_urls
+from finder.services.seen_urls import BloomFilter, UrlFingerprintSet, canonicalize_url
+from finder.services.webscrape_service import WebScrapeService, resolve_html_parser
+from finder.services.website_probe_service import WebsiteProbeService
+from finder.tasks import execute_hunter_search, execute_webscrape_search
+
+USER_AGENT = "Mozilla/5.0 (compatible; CompanyBot/1.0)"
+
+
+class LocalSite:
     """
-    Test the pagination directly without using the task
+    A site served from memory on a local port, for crawling in tests.
+
+    Pages are a dict of path -> HTML, or path -> (status, headers, body).
+    Unknown paths answer 404. Every request's method and path is logged,
+    and its headers.
     """
-    try:
-        # Ask user for company search ID
-        if len(sys.argv) > 1:
-            company_search_id = int(sys.argv[1])
-        else:
-            company_search_id = int(input("Enter CompanySearch ID: "))
-        
-        # Ask user for max results (optional)
-        max_results_input = input("Enter max results (leave empty for all): ")
-        max_results = int(max_results_input) if max_results_input.strip() else None
-        
-        logger.info(f"Testing direct pagination with company_search_id={company_search_id}, max_results={max_results}")
-        
-        # Get the CompanySearch and search parameters
-        company_search = CompanySearch.objects.get(id=company_search_id)
-        logger.info(f"Found CompanySearch: {company_search}")
-        
-        search_params = SerpAPISearchParameters.objects.get(company_search=company_search)
-        logger.info(f"Found SerpAPISearchParameters: query={search_params.query}, place_name={search_params.place_name}")
-        
-        # Create service and execute search
-        service = SerpAPIService()
-        
-        # Test getting one page first (for comparison)
-        logger.info("Testing single page search first")
-        single_page = service.search_companies(search_params)
-        
-        # Save the response to a file for inspection
-        with open('serpapi_response_single.json', 'w') as f:
-            json.dump(single_page, f, indent=2)
-        
-        if "local_results" in single_page:
-            local_results_count = len(single_page.get("local_results", []))
-            logger.info(f"Single page search returned {local_results_count} local results")
-        else:
-            logger.warning("No local_results in single page response")
-        
-        # Now test the multi-page search
-        logger.info("Testing multi-page search")
-        results = service.search_all_pages(search_params, max_results=max_results)
-        
-        logger.info(f"Multi-page search returned {len(results) if results else 0} total results")
-        
-        # Save the first and last 3 results to a file for inspection
-        with open('serpapi_results_sample.json', 'w') as f:
-            if results and len(results) > 0:
-                sample = {
-                    "first_three": results[:min(3, len(results))],
-                    "last_three": results[-min(3, len(results)):],
-                    "total_count": len(results)
-                }
-            else:
-                sample = {"error": "No results found"}
-            json.dump(sample, f, indent=2)
-        
-        logger.info(f"Test completed. Log saved to {log_filename}")
-        
-    except Exception as e:
-        logger.error(f"Error during test: {str(e)}", exc_info=True)
-        
-def test_task_execution():
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requests = []
+        self.request_headers = []
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def respond(self, send_body):
+                site.requests.append((self.command, self.path))
+                site.request_headers.append(dict(self.headers))
+                page = site.pages.get(self.path)
+                if callable(page):
+                    page = page()
+                if page is None:
+                    status, headers, body = 404, {}, b''
+                elif isinstance(page, tuple):
+                    status, headers, body = page
+                else:
+                    status, headers, body = 200, {'Content-Type': 'text/html; charset=utf-8'}, page.encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(body)
+
+            def do_GET(self):
+                self.respond(True)
+
+            def do_HEAD(self):
+                self.respond(False)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        # A page that raises drops the connection, without a traceback
+        self.server.handle_error = lambda request, client_address: None
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class StandInResolver(AbstractResolver):
+    """Resolves every host to 127.0.0.1, except those given a getaddrinfo error."""
+
+    def __init__(self, errors=None):
+        self.errors = errors or {}  # host -> EAI_* error number
+
+    async def resolve(self, host, port=0, family=socket.AF_INET):
+        if host in self.errors:
+            raise socket.gaierror(self.errors[host], "Stand-in lookup failure")
+        return [{
+            'hostname': host, 'host': '127.0.0.1', 'port': port,
+            'family': socket.AF_INET, 'proto': 0, 'flags': socket.AI_NUMERICHOST,
+        }]
+
+    async def close(self):
+        pass
+
+
+def responses(*pages):
+    """A LocalSite page answering with each of pages in turn, then the last one again."""
+    pages = list(pages)
+    return lambda: pages.pop(0) if len(pages) > 1 else pages[0]
+
+
+def templated_team_site(member_count=12, other_page_count=18):
     """
-    Test the task execution with debugging
+    Pages of a site built from one template: a shared 30-link nav and
+    footer around short team pages that each list one email.
     """
-    try:
-        # Ask user for company search ID
-        if len(sys.argv) > 1:
-            company_search_id = int(sys.argv[1])
-        else:
-            company_search_id = int(input("Enter CompanySearch ID: "))
-        
-        # Ask user for max results (optional)
-        max_results_input = input("Enter max results (leave empty for all): ")
-        max_results = int(max_results_input) if max_results_input.strip() else None
-        
-        logger.info(f"Testing task execution with company_search_id={company_search_id}, max_results={max_results}")
-        
-        # Execute the task directly (not via Huey)
-        result = debug_execute_serpapi_search(company_search_id, max_results)
-        
-        logger.info(f"Task execution result: {result}")
-        logger.info(f"Test completed. Log saved to {log_filename}")
-        
-    except Exception as e:
-        logger.error(f"Error during task test: {str(e)}", exc_info=True)
-
-def run():
-    print(f"Log file: {log_filename}")
-    print("1. Test direct pagination")
-    print("2. Test task execution")
-    choice = input("Choose a test (1/2): ")
-    
-    if choice == "1":
-        test_direct_pagination()
-    elif choice == "2":
-        test_task_execution()
-    else:
-        print("Invalid choice")
\ No newline at end of file
+    members = [f"member{i}" for i in range(member_count)]
+    nav_paths = [f"/team/{name}" for name in members] + [f"/services/{i}" for i in range(other_page_count)]
+    nav = '<nav><ul>' + ''.join(f'<li><a href="{path}">{path.rsplit("/", 1)[-1].title()}</a></li>' for path in nav_paths) + '</ul></nav>'
+    # Divs rather than semantic elements, as many templates use
+    header = '<div class="site-header"><h2>Acme Consulting Group</h2><p>Advice for growing businesses since 1990</p></div>'
+    footer = (
+        '<div class="site-footer"><p>Acme Consulting Group, 100 Main Street, Springfield</p>'
+        '<p>Copyright Acme Consulting Group. All rights reserved. Privacy policy and terms of use.</p></div>'
+    )
+
+    def page(title, body):
+        return f"<html><head><title>{title}</title></head><body>{header}{nav}<main>{body}</main>{footer}</body></html>"
+
+    pages = {'/': page("Acme", "<h1>Welcome to Acme</h1><p>We help businesses grow.</p>")}
+    for name in members:
+        pages[f"/team/{name}"] = page(
+            name.title(),
+            f"<h1>{name.title()}</h1><p>{name.title()} is a consultant at Acme.</p><p>Email {name}@acme.test</p>",
+        )
+    for i in range(other_page_count):
+        pages[f"/services/{i}"] = page(f"Service {i}", f"<h1>Service {i}</h1><p>Our service number {i}.</p>")
+    return pages, [f"{name}@acme.test" for name in members]
+
+
+def crawl(site, crawl_budget=None, previous_pages=None, **config):
+    """Crawl a LocalSite with WebScrapeService, returning the finished scraper."""
+    scraper = WebScrapeService({
+        'target_url': site.url + '/',
+        'max_pages': 50,
+        'max_depth': 2,
+        'request_delay': 0,
+        'concurrent_requests': 4,
+        'use_sitemaps': False,
+        'adaptive_throttling': False,
+        **config,
+    }, crawl_budget, previous_pages=previous_pages)
+    scraper.start()
+    return scraper
+
+
+def linked_pages(count):
+    """Pages of a site whose home page links to count pages, each with one email."""
+    pages = {'/': '<html><body>' + ''.join(f'<a href="/p{i}">Page {i}</a>' for i in range(count)) + '</body></html>'}
+    for i in range(count):
+        pages[f"/p{i}"] = f"<html><body><p>Write to person{i}@acme.test</p></body></html>"
+    return pages
+
+
+def analyze(html, depth=0, url="https://acme.test/team", **config):
+    """Analyze one page the way a crawl of acme.test would, without fetching it."""
+    scraper = WebScrapeService({'target_url': "https://acme.test/", **config})
+    return scraper._analyze_page(url, html if isinstance(html, bytes) else html.encode(), depth)
+
+SITEMAP = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://example.com/</loc></url>
+  <url><loc>https://example.com/contact</loc></url>
+</urlset>"""
+
+SITEMAP_INDEX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://example.com/sitemap-pages.xml</loc></sitemap>
+</sitemapindex>"""
+
+
+class RobotsRulesTests(SimpleTestCase):
+    def test_longest_match_wins_and_allow_wins_ties(self):
+        rules = RobotsRules.parse(
+            "User-agent: *\nDisallow: /private\nAllow: /private/team\nDisallow: /x\nAllow: /x\n",
+            USER_AGENT,
+        )
+        self.assertFalse(rules.is_allowed("https://example.com/private/files"))
+        self.assertTrue(rules.is_allowed("https://example.com/private/team/jane"))
+        self.assertTrue(rules.is_allowed("https://example.com/x"))
+        self.assertTrue(rules.is_allowed("https://example.com/about"))
+
+    def test_wildcards_and_end_anchor(self):
+        rules = RobotsRules.parse("User-agent: *\nDisallow: /*.pdf$\nDisallow: /*?sort=\n", USER_AGENT)
+        self.assertFalse(rules.is_allowed("https://example.com/files/report.pdf"))
+        self.assertTrue(rules.is_allowed("https://example.com/files/report.pdf.html"))
+        self.assertFalse(rules.is_allowed("https://example.com/list?sort=name"))
+
+    def test_most_specific_agent_group_is_used(self):
+        rules = RobotsRules.parse(
+            "User-agent: *\nDisallow: /\n\nUser-agent: CompanyBot\nDisallow: /admin\nCrawl-delay: 2\n",
+            USER_AGENT,
+        )
+        self.assertTrue(rules.is_allowed("https://example.com/contact"))
+        self.assertFalse(rules.is_allowed("https://example.com/admin"))
+        self.assertEqual(rules.crawl_delay, 2.0)
+
+    def test_robots_txt_is_always_allowed_and_sitemaps_are_listed(self):
+        rules = RobotsRules.parse("Sitemap: https://example.com/sitemap.xml\nUser-agent: *\nDisallow: /\n", USER_AGENT)
+        self.assertTrue(rules.is_allowed("https://example.com/robots.txt"))
+        self.assertFalse(rules.is_allowed("https://example.com/"))
+        self.assertEqual(rules.sitemaps, ["https://example.com/sitemap.xml"])
+
+
+class ParseSitemapTests(SimpleTestCase):
+    def test_sitemap_and_index(self):
+        self.assertEqual(parse_sitemap(SITEMAP), (["https://example.com/", "https://example.com/contact"], []))
+        self.assertEqual(parse_sitemap(SITEMAP_INDEX), ([], ["https://example.com/sitemap-pages.xml"]))
+
+    def test_gzipped_sitemap(self):
+        self.assertEqual(parse_sitemap(gzip.compress(SITEMAP))[0][1], "https://example.com/contact")
+
+    def test_corrupt_or_truncated_gzip_yields_nothing(self):
+        compressed = gzip.compress(SITEMAP)
+        self.assertEqual(parse_sitemap(compressed[:len(compressed) // 2]), ([], []))
+        self.assertEqual(parse_sitemap(b'\x1f\x8b' + b'not gzip at all'), ([], []))
+
+    def test_oversized_sitemap_yields_nothing(self):
+        self.assertEqual(parse_sitemap(gzip.compress(SITEMAP), max_bytes=100), ([], []))
+        self.assertEqual(parse_sitemap(SITEMAP, max_bytes=100), ([], []))
+
+    def test_invalid_xml_yields_nothing(self):
+        self.assertEqual(parse_sitemap(b"<urlset><url>"), ([], []))
+
+    def test_rank_sitemap_urls(self):
+        urls = ["https://example.com/blog/post", "https://example.com/about", "https://example.com/contact-us"]
+        self.assertEqual(rank_sitemap_urls(urls), ["https://example.com/contact-us", "https://example.com/about"])
+
+
+class NearDuplicateTests(SimpleTestCase):
+    def test_simhash_distance(self):
+        text = "Our team of consultants helps growing businesses plan, hire and expand into new markets. " * 3
+        self.assertLessEqual((simhash(text) ^ simhash(text + " Call us.")).bit_count(), 3)
+        self.assertGreater((simhash(text) ^ simhash("Quarterly report on regional sales figures and costs")).bit_count(), 3)
+
+    def test_near_duplicate_index(self):
+        index = NearDuplicateIndex(max_distance=3)
+        self.assertFalse(index.check_and_add(0b1111))
+        self.assertTrue(index.check_and_add(0b1000))
+        self.assertFalse(index.check_and_add(0b1111 << 20))
+
+    def test_boilerplate_filter_removes_blocks_shared_by_earlier_pages(self):
+        boilerplate = BoilerplateFilter()
+        self.assertEqual(boilerplate.main_content(["Home", "About", "Page one"]), "Home About Page one")
+        self.assertEqual(boilerplate.main_content(["Home", "About", "Page two"]), "Home About Page two")
+        self.assertEqual(boilerplate.main_content(["Home", "About", "Page three"]), "Page three")
+        # A page repeating only shared text has no content of its own
+        self.assertEqual(boilerplate.main_content(["Home", "About"]), "")
+
+
+class TrapDetectorTests(SimpleTestCase):
+    def test_ordinary_urls_are_not_penalized(self):
+        traps = TrapDetector()
+        for path in ["/", "/about", "/team", "/team/jane", "/contact"]:
+            self.assertEqual(traps.assess(f"https://example.com{path}"), 0)
+
+    def test_urls_differing_in_numbers_are_penalized_then_dropped(self):
+        traps = TrapDetector()
+        scores = [traps.assess(f"https://example.com/calendar/2024/{day}") for day in range(1, 61)]
+        self.assertEqual(scores[:TrapDetector.PATTERN_SOFT_LIMIT], [0] * TrapDetector.PATTERN_SOFT_LIMIT)
+        self.assertEqual(scores[TrapDetector.PATTERN_SOFT_LIMIT], TrapDetector.PATTERN_PENALTY)
+        self.assertIsNone(scores[TrapDetector.PATTERN_HARD_LIMIT])
+        # Other sections of the site are unaffected
+        self.assertEqual(traps.assess("https://example.com/team/jane"), 0)
+
+    def test_repeating_and_deep_paths_are_dropped(self):
+        traps = TrapDetector()
+        self.assertIsNone(traps.assess("https://example.com/a/b/a/b/a/c"))
+        self.assertIsNone(traps.assess("https://example.com/" + "/".join(f"s{i}" for i in range(13))))
+
+    def test_faceted_query_variants_are_dropped(self):
+        traps = TrapDetector()
+        scores = [traps.assess(f"https://example.com/products?colour=c{i}&size=s{i}") for i in range(30)]
+        self.assertNotIn(None, scores[:TrapDetector.MAX_QUERY_VARIANTS])
+        self.assertIsNone(scores[TrapDetector.MAX_QUERY_VARIANTS])
+
+
+class TemplatedSiteCrawlTests(SimpleTestCase):
+    """Near-duplicate detection must never cost the contacts of templated pages."""
+
+    def crawl(self, site, **config):
+        return crawl(site, **config)
+
+    def test_team_pages_sharing_a_template_keep_their_contacts(self):
+        pages, emails = templated_team_site()
+        with LocalSite(pages) as site:
+            scraper = self.crawl(site, detect_traps=True, stop_after_unproductive_pages=10)
+        self.assertEqual(sorted(scraper.results['emails']), sorted(emails))
+
+    def test_same_results_as_without_trap_detection(self):
+        pages, emails = templated_team_site()
+        with LocalSite(pages) as site:
+            with_traps = self.crawl(site, detect_traps=True)
+            without_traps = self.crawl(site, detect_traps=False)
+        self.assertEqual(sorted(with_traps.results['emails']), sorted(without_traps.results['emails']))
+
+    def test_near_duplicates_are_extracted_but_their_links_not_followed(self):
+        body = "".join(
+            f"<p>Section {i}: our consulting team helps growing businesses plan, hire staff and expand into new markets.</p>"
+            for i in range(20)
+        )
+        pages = {
+            '/': f'<html><body>{body}<a href="/copy">Copy</a></body></html>',
+            '/copy': f'<html><body>{body}<p>sales@acme.test</p><a href="/hidden">Hidden</a></body></html>',
+            '/hidden': '<html><body><p>hidden@acme.test</p></body></html>',
+        }
+        with LocalSite(pages) as site:
+            scraper = self.crawl(site, detect_traps=True)
+        self.assertIn('sales@acme.test', scraper.results['emails'])
+        self.assertNotIn('hidden@acme.test', scraper.results['emails'])
+
+
+class CrawlStopReasonTests(SimpleTestCase):
+    def test_exhausted_frontier_is_complete(self):
+        with LocalSite(linked_pages(3)) as site:
+            scraper = crawl(site)
+        self.assertEqual(scraper.stop_reason, WebScrapeService.STOP_EXHAUSTED)
+        self.assertTrue(scraper.crawl_complete)
+
+    def test_max_pages_is_complete(self):
+        with LocalSite(linked_pages(5)) as site:
+            scraper = crawl(site, max_pages=2, concurrent_requests=1)
+        self.assertEqual(scraper.stop_reason, WebScrapeService.STOP_MAX_PAGES)
+        self.assertTrue(scraper.crawl_complete)
+
+    def test_list_page_budget_is_incomplete(self):
+        with LocalSite(linked_pages(5)) as site:
+            scraper = crawl(site, crawl_budget=CrawlBudget(2, 1), concurrent_requests=1)
+        self.assertEqual(scraper.stop_reason, WebScrapeService.STOP_BUDGET)
+        self.assertFalse(scraper.crawl_complete)
+
+    def test_failed_fetches_are_incomplete(self):
+        def broken():
+            raise ConnectionResetError()
+
+        pages = linked_pages(2)
+        pages['/p1'] = broken
+        with LocalSite(pages) as site, self.assertLogs('finder.services.webscrape_service', 'WARNING'):
+            scraper = crawl(site)
+        self.assertEqual(scraper.stop_reason, WebScrapeService.STOP_FETCH_ERRORS)
+        self.assertFalse(scraper.crawl_complete)
+
+
+class SiteCrawlTests(TestCase):
+    max_age = timedelta(days=7)
+
+    def record(self, **config):
+        with LocalSite(linked_pages(5)) as site:
+            scraper = crawl(site, concurrent_requests=1, **config)
+        return SiteCrawl.record('acme.test', 'key', scraper, [])
+
+    def test_complete_crawl_is_reused_until_stale(self):
+        site_crawl = self.record()
+        self.assertTrue(site_crawl.complete)
+        self.assertEqual(len(site_crawl.results['emails']), 5)
+        self.assertTrue(site_crawl.is_reusable(self.max_age))
+
+        site_crawl.crawled_at = timezone.now() - timedelta(days=8)
+        self.assertFalse(site_crawl.is_reusable(self.max_age))
+
+    def test_crawl_cut_short_by_the_list_budget_is_not_reused(self):
+        site_crawl = self.record(crawl_budget=CrawlBudget(2, 1))
+        self.assertEqual(site_crawl.stop_reason, WebScrapeService.STOP_BUDGET)
+        self.assertFalse(site_crawl.is_reusable(self.max_age))
+
+
+class ExtractionKeyTests(SimpleTestCase):
+    config = {'max_pages': 50, 'request_delay': 1.0, 'list_page_budget': None, 'html_parser': 'lxml'}
+
+    def test_settings_that_bound_coverage_change_the_key(self):
+        key = WebScrapeService.extraction_key(self.config)
+        for setting, value in [
+            ('max_pages', 10),
+            ('list_page_budget', 1000),
+            ('html_parser', 'html.parser'),
+            ('link_extraction', 'regex'),
+            ('max_page_bytes', 1024),
+            ('user_agent', 'OtherBot/1.0'),
+        ]:
+            with self.subTest(setting=setting):
+                self.assertNotEqual(WebScrapeService.extraction_key(dict(self.config, **{setting: value})), key)
+
+    def test_pacing_settings_share_the_key(self):
+        key = WebScrapeService.extraction_key(self.config)
+        self.assertEqual(WebScrapeService.extraction_key(dict(self.config, request_delay=5.0, concurrent_requests=2)), key)
+
+
+class ContactExtractionTests(SimpleTestCase):
+    people = [("Anna Smith", "asmith"), ("Brian Jones", "bjones"), ("Clara Brown", "cbrown")]
+
+    def directory(self, count):
+        rows = ''.join(
+            f"<li><span>{name}</span>, sales manager, {user}{i}@acme.test</li>"
+            for i in range(count) for name, user in [self.people[i % len(self.people)]]
+        )
+        return f"<html><head><title>Our team</title></head><body><ul>{rows}</ul></body></html>"
+
+    def test_each_email_gets_the_name_and_title_around_it(self):
+        # At max depth, so only contacts are extracted
+        page = analyze(self.directory(3), depth=2)
+        self.assertEqual(
+            {email: (details['name'], details['title']) for email, details in page['emails'].items()},
+            {f"{user}{i}@acme.test": (name, "manager") for i, (name, user) in enumerate(self.people)},
+        )
+        self.assertEqual(page['emails']["asmith0@acme.test"]['page_title'], "Our team")
+
+    def test_tree_searches_do_not_grow_with_the_number_of_emails(self):
+        # Searching the tree for each email made large directories quadratic
+        def searches(count):
+            with mock.patch.object(BeautifulSoup, 'find_all', autospec=True, side_effect=BeautifulSoup.find_all) as find_all:
+                self.assertEqual(len(analyze(self.directory(count), depth=2)['emails']), count)
+            return find_all.call_count
+
+        self.assertEqual(searches(200), searches(3))
+
+    def test_webmail_and_already_found_emails_are_left_out(self):
+        scraper = WebScrapeService({'target_url': "https://acme.test/"})
+        scraper.results['emails']["known@acme.test"] = {'email': "known@acme.test"}
+        html = "<p>Jane Doe jane@gmail.com</p><p>known@acme.test</p><p>new@acme.test</p>"
+        page = scraper._analyze_page("https://acme.test/", html.encode(), 2)
+        self.assertEqual(list(page['emails']), ["new@acme.test"])
+
+class PagePrefilterTests(SimpleTestCase):
+    def test_page_without_emails_or_links_is_never_decoded(self):
+        with mock.patch.object(WebScrapeService, '_decode_html') as decode_html:
+            page = analyze("<html><body><p>Nothing to see here</p></body></html>")
+        decode_html.assert_not_called()
+        self.assertEqual((page['emails'], page['links']), ({}, []))
+
+    def test_links_are_skipped_at_max_depth(self):
+        html = '<a href="/contact">Contact</a> sales@acme.test'
+        self.assertEqual(analyze(html, depth=1)['links'], [("https://acme.test/contact", "Contact")])
+        page = analyze(html, depth=2)
+        self.assertEqual((list(page['emails']), page['links']), (["sales@acme.test"], []))
+
+    def test_no_tree_is_built_without_name_or_title_extraction(self):
+        html = '<html><head><title>Caf&eacute;</title></head><body><p>sales@acme.test</p><a href="/team">Team</a></body></html>'
+        with mock.patch('finder.services.webscrape_service.BeautifulSoup') as soup:
+            page = analyze(html, extract_names=False, extract_job_titles=False)
+        soup.assert_not_called()
+        self.assertEqual(page['emails']["sales@acme.test"]['page_title'], "Café")
+        self.assertEqual(page['links'], [("https://acme.test/team", "Team")])
+
+
+class PageDecodingTests(SimpleTestCase):
+    def title(self, content, encoding=None, **config):
+        scraper = WebScrapeService({'target_url': "https://acme.test/", 'extract_names': False, **config})
+        page = scraper._analyze_page("https://acme.test/", content, 2, encoding)
+        return page['emails']["info@acme.test"]['page_title']
+
+    def test_meta_charset_is_used(self):
+        for meta in (b'<meta charset="iso-8859-1">', b'<meta http-equiv="Content-Type" content="text/html; charset=windows-1252">'):
+            content = b'<html><head>' + meta + b'<title>Caf\xe9 M\xfcller</title></head><body>info@acme.test</body></html>'
+            self.assertEqual(self.title(content), "Café Müller")
+
+    def test_declared_header_charset_wins(self):
+        content = '<meta charset="utf-8"><title>Café</title> info@acme.test'.encode('cp1252')
+        self.assertEqual(self.title(content, encoding='cp1252'), "Café")
+
+    def test_utf8_by_default_and_with_a_byte_order_mark(self):
+        content = '<title>Café</title> info@acme.test'.encode()
+        self.assertEqual(self.title(content), "Café")
+        self.assertEqual(self.title(b'\xef\xbb\xbf' + content), "Café")
+
+    def test_unknown_charset_falls_back_to_utf8(self):
+        content = '<meta charset="no-such-charset"><title>Café</title> info@acme.test'.encode()
+        self.assertEqual(self.title(content), "Café")
+
+    def test_charset_is_read_near_the_top_only(self):
+        content = b'<title>Caf\xc3\xa9</title> info@acme.test' + b' ' * 5000 + b'<meta charset="iso-8859-1">'
+        self.assertEqual(self.title(content), "Café")
+
+class HtmlParserTests(SimpleTestCase):
+    links_page = (
+        '<html><body><nav><a href="/about">About &amp; history</a> <a href=\'/team\'><b>Our</b> team</a></nav>'
+        '<a href=/contact>Contact</a> <a href="tel:+15550100">Call</a> <a href="javascript:void(0)">Menu</a>'
+        '<a href="https://other.test/">Partner</a></body></html>'
+    )
+    expected_links = [
+        ("https://acme.test/about", "About & history"),
+        ("https://acme.test/team", "Our team"),
+        ("https://acme.test/contact", "Contact"),
+        ("https://other.test/", "Partner"),
+    ]
+
+    def test_missing_parser_falls_back_to_html_parser(self):
+        self.assertEqual(resolve_html_parser('html.parser'), 'html.parser')
+        with self.assertLogs('finder.services.webscrape_service', 'WARNING'):
+            self.assertEqual(resolve_html_parser('no-such-parser'), 'html.parser')
+
+    def test_scan_and_strainer_find_the_same_links(self):
+        self.assertEqual(analyze(self.links_page)['links'], self.expected_links)
+        self.assertEqual(analyze(self.links_page, link_extraction='strainer')['links'], self.expected_links)
+
+    def test_strainer_parses_only_links_with_the_configured_parser(self):
+        with mock.patch('finder.services.webscrape_service.BeautifulSoup', wraps=BeautifulSoup) as soup:
+            analyze(self.links_page, link_extraction='strainer', html_parser='html.parser')
+        soup.assert_called_once()
+        self.assertEqual(soup.call_args.args[1], 'html.parser')
+        self.assertIsInstance(soup.call_args.kwargs['parse_only'], SoupStrainer)
+
+    def test_pages_needing_context_are_parsed_whole(self):
+        with mock.patch('finder.services.webscrape_service.BeautifulSoup', wraps=BeautifulSoup) as soup:
+            page = analyze(self.links_page + "<p>Jane Doe, sales@acme.test</p>", link_extraction='strainer')
+        # One full tree serves both the contacts and the links
+        soup.assert_called_once()
+        self.assertNotIn('parse_only', soup.call_args.kwargs)
+        self.assertEqual(page['links'], self.expected_links)
+        self.assertIn("sales@acme.test", page['emails'])
+
+class StreamingFetchTests(SimpleTestCase):
+    pages = {
+        '/': (
+            '<html><body><a href="/brochure.pdf">Brochure</a> <a href="/video">Video</a> '
+            '<a href="/team">Team</a> <a href="/big">Big</a></body></html>'
+        ),
+        '/brochure.pdf': (200, {'Content-Type': 'application/pdf'}, b'%PDF-1.4 pdf@acme.test'),
+        '/video': (200, {'Content-Type': 'video/mp4'}, b'video@acme.test' + b'\0' * 100000),
+        '/team': (200, {'Content-Type': 'application/xhtml+xml; charset=utf-8'}, b'<html><body>team@acme.test</body></html>'),
+        '/big': (
+            200, {'Content-Type': 'text/html'},
+            b'<html><body>top@acme.test' + b'<p>filler</p>' * 2000 + b'bottom@acme.test</body></html>',
+        ),
+    }
+
+    def assert_fetched_pages(self, service_class):
+        with LocalSite(self.pages) as site:
+            scraper = service_class({
+                'target_url': site.url + '/', 'request_delay': 0, 'use_sitemaps': False,
+                'adaptive_throttling': False, 'max_page_bytes': 10000,
+            })
+            scraper.start()
+
+        # Non-HTML responses are dropped once their headers arrive, and big pages cut short
+        self.assertEqual(sorted(scraper.results['emails']), ["team@acme.test", "top@acme.test"])
+        self.assertIn(('GET', '/brochure.pdf'), site.requests)
+
+    def test_only_html_is_read_up_to_the_size_cap(self):
+        self.assert_fetched_pages(WebScrapeService)
+
+    def test_only_html_is_read_up_to_the_size_cap_async(self):
+        self.assert_fetched_pages(AsyncWebScrapeService)
+
+    def test_cap_page_size(self):
+        scraper = WebScrapeService({'target_url': "https://acme.test/", 'max_page_bytes': 4})
+        self.assertEqual(scraper._cap_page_size("https://acme.test/", bytearray(b'abcdef')), b'abcd')
+        self.assertEqual(scraper._cap_page_size("https://acme.test/", bytearray(b'ab')), b'ab')
+
+    def test_content_types(self):
+        scraper = WebScrapeService({'target_url': "https://acme.test/"})
+        self.assertTrue(scraper._is_html('Text/HTML; charset=UTF-8'))
+        self.assertTrue(scraper._is_html('application/xhtml+xml'))
+        self.assertFalse(scraper._is_html('application/pdf'))
+        self.assertFalse(scraper._is_html(''))
+        self.assertEqual(scraper._declared_charset('text/html; charset="iso-8859-1"'), 'iso-8859-1')
+        self.assertIsNone(scraper._declared_charset('text/html'))
+
+class ParsePoolTests(SimpleTestCase):
+    config = {'request_delay': 0, 'use_sitemaps': False, 'adaptive_throttling': False}
+
+    def assert_parsed_in_pool(self, service_class, **config):
+        with LocalSite(linked_pages(3)) as site, \
+                mock.patch.object(WebScrapeService, '_analyze_page', side_effect=AssertionError("parsed in the crawl")):
+            scraper = service_class({'target_url': site.url + '/', **self.config, **config})
+            scraper.start()
+        self.assertEqual(sorted(scraper.results['emails']), [f"person{i}@acme.test" for i in range(3)])
+
+    def test_pages_are_parsed_in_worker_processes(self):
+        self.assert_parsed_in_pool(WebScrapeService, parse_processes=1)
+
+    def test_pages_are_parsed_in_worker_processes_async(self):
+        self.assert_parsed_in_pool(AsyncWebScrapeService, parse_processes=1)
+
+    def test_shared_pool_serves_several_sites(self):
+        with create_parse_pool(1) as parse_pool, LocalSite(linked_pages(1)) as first, LocalSite(linked_pages(2)) as second:
+            results = []
+            for site in (first, second):
+                scraper = WebScrapeService({'target_url': site.url + '/', **self.config}, parse_pool=parse_pool)
+                scraper.start()
+                results.append(sorted(scraper.results['emails']))
+        self.assertEqual(results, [["person0@acme.test"], ["person0@acme.test", "person1@acme.test"]])
+
+    def test_worker_entry_point_matches_the_scraper(self):
+        config = {'max_depth': 2, 'extract_names': True}
+        content = b'<p>Jane Doe, jane.doe@acme.test</p><a href="/team">Team</a>'
+        page = analyze_page(config, "https://acme.test/", content, 0)
+        self.assertEqual(page, analyze(content, url="https://acme.test/", **config))
+        self.assertEqual(page['emails']["jane.doe@acme.test"]['name'], "Jane Doe")
+
+class WebsiteProbeTests(SimpleTestCase):
+    def probe(self, site, path, errors=None, host='acme.test'):
+        service = WebsiteProbeService(timeout=5.0, resolver=StandInResolver(errors), retries=2, retry_delay=0)
+        return service.probe([f"http://{host}:{site.server.server_port}{path}"])[0]
+
+    def test_head(self):
+        with LocalSite({'/': '<html></html>'}) as site:
+            result = self.probe(site, '/')
+        self.assertTrue(result['reachable'])
+        self.assertEqual(result['status_code'], 200)
+        self.assertEqual(site.requests, [('HEAD', '/')])
+
+    def test_get_when_head_is_rejected(self):
+        pages = {'/': responses((405, {}, b''), '<html></html>')}
+        with LocalSite(pages) as site:
+            result = self.probe(site, '/')
+        self.assertTrue(result['reachable'])
+        self.assertEqual(site.requests, [('HEAD', '/'), ('GET', '/')])
+
+    def test_redirects_are_followed(self):
+        with LocalSite({'/': (301, {'Location': '/home'}, b''), '/home': '<html></html>'}) as site:
+            result = self.probe(site, '/')
+        self.assertTrue(result['reachable'])
+        self.assertEqual(result['final_url'], f"http://acme.test:{site.server.server_port}/home")
+
+    def test_missing_domain_is_definitive_and_not_retried(self):
+        with LocalSite({}) as site:
+            result = self.probe(site, '/', errors={'acme.test': socket.EAI_NONAME})
+        self.assertFalse(result['reachable'])
+        self.assertTrue(result['definitive'])
+        self.assertIn("DNS lookup failed", result['error'])
+        self.assertEqual(site.requests, [])
+
+    def test_failed_dns_lookup_is_not_definitive(self):
+        with LocalSite({}) as site:
+            result = self.probe(site, '/', errors={'acme.test': socket.EAI_AGAIN})
+        self.assertFalse(result['reachable'])
+        self.assertFalse(result['definitive'])
+
+    def test_server_errors_are_retried(self):
+        with LocalSite({'/': (503, {}, b'')}) as site:
+            result = self.probe(site, '/')
+        self.assertFalse(result['reachable'])
+        self.assertFalse(result['definitive'])
+        self.assertEqual(result['status_code'], 503)
+        self.assertEqual(len(site.requests), 3)
+
+    def test_recovery_after_a_server_error(self):
+        with LocalSite({'/': responses((503, {}, b''), '<html></html>')}) as site:
+            result = self.probe(site, '/')
+        self.assertTrue(result['reachable'])
+        self.assertEqual(site.requests, [('HEAD', '/'), ('HEAD', '/')])
+
+
+class WebsiteLivenessTests(TestCase):
+    def setUp(self):
+        self.company = Company.objects.create(name="Acme", domain="acme.test", website_url="http://acme.test/")
+
+    def probe(self, site, errors=None):
+        self.company.website_url = f"http://acme.test:{site.server.server_port}/"
+        service = WebsiteProbeService(timeout=5.0, resolver=StandInResolver(errors), retries=0)
+        service.probe_companies([self.company])
+        self.company.refresh_from_db()
+
+    def test_website_is_dead_only_after_repeated_failures(self):
+        with LocalSite({'/': (503, {}, b'')}) as site:
+            for failures in range(1, WebsiteProbeService.FAILURES_BEFORE_DEAD):
+                self.probe(site)
+                self.assertIsNone(self.company.website_reachable)
+                self.assertEqual(self.company.website_probe_failures, failures)
+            self.probe(site)
+        self.assertIs(self.company.website_reachable, False)
+
+    def test_success_resets_failures(self):
+        with LocalSite({'/': responses((503, {}, b''), '<html></html>')}) as site:
+            self.probe(site)
+            self.probe(site)
+        self.assertIs(self.company.website_reachable, True)
+        self.assertEqual(self.company.website_probe_failures, 0)
+
+    def test_missing_domain_is_dead_at_once(self):
+        with LocalSite({}) as site:
+            self.probe(site, errors={'acme.test': socket.EAI_NONAME})
+        self.assertIs(self.company.website_reachable, False)
+
+    @override_settings(WEBSITE_PROBE_TTL=60 * 60)
+    def test_dead_websites_are_excluded_until_the_probe_expires(self):
+        Company.objects.filter(pk=self.company.pk).update(website_reachable=False, website_checked_at=timezone.now())
+        self.assertFalse(WebsiteProbeService.exclude_dead(Company.objects.all()).exists())
+
+        Company.objects.filter(pk=self.company.pk).update(website_checked_at=timezone.now() - timedelta(hours=2))
+        self.assertTrue(WebsiteProbeService.exclude_dead(Company.objects.all()).exists())
+
+    def test_explicitly_requested_website_is_crawled_even_if_dead(self):
+        with LocalSite({'/': '<html><body>sales@acme.test</body></html>'}) as site:
+            url = f"http://127.0.0.1:{site.server.server_port}/"
+            Company.objects.create(
+                name="Local", domain="127.0.0.1", website_url=url,
+                website_reachable=False, website_checked_at=timezone.now(),
+            )
+            contact_search = ContactSearch.objects.create(method=ContactSearch.ContactSearchMethods.SCRAPE)
+            WebScrapeParameters.objects.create(
+                contact_search=contact_search, target_url=url, request_delay=0, use_sitemaps=False,
+            )
+            execute_webscrape_search.call_local(contact_search.id)
+        self.assertEqual(list(contact_search.contacts.values_list('email', flat=True)), ['sales@acme.test'])
+
+
+class MultiSiteScrapeTests(SimpleTestCase):
+    def test_sites_are_started_as_others_finish(self):
+        def slow_page():
+            time.sleep(1)
+            return '<html><body>slow@acme.test</body></html>'
+
+        events = []
+
+        def companies(sites):
+            for name, site in sites:
+                events.append(('started', name))
+                yield Company(name=name, domain=name, website_url=site.url + '/')
+
+        def on_site_complete(company, scraper):
+            events.append(('finished', company.name))
+
+        with LocalSite({'/': slow_page}) as slow, LocalSite(linked_pages(1)) as fast:
+            sites = [('slow', slow)] + [(f"fast{i}", fast) for i in range(4)]
+            service = MultiSiteScrapeService(
+                {'concurrent_requests': 1, 'global_concurrent_requests': 2, 'request_delay': 0,
+                 'use_sitemaps': False, 'max_depth': 1},
+                on_site_complete=on_site_complete,
+            )
+            crawled = service.start(companies(sites))
+
+        self.assertEqual(crawled, 5)
+        # Two sites run at a time, the fast ones taking turns beside the slow one
+        self.assertLess(events.index(('finished', 'fast0')), events.index(('started', 'fast2')))
+        self.assertEqual(events[-1], ('finished', 'slow'))
+
+
+class SearchCheckpointTests(TestCase):
+    def setUp(self):
+        self.contact_search = ContactSearch.objects.create(method=ContactSearch.ContactSearchMethods.HUNTER)
+        self.company_list = CompanyList.objects.create(name="Prospects")
+        self.companies = [Company.objects.create(name=name, domain=f"{name}.test") for name in ("alpha", "beta")]
+        self.company_list.companies.add(*self.companies)
+
+    def pending(self):
+        return [
+            company.domain
+            for chunk, fetched in SearchCheckpoint.pending_chunks(self.contact_search, Company.objects.all())
+            for company in chunk
+        ]
+
+    def test_failed_companies_are_retried_up_to_max_attempts(self):
+        alpha, beta = self.companies
+        SearchCheckpoint.mark_done(self.contact_search, alpha, 0)
+        for attempt in range(1, SearchCheckpoint.MAX_ATTEMPTS):
+            SearchCheckpoint.mark_failed(self.contact_search, beta, "Hunter timed out")
+            self.assertEqual(self.pending(), ["beta.test"])
+        SearchCheckpoint.mark_failed(self.contact_search, beta, "Hunter timed out")
+        self.assertEqual(self.pending(), [])
+        self.assertEqual(SearchCheckpoint.objects.get(company=beta).attempts, SearchCheckpoint.MAX_ATTEMPTS)
+
+    def test_progress_counts_done_and_given_up_companies(self):
+        alpha, beta = self.companies
+        SearchCheckpoint.mark_failed(self.contact_search, alpha, "Hunter timed out")
+        self.contact_search.update_progress()
+        self.assertEqual(self.contact_search.companies_done, 0)
+
+        SearchCheckpoint.mark_done(self.contact_search, alpha, 1)
+        for attempt in range(SearchCheckpoint.MAX_ATTEMPTS):
+            SearchCheckpoint.mark_failed(self.contact_search, beta, "Hunter timed out")
+        self.contact_search.update_progress()
+        self.assertEqual(self.contact_search.companies_done, 2)
+
+    def test_results_are_kept_through_a_failure(self):
+        alpha, beta = self.companies
+        SearchCheckpoint.save_result(self.contact_search, alpha, {'data': {'emails': []}})
+        SearchCheckpoint.mark_failed(self.contact_search, alpha, "Database went away")
+        [(chunk, fetched)] = SearchCheckpoint.pending_chunks(self.contact_search, Company.objects.all())
+        self.assertEqual(fetched, {alpha.pk: {'data': {'emails': []}}})
+
+    @override_settings(HUNTER_API_KEY='test-key')
+    def test_resumed_hunter_search_retries_failed_companies(self):
+        HunterDomainSearchParameters.objects.create(contact_search=self.contact_search)
+        searched = []
+
+        def domain_search_many(service, domains, paginate=False, **search_kwargs):
+            for domain in domains:
+                searched.append(domain)
+                if domain == "beta.test" and searched.count(domain) == 1:
+                    yield domain, None, ConnectionError("Hunter timed out")
+                else:
+                    yield domain, {'data': {'emails': [{'value': f"info@{domain}", 'type': 'generic'}]}}, None
+
+        with mock.patch.object(HunterService, 'domain_search_many', domain_search_many):
+            with self.assertLogs('finder.tasks', 'ERROR'):
+                execute_hunter_search.call_local(self.contact_search.id, company_list_id=self.company_list.id)
+            execute_hunter_search.call_local(self.contact_search.id, company_list_id=self.company_list.id)
+
+        self.assertEqual(searched, ["alpha.test", "beta.test", "beta.test"])
+        self.assertEqual(
+            sorted(self.contact_search.contacts.values_list('email', flat=True)),
+            ["info@alpha.test", "info@beta.test"],
+        )
+
+
+class CanonicalizeUrlTests(SimpleTestCase):
+    def test_equivalent_urls_share_a_canonical_form(self):
+        canonical = "https://example.com/team?a=1&b=2"
+        for url in [
+            "HTTPS://Example.COM:443/team/?b=2&a=1",
+            "https://example.com/team?a=1&utm_source=news&b=2#staff",
+            "https://example.com./team;jsessionid=ABC123?gclid=x&a=1&b=2",
+        ]:
+            with self.subTest(url=url):
+                self.assertEqual(canonicalize_url(url), canonical)
+
+    def test_meaningful_differences_are_kept(self):
+        self.assertEqual(canonicalize_url("http://example.com:8080/team"), "http://example.com:8080/team")
+        self.assertNotEqual(canonicalize_url("https://example.com/team?page=2"), canonicalize_url("https://example.com/team"))
+        self.assertNotEqual(canonicalize_url("http://example.com/"), canonicalize_url("https://example.com/"))
+
+
+class SeenUrlSetTests(SimpleTestCase):
+    urls = [f"https://example.com/page/{i}" for i in range(2000)]
+
+    def test_fingerprint_set(self):
+        seen = UrlFingerprintSet()
+        seen.add(self.urls[0])
+        self.assertIn(self.urls[0], seen)
+        self.assertNotIn(self.urls[1], seen)
+        seen.discard(self.urls[0])
+        self.assertEqual(len(seen), 0)
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        seen = BloomFilter(len(self.urls))
+        for url in self.urls:
+            seen.add(url)
+        self.assertTrue(all(url in seen for url in self.urls))
+        self.assertEqual(len(seen), len(self.urls))
+
+    def test_bloom_filter_false_positive_rate(self):
+        seen = BloomFilter(len(self.urls), error_rate=0.01)
+        for url in self.urls:
+            seen.add(url)
+        false_positives = sum(f"https://example.com/other/{i}" in seen for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+class CrawlFrontierSchedulingTests(SimpleTestCase):
+    def test_host_waits_its_delay_between_fetches(self):
+        frontier = CrawlFrontier(request_delay=1.0, adaptive=False)
+        frontier.push("https://a.test/1", 0)
+        frontier.push("https://a.test/2", 0)
+        frontier.push("https://b.test/1", 0)
+
+        first = frontier.pop_ready(now=0)
+        second = frontier.pop_ready(now=0)
+        self.assertEqual({first[0], second[0]}, {"https://a.test/1", "https://b.test/1"})
+        frontier.complete(first[0])
+        frontier.complete(second[0])
+
+        # Jitter puts the next fetch between half and one and a half delays away
+        self.assertIsNone(frontier.pop_ready(now=0.4))
+        self.assertEqual(frontier.pop_ready(now=1.6)[0], "https://a.test/2")
+        self.assertFalse(frontier)
+
+    def test_requests_in_flight_are_limited_per_host(self):
+        frontier = CrawlFrontier(request_delay=0, max_concurrency=2, adaptive=False)
+        for i in range(3):
+            frontier.push(f"https://a.test/{i}", 0)
+        self.assertIsNotNone(frontier.pop_ready(now=0))
+        self.assertIsNotNone(frontier.pop_ready(now=0))
+        self.assertIsNone(frontier.pop_ready(now=0))
+
+        frontier.complete("https://a.test/0", status=200)
+        self.assertEqual(frontier.pop_ready(now=0)[0], "https://a.test/2")
+
+    def test_next_ready_delay(self):
+        frontier = CrawlFrontier(request_delay=0, adaptive=False)
+        self.assertIsNone(frontier.next_ready_delay(now=0))
+        frontier.push("https://a.test/", 0)
+        self.assertEqual(frontier.next_ready_delay(now=0), 0)
+
+
+class AdaptiveThrottlingTests(SimpleTestCase):
+    url = "https://a.test/"
+
+    def setUp(self):
+        self.frontier = CrawlFrontier(request_delay=1.0, max_concurrency=8, adaptive=True)
+        self.host = self.frontier.host_state(self.url)
+
+    def test_healthy_responses_add_parallelism_and_trim_the_delay(self):
+        self.assertEqual(self.host.concurrency, 1)
+        for _ in range(1 + 2 + 3):
+            self.frontier.complete(self.url, status=200, elapsed=0.1)
+        self.assertEqual(self.host.concurrency, 4)
+        self.assertLess(self.host.delay, 1.0)
+        self.assertGreaterEqual(self.host.delay, 1.0 * CrawlFrontier.MIN_DELAY_FACTOR)
+
+    def test_throttling_halves_parallelism_and_doubles_the_delay(self):
+        self.host.concurrency = 8
+        for status in (429, 503):
+            with self.subTest(status=status):
+                delay = self.host.delay
+                concurrency = self.host.concurrency
+                self.frontier.complete(self.url, status=status)
+                self.assertEqual(self.host.concurrency, concurrency // 2)
+                self.assertEqual(self.host.delay, delay * 2)
+
+        self.frontier.complete(self.url, failed=True)
+        self.assertEqual(self.host.concurrency, 1)
+
+    def test_slow_responses_hold_parallelism(self):
+        self.frontier.complete(self.url, status=200, elapsed=0.2)
+        concurrency = self.host.concurrency
+        self.frontier.complete(self.url, status=200, elapsed=2.0)
+        self.assertEqual(self.host.concurrency, concurrency)
+        self.assertEqual(self.host.successes, 0)
+
+    def test_retry_after_is_honored(self):
+        self.frontier.push(self.url, 0)
+        self.frontier.complete(self.url, status=429, retry_after="30")
+        self.assertGreater(self.host.next_fetch_at, time.monotonic() + 29)
+        self.assertIsNone(self.frontier.pop_ready())
+
+    def test_crawl_delay_is_a_floor(self):
+        self.frontier.set_crawl_delay(self.url, 5.0)
+        for _ in range(20):
+            self.frontier.complete(self.url, status=200, elapsed=0.1)
+        self.assertEqual(self.host.delay, 5.0)
+
+
+class CrawlPriorityTests(SimpleTestCase):
+    def test_highest_score_first_then_insertion_order(self):
+        frontier = CrawlFrontier(request_delay=0, adaptive=False)
+        for url, score in [("https://a.test/blog", 0), ("https://a.test/news", 0), ("https://a.test/team", 7), ("https://a.test/contact", 9)]:
+            frontier.push(url, 1, score)
+
+        order = []
+        while frontier:
+            url, depth, score = frontier.pop_ready(now=0)
+            frontier.complete(url)
+            order.append(url)
+        self.assertEqual(order, ["https://a.test/contact", "https://a.test/team", "https://a.test/blog", "https://a.test/news"])
+
+    def test_contact_pages_score_above_other_pages(self):
+        scraper = WebScrapeService({'target_url': "https://a.test/"})
+        contact = scraper._score_url("https://a.test/contact-us", anchor_text="Contact us", depth=1)
+        blog = scraper._score_url("https://a.test/blog/launch", anchor_text="Our launch", depth=1)
+        deep_contact = scraper._score_url("https://a.test/contact-us", anchor_text="Contact us", depth=3)
+        self.assertGreater(contact, blog)
+        self.assertGreater(contact, deep_contact)
+        self.assertGreater(scraper._score_url("https://a.test/blog", priority=True), contact)
+
+    def test_productive_sections_score_higher(self):
+        scraper = WebScrapeService({'target_url': "https://a.test/"})
+        people = scraper._score_url("https://a.test/people/jane")
+        blog = scraper._score_url("https://a.test/blog/post")
+        scraper._record_yield("https://a.test/people/john", 2)
+        self.assertGreater(scraper._score_url("https://a.test/people/jane"), people)
+        self.assertEqual(scraper._score_url("https://a.test/blog/post"), blog)
+
+
+class CrawlBudgetTests(SimpleTestCase):
+    def take(self, budget, site, pages, new_contacts=0):
+        taken = 0
+        for _ in range(pages):
+            if not budget.acquire(site):
+                break
+            budget.record(site, new_contacts)
+            taken += 1
+        return taken
+
+    def test_each_site_gets_its_share(self):
+        budget = CrawlBudget(30, 3)
+        self.assertEqual([self.take(budget, site, 10) for site in "abc"], [10, 10, 10])
+        self.assertFalse(budget.acquire("a"))
+
+    def test_share_is_capped_by_max_pages(self):
+        budget = CrawlBudget(100, 2, max_pages_per_site=20)
+        self.assertEqual(budget.share, 20)
+
+    def test_spare_pages_go_to_productive_sites_only(self):
+        # 20 pages nobody has reserved
+        budget = CrawlBudget(40, 2, max_pages_per_site=10)
+        # Nothing found in the last PRODUCTIVE_WINDOW (10) pages
+        self.assertEqual(self.take(budget, "dry", 50), 10)
+        self.assertEqual(self.take(budget, "productive", 50, new_contacts=1), 30)
+        self.assertEqual(budget.spent, 40)
+
+    def test_finished_sites_return_their_unused_share(self):
+        budget = CrawlBudget(20, 2)
+        self.take(budget, "a", 4)
+        budget.finish("a")
+        self.assertFalse(budget.acquire("a"))
+        self.assertEqual(self.take(budget, "b", 50, new_contacts=1), 16)
+
+    def test_total_is_never_exceeded_across_threads(self):
+        budget = CrawlBudget(100, 4)
+
+        def crawl_site(site):
+            self.take(budget, site, 200, new_contacts=1)
+
+        threads = [threading.Thread(target=crawl_site, args=(site,)) for site in "abcd"]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(budget.spent, 100)
+
+
+class PageArchiveTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = self.directory.name
+
+    def test_round_trip(self):
+        fetched_at = datetime(2024, 5, 1, 12, 30, tzinfo=dt_timezone.utc)
+        content = b"<html><body>jane@acme.test\r\n\r\n\xe9</body></html>"
+        archive = PageArchive(self.path)
+        archive.write(
+            "https://acme.test/team", 200,
+            {'Content-Type': 'text/html; charset=latin-1', 'Content-Encoding': 'gzip', 'ETag': '"v1"'},
+            content, target_url="https://acme.test/", depth=1, fetched_at=fetched_at,
+        )
+        archive.close()
+
+        [page] = read_archive(self.path)
+        self.assertEqual(page.url, "https://acme.test/team")
+        self.assertEqual(page.status, 200)
+        self.assertEqual(page.content, content)
+        self.assertEqual(page.fetched_at, fetched_at)
+        self.assertEqual((page.target_url, page.depth), ("https://acme.test/", 1))
+        self.assertEqual(page.header('etag'), '"v1"')
+        # The stored body is decoded, so its encoding header is dropped
+        self.assertIsNone(page.header('Content-Encoding'))
+
+    def test_records_are_warc_gzip_members(self):
+        archive = PageArchive(self.path)
+        archive.write("https://acme.test/", 200, {}, b"<html></html>", target_url="https://acme.test/")
+        archive.close()
+
+        [segment] = Path(self.path).glob("*.warc.gz")
+        record = gzip.decompress(segment.read_bytes())
+        self.assertTrue(record.startswith(b"WARC/1.1\r\n"))
+        self.assertIn(b"WARC-Type: response\r\n", record)
+        self.assertIn(b"WARC-Target-URI: https://acme.test/\r\n", record)
+        self.assertIn(b"HTTP/1.1 200 OK\r\n", record)
+
+    def test_segments_roll_over_and_reading_filters_by_site(self):
+        archive = PageArchive(self.path, segment_bytes=1)
+        for site in ("https://a.test/", "https://b.test/", "https://a.test/"):
+            archive.write(site + "page", 200, {}, b"<html></html>", target_url=site)
+        archive.close()
+
+        self.assertEqual(len(list(Path(self.path).glob("*.warc.gz"))), 3)
+        self.assertEqual([page.url for page in read_archive(self.path, target_url="https://a.test/")], ["https://a.test/page"] * 2)
+
+    def test_partially_written_index_lines_are_skipped(self):
+        archive = PageArchive(self.path)
+        archive.write("https://acme.test/", 200, {}, b"<html></html>")
+        archive.close()
+        [index] = Path(self.path).glob("*.idx")
+        with open(index, 'a', encoding='utf-8') as handle:
+            handle.write('{"url": "https://acme.test/tr')
+
+        with self.assertLogs('finder.services.page_archive', 'WARNING'):
+            self.assertEqual([page.url for page in read_archive(self.path)], ["https://acme.test/"])
+
+
+class ConditionalRecrawlTests(SimpleTestCase):
+    pages = {
+        '/': ('<html><body><a href="/team">Team</a> sales@acme.test</body></html>', '"home-v1"'),
+        '/team': ('<html><body>jane@acme.test</body></html>', '"team-v1"'),
+    }
+
+    def responses(self, not_modified=False):
+        responses = {}
+        for path, (html, etag) in self.pages.items():
+            if not_modified:
+                responses[path] = (304, {'ETag': etag}, b'')
+            else:
+                responses[path] = (200, {'Content-Type': 'text/html', 'ETag': etag}, html.encode())
+        return responses
+
+    def assert_replayed(self, service_class):
+        with LocalSite(self.responses()) as site:
+            first = crawl(site)
+            # Same port, so the page records match
+            site.pages = self.responses(not_modified=True)
+            scraper = service_class({
+                'target_url': site.url + '/', 'request_delay': 0, 'use_sitemaps': False, 'adaptive_throttling': False,
+            }, previous_pages=first.page_records)
+            scraper.start()
+
+        self.assertEqual(sorted(first.results['emails']), ["jane@acme.test", "sales@acme.test"])
+        self.assertEqual(sorted(scraper.results['emails']), ["jane@acme.test", "sales@acme.test"])
+        # The second crawl asked for changes only
+        revalidations = site.request_headers[-2:]
+        self.assertEqual(sorted(headers.get('If-None-Match') for headers in revalidations), ['"home-v1"', '"team-v1"'])
+        self.assertEqual(scraper.page_records.keys(), first.page_records.keys())
+
+    def test_unchanged_pages_replay_their_contacts(self):
+        self.assert_replayed(WebScrapeService)
+
+    def test_unchanged_pages_replay_their_contacts_async(self):
+        self.assert_replayed(AsyncWebScrapeService)
+
+    def assert_children_without_validators_are_crawled(self, service_class):
+        home = '<html><body><a href="/team">Team</a> sales@acme.test</body></html>'
+        with LocalSite({
+            '/': (200, {'Content-Type': 'text/html', 'ETag': '"home-v1"'}, home.encode()),
+            '/team': '<html><body>jane@acme.test</body></html>',
+        }) as site:
+            first = crawl(site)
+            site.pages['/'] = (304, {'ETag': '"home-v1"'}, b'')
+            site.requests.clear()
+            scraper = service_class({
+                'target_url': site.url + '/', 'request_delay': 0, 'use_sitemaps': False, 'adaptive_throttling': False,
+            }, previous_pages=first.page_records)
+            scraper.start()
+
+        self.assertEqual(len(first.page_records), 1)  # /team has no validators
+        self.assertIn(('GET', '/team'), site.requests)
+        self.assertEqual(sorted(scraper.results['emails']), ["jane@acme.test", "sales@acme.test"])
+        self.assertTrue(scraper.crawl_complete)
+
+    def test_unchanged_pages_still_lead_to_pages_without_validators(self):
+        self.assert_children_without_validators_are_crawled(WebScrapeService)
+
+    def test_unchanged_pages_still_lead_to_pages_without_validators_async(self):
+        self.assert_children_without_validators_are_crawled(AsyncWebScrapeService)
+
+    def test_without_validators_nothing_is_recorded(self):
+        with LocalSite(linked_pages(1)) as site:
+            scraper = crawl(site)
+        self.assertEqual(scraper.page_records, {})
+
+
+class WebScrapeResumeTests(TestCase):
+    def test_resumed_search_skips_finished_and_fetched_sites(self):
+        contact_search = ContactSearch.objects.create(method=ContactSearch.ContactSearchMethods.SCRAPE)
+        WebScrapeParameters.objects.create(contact_search=contact_search, request_delay=0, use_sitemaps=False)
+        company_list = CompanyList.objects.create(name="Prospects")
+
+        with LocalSite(linked_pages(1)) as done, LocalSite(linked_pages(1)) as fetched, LocalSite(linked_pages(1)) as pending:
+            companies = [
+                Company.objects.create(name=name, domain=f"{name}.test", website_url=site.url + '/')
+                for name, site in (("done", done), ("fetched", fetched), ("pending", pending))
+            ]
+            company_list.companies.add(*companies)
+            # Interrupted after the first site was saved and the second crawled
+            SearchCheckpoint.mark_done(contact_search, companies[0], 0)
+            SearchCheckpoint.save_result(contact_search, companies[1], {
+                'emails': {'kept@fetched.test': {'email': 'kept@fetched.test', 'source_url': fetched.url + '/'}},
+                'phones': [],
+            })
+
+            execute_webscrape_search.call_local(contact_search.id, company_list.id)
+
+        self.assertEqual(done.requests, [])
+        self.assertEqual(fetched.requests, [])
+        self.assertIn(('GET', '/p0'), pending.requests)
+        self.assertEqual(
+            sorted(contact_search.contacts.values_list('email', flat=True)),
+            ["kept@fetched.test", "person0@acme.test"],
+        )
+        contact_search.refresh_from_db()
+        self.assertEqual((contact_search.companies_done, contact_search.companies_total), (3, 3))
+        self.assertEqual(
+            set(contact_search.checkpoints.values_list('status', flat=True)), {SearchCheckpoint.CheckpointStatus.DONE}
+        )
+
+
+class WebScrapeSiteFailureTests(TransactionTestCase):
+    # The async engine saves sites from another thread, which must see committed rows
+    def assert_failed_site_is_checkpointed(self, crawl_engine):
+        contact_search = ContactSearch.objects.create(method=ContactSearch.ContactSearchMethods.SCRAPE)
+        WebScrapeParameters.objects.create(
+            contact_search=contact_search, request_delay=0, use_sitemaps=False, crawl_engine=crawl_engine,
+        )
+        company_list = CompanyList.objects.create(name="Prospects")
+        record = SiteCrawl.record
+
+        def record_or_fail(domain, *args):
+            if domain == "broken.test":
+                raise ValueError("Cannot save")
+            return record(domain, *args)
+
+        with LocalSite(linked_pages(1)) as broken, LocalSite(linked_pages(1)) as working:
+            companies = [
+                Company.objects.create(name=name, domain=f"{name}.test", website_url=site.url + '/')
+                for name, site in (("broken", broken), ("working", working))
+            ]
+            company_list.companies.add(*companies)
+            with mock.patch.object(SiteCrawl, 'record', side_effect=record_or_fail), \
+                    self.assertLogs('finder', 'ERROR'):
+                execute_webscrape_search.call_local(contact_search.id, company_list.id)
+
+        checkpoints = dict(contact_search.checkpoints.values_list('company__domain', 'status'))
+        self.assertEqual(checkpoints, {
+            "broken.test": SearchCheckpoint.CheckpointStatus.FAILED,
+            "working.test": SearchCheckpoint.CheckpointStatus.DONE,
+        })
+        contact_search.refresh_from_db()
+        self.assertEqual(contact_search.status, ContactSearch.SearchStatus.COMPLETED)
+        self.assertEqual(contact_search.companies_done, 1)
+
+    def test_failed_site_is_checkpointed(self):
+        self.assert_failed_site_is_checkpointed(WebScrapeParameters.CrawlEngine.THREADED)
+
+    def test_failed_site_is_checkpointed_async(self):
+        self.assert_failed_site_is_checkpointed(WebScrapeParameters.CrawlEngine.ASYNC)
+
+class SearchProgressPollingTests(TestCase):
+    def poll(self, status):
+        contact_search = ContactSearch.objects.create(method=ContactSearch.ContactSearchMethods.SCRAPE, status=status)
+        return self.client.get(
+            reverse('contact_search_detail', args=[contact_search.id]), headers={'HX-Request': 'true'}
+        ).content.decode()
+
+    def test_running_search_replaces_its_progress_card(self):
+        html = self.poll(ContactSearch.SearchStatus.RUNNING)
+        self.assertIn('id="search-progress"', html)
+        self.assertIn('hx-trigger="every 5s"', html)
+        self.assertIn('hx-swap="outerHTML"', html)
+
+    def test_detail_page_includes_the_polling_card(self):
+        contact_search = ContactSearch.objects.create(
+            method=ContactSearch.ContactSearchMethods.SCRAPE, status=ContactSearch.SearchStatus.RUNNING
+        )
+        WebScrapeParameters.objects.create(contact_search=contact_search)
+        html = self.client.get(reverse('contact_search_detail', args=[contact_search.id])).content.decode()
+        self.assertEqual(html.count('id="search-progress"'), 1)
+        self.assertIn('hx-swap="outerHTML"', html)
+
+    def test_finished_search_stops_polling(self):
+        for status in (ContactSearch.SearchStatus.COMPLETED, ContactSearch.SearchStatus.FAILED):
+            html = self.poll(status)
+            self.assertIn('id="search-progress"', html)
+            self.assertNotIn('hx-trigger', html)
+
+class SiteCrawlReuseTests(TestCase):
+    def scrape(self, **params):
+        contact_search = ContactSearch.objects.create(method=ContactSearch.ContactSearchMethods.SCRAPE)
+        search_params = WebScrapeParameters.objects.create(
+            contact_search=contact_search, request_delay=0, use_sitemaps=False, **params
+        )
+        company_list = CompanyList.objects.create(name="Prospects")
+        with LocalSite(linked_pages(1)) as site:
+            company_list.companies.add(Company.objects.create(name="Acme", domain="acme.test", website_url=site.url + '/'))
+            SiteCrawl.objects.create(
+                domain="acme.test", config_key=WebScrapeService.extraction_key(search_params.configuration),
+                crawled_at=timezone.now() - timedelta(hours=1), stop_reason=WebScrapeService.STOP_EXHAUSTED, complete=True,
+            )
+            execute_webscrape_search.call_local(contact_search.id, company_list.id)
+        return site.requests
+
+    def test_recent_crawl_is_reused_by_default(self):
+        self.assertEqual(self.scrape(), [])
+
+    def test_zero_days_always_crawls_again(self):
+        self.assertIn(('GET', '/p0'), self.scrape(recrawl_after_days=0))
+
+    def test_crawl_within_the_given_days_is_reused(self):
+        self.assertEqual(self.scrape(recrawl_after_days=1), [])
+
+    @override_settings(SITE_CRAWL_CACHE_TTL=60)
+    def test_crawl_older_than_the_cache_ttl_is_not_reused_by_default(self):
+        self.assertIn(('GET', '/p0'), self.scrape())
+
+class WebScrapeListBudgetTests(TestCase):
+    def test_reused_sites_give_their_share_of_the_budget_back(self):
+        contact_search = ContactSearch.objects.create(method=ContactSearch.ContactSearchMethods.SCRAPE)
+        search_params = WebScrapeParameters.objects.create(
+            contact_search=contact_search, request_delay=0, use_sitemaps=False, list_page_budget=6,
+            concurrent_requests=1,
+        )
+        company_list = CompanyList.objects.create(name="Prospects")
+
+        with LocalSite(linked_pages(8)) as reused, LocalSite(linked_pages(8)) as crawled:
+            companies = [
+                Company.objects.create(name=name, domain=f"{name}.test", website_url=site.url + '/')
+                for name, site in (("reused", reused), ("crawled", crawled))
+            ]
+            company_list.companies.add(*companies)
+            SiteCrawl.objects.create(
+                domain="reused.test", config_key=WebScrapeService.extraction_key(search_params.configuration),
+                crawled_at=timezone.now(), stop_reason=WebScrapeService.STOP_EXHAUSTED, complete=True,
+            )
+
+            execute_webscrape_search.call_local(contact_search.id, company_list.id)
+
+        self.assertEqual(reused.requests, [])
+        # The reused site's share went to the productive site that was crawled
+        self.assertEqual(len([request for request in crawled.requests if request[1] != '/robots.txt']), 6)
+
+class RateLimiterTests(SimpleTestCase):
+    def timed_acquires(self, limiter, count):
+        started = time.monotonic()
+        for _ in range(count):
+            limiter.acquire()
+        return time.monotonic() - started
+
+    def test_calls_within_the_limit_do_not_wait(self):
+        self.assertLess(self.timed_acquires(RateLimiter([(5, 0.5)]), 5), 0.1)
+
+    def test_calls_over_the_limit_wait_for_the_window(self):
+        self.assertGreaterEqual(self.timed_acquires(RateLimiter([(5, 0.3)]), 6), 0.3)
+
+    def test_every_window_is_respected(self):
+        # The short window allows 10 calls in 0.1s, the long one only 4 in 0.4s
+        self.assertGreaterEqual(self.timed_acquires(RateLimiter([(10, 0.1), (4, 0.4)]), 5), 0.4)
+
+    def test_zero_calls_means_no_limit(self):
+        self.assertLess(self.timed_acquires(RateLimiter([(0, 60)]), 50), 0.1)
+
+    def test_pause_keeps_the_calls_already_made(self):
+        limiter = RateLimiter([(3, 0.6)])
+        self.timed_acquires(limiter, 3)
+        limiter.pause(0.05)
+        # The window is still full of real calls once the pause is over
+        self.assertGreaterEqual(self.timed_acquires(limiter, 3), 0.5)
+
+    def test_shorter_pause_does_not_cut_a_longer_one_short(self):
+        limiter = RateLimiter([(100, 1)])
+        limiter.pause(0.4)
+        limiter.pause(0.05)
+        self.assertGreaterEqual(self.timed_acquires(limiter, 1), 0.35)
+
+    def test_pause_holds_every_thread_back(self):
+        limiter = RateLimiter([(100, 1)])
+        limiter.pause(0.3)
+        started = time.monotonic()
+        finished = []
+
+        def call():
+            limiter.acquire()
+            finished.append(time.monotonic() - started)
+
+        threads = [threading.Thread(target=call) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(finished), 3)
+        self.assertGreaterEqual(min(finished), 0.25)
+
+
+@override_settings(HUNTER_API_KEY='test-key')
+class HunterRetryTests(SimpleTestCase):
+    def test_rate_limited_request_is_retried(self):
+        account = b'{"data": {"requests": {"searches": {"used": 1, "available": 25}}}}'
+        pages = {'/account?api_key=test-key': responses(
+            (429, {'Retry-After': '0'}, b''),
+            (200, {'Content-Type': 'application/json'}, account),
+        )}
+        with LocalSite(pages) as site, mock.patch.object(HunterService, 'BASE_URL', site.url), \
+                self.assertLogs('finder.services.hunter_service', 'WARNING'):
+            info = HunterService().get_account_info()
+        self.assertEqual(info['searches']['available'], 25)
+        self.assertEqual(len(site.requests), 2)
+
+    def test_gives_up_after_max_attempts(self):
+        pages = {'/account?api_key=test-key': (429, {'Retry-After': '0'}, b'')}
+        with LocalSite(pages) as site, mock.patch.object(HunterService, 'BASE_URL', site.url), \
+                mock.patch.object(HunterService, 'MAX_ATTEMPTS', 3), self.assertLogs('finder.services.hunter_service'):
+            with self.assertRaises(requests.HTTPError):
+                HunterService().get_account_info()
+        self.assertEqual(len(site.requests), 3)
+
+
+@override_settings(HUNTER_API_KEY='test-key')
+class HunterPaginationTests(SimpleTestCase):
+    def paginate(self, total, method='domain_search_pages', **kwargs):
+        """Page through a stand-in search with total results, returning the result and each (limit, offset) asked for."""
+        calls = []
+
+        def domain_search(limit, offset, **search_kwargs):
+            calls.append((limit, offset))
+            count = max(0, min(limit, total - offset))
+            emails = [{'value': f"person{offset + i}@acme.test"} for i in range(count)]
+            return {'data': {'domain': search_kwargs['domain'], 'emails': emails}, 'meta': {'results': total}}
+
+        hunter = HunterService()
+        with mock.patch.object(hunter, 'domain_search', side_effect=domain_search):
+            result = getattr(hunter, method)(domain="acme.test", **kwargs)
+            if method == 'domain_search_pages':
+                result = list(result)
+        return result, calls
+
+    def test_stops_after_the_last_page(self):
+        pages, calls = self.paginate(25, limit=10)
+        self.assertEqual(calls, [(10, 0), (10, 10), (10, 20)])
+        self.assertEqual([len(page['data']['emails']) for page in pages], [10, 10, 5])
+
+    def test_stops_at_an_exact_multiple_of_the_page_size(self):
+        _, calls = self.paginate(20, limit=10)
+        self.assertEqual(calls, [(10, 0), (10, 10)])
+
+    def test_stops_on_an_empty_page(self):
+        pages, calls = self.paginate(0, limit=10)
+        self.assertEqual(calls, [(10, 0)])
+        self.assertEqual(pages[0]['data']['emails'], [])
+
+    def test_max_results_shrinks_the_last_page(self):
+        _, calls = self.paginate(100, limit=10, max_results=25)
+        self.assertEqual(calls, [(10, 0), (10, 10), (5, 20)])
+
+    def test_max_credits_limits_requests(self):
+        with self.assertLogs('finder.services.hunter_service', 'INFO') as logs:
+            _, calls = self.paginate(100, limit=10, max_credits=2)
+        self.assertEqual(calls, [(10, 0), (10, 10)])
+        self.assertIn("80 results left", logs.output[0])
+
+    def test_starts_at_the_given_offset(self):
+        _, calls = self.paginate(25, limit=10, offset=15)
+        self.assertEqual(calls, [(10, 15)])
+
+    def test_all_pages_are_combined(self):
+        combined, calls = self.paginate(25, method='domain_search_all', limit=10, max_results=15)
+        self.assertEqual(calls, [(10, 0), (5, 10)])
+        self.assertEqual(combined['data']['domain'], "acme.test")
+        self.assertEqual(
+            [email['value'] for email in combined['data']['emails']],
+            [f"person{i}@acme.test" for i in range(15)],
+        )
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'provider-cache-tests'}},
+    HUNTER_API_KEY='test-key',
+)
+class ProviderCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.provider_cache = ProviderCache('hunter', 60)
+
+    def test_key_ignores_parameter_order(self):
+        self.assertEqual(
+            self.provider_cache.key({'domain': "acme.test", 'limit': 10, 'offset': 0}),
+            self.provider_cache.key({'offset': 0, 'limit': 10, 'domain': "acme.test"}),
+        )
+
+    def test_key_depends_on_parameters_and_provider(self):
+        key = self.provider_cache.key({'domain': "acme.test", 'limit': 10})
+        self.assertTrue(key.startswith("provider:hunter:"))
+        self.assertNotEqual(key, self.provider_cache.key({'domain': "acme.test", 'limit': 20}))
+        self.assertNotEqual(key, self.provider_cache.key({'domain': "other.test", 'limit': 10}))
+        self.assertNotEqual(key, ProviderCache('serpapi', 60).key({'domain': "acme.test", 'limit': 10}))
+
+    def test_repeated_request_is_answered_from_the_cache(self):
+        call = mock.Mock(return_value={'data': {'emails': []}})
+        for _ in range(3):
+            self.assertEqual(self.provider_cache.fetch({'domain': "acme.test"}, call), {'data': {'emails': []}})
+        call.assert_called_once()
+        self.assertEqual(self.provider_cache.stats(), {'hits': 2, 'misses': 1})
+
+        self.provider_cache.reset_stats()
+        self.assertEqual(self.provider_cache.stats(), {'hits': 0, 'misses': 0})
+
+    def test_empty_responses_are_not_cached(self):
+        call = mock.Mock(return_value={})
+        self.provider_cache.fetch({'domain': "acme.test"}, call)
+        self.provider_cache.fetch({'domain': "acme.test"}, call)
+        self.assertEqual(call.call_count, 2)
+
+    def test_without_use_cache_the_request_is_made_and_cached(self):
+        self.provider_cache.set({'domain': "acme.test"}, {'data': "old"})
+        call = mock.Mock(return_value={'data': "new"})
+        self.assertEqual(self.provider_cache.fetch({'domain': "acme.test"}, call, use_cache=False), {'data': "new"})
+        self.assertEqual(self.provider_cache.get({'domain': "acme.test"}), {'data': "new"})
+
+    def test_cache_failures_only_cost_the_saved_call(self):
+        call = mock.Mock(return_value={'data': "fresh"})
+        with mock.patch('finder.services.provider_cache.cache') as broken_cache, \
+                self.assertLogs('finder.services.provider_cache', 'WARNING'):
+            broken_cache.get.side_effect = broken_cache.set.side_effect = ConnectionError("cache is down")
+            self.assertEqual(self.provider_cache.fetch({'domain': "acme.test"}, call), {'data': "fresh"})
+        call.assert_called_once()
+
+    def test_hunter_searches_are_cached_without_the_api_key(self):
+        body = b'{"data": {"domain": "acme.test", "emails": [{"value": "jane@acme.test"}]}, "meta": {"results": 1}}'
+        pages = {'/domain-search?api_key=test-key&limit=10&offset=0&domain=acme.test': (
+            200, {'Content-Type': 'application/json'}, body,
+        )}
+        with LocalSite(pages) as site, mock.patch.object(HunterService, 'BASE_URL', site.url):
+            HunterService().domain_search(domain="acme.test")
+            results = HunterService().domain_search(domain="acme.test")
+            HunterService(use_cache=False).domain_search(domain="acme.test")
+        self.assertEqual(results['data']['emails'][0]['value'], "jane@acme.test")
+        self.assertEqual(len(site.requests), 2)
+        self.assertIsNotNone(cache.get(self.provider_cache.key({'limit': 10, 'offset': 0, 'domain': "acme.test"})))
@@ -19,6 +19,7 @@ from .tasks import (
 from contacts.models import Contact, ContactList
 from companies.models import Company, CompanyList
 from .services import SerpAPIService, HunterService, ZeroBounceService
+from .services.bulk_ingest import link_related
 
 def finder_dashboard(request):
     """Main dashboard view for the finder app showing recent searches and validations"""
@@ -88,7 +89,8 @@ def serpapi_search(request):
                 zoom=form.cleaned_data.get('zoom'),  # Force reasonable default
                 google_domain='google.com',
                 language='en',
-                country='us'
+                country='us',
+                no_cache=form.cleaned_data['no_cache'],
             )
             
             execute_serpapi_search(company_search.id)
@@ -125,7 +127,12 @@ def webscrape_search(request):
                 extract_phone_numbers=form.cleaned_data['extract_phone_numbers'],
                 request_delay=form.cleaned_data['request_delay'],
                 concurrent_requests=form.cleaned_data['concurrent_requests'],
+                global_concurrent_requests=form.cleaned_data['global_concurrent_requests'],
                 request_timeout=30.0,  # Default timeout
+                crawl_engine=form.cleaned_data['crawl_engine'],
+                list_page_budget=form.cleaned_data['list_page_budget'],
+                recrawl_after_days=form.cleaned_data['recrawl_after_days'],
+                force_refresh=form.cleaned_data['force_refresh'],
                 follow_robotstxt=True,  # Always respect robots.txt
                 user_agent="Mozilla/5.0 (compatible; CompanyBot/1.0)",  # Default user agent
             )
@@ -192,6 +199,11 @@ def contact_search_list(request):
 def contact_search_detail(request, search_id):
     """View for showing details of a specific contact search"""
     search = get_object_or_404(ContactSearch, id=search_id)
+    
+    # Return only the progress card when polled by HTMX while the search runs
+    if request.headers.get('HX-Request'):
+        return render(request, 'components/finder/search_progress_card.html', {'search': search})
+    
     contacts = search.contacts.all()
     
     # Get the search parameters based on the method
@@ -243,7 +255,11 @@ def hunter_search(request):
                 departments=departments,
                 required_fields=required_fields,
                 limit=form.cleaned_data['limit'],
-                offset=0  # Start from the first page
+                offset=0,  # Start from the first page
+                paginate=form.cleaned_data['paginate'],
+                max_results=form.cleaned_data.get('max_results'),
+                max_credits=form.cleaned_data.get('max_credits'),
+                no_cache=form.cleaned_data['no_cache'],
             )
             
             # Queue the search task based on the source type
@@ -422,17 +438,8 @@ def add_contacts_to_list(request, search_id):
             messages.error(request, "Selected contact list not found.")
             return redirect('contact_search_detail', list_id=contact_list_id)
         
-        # Get all contacts from the search
-        contacts = search.contacts.all()
-        
-        # Track how many contacts were added
-        added_count = 0
-        
-        # Add each contact to the list if not already present
-        for contact in contacts:
-            if contact not in contact_list.contacts.all():
-                contact_list.contacts.add(contact)
-                added_count += 1
+        # Add each contact from the search to the list if not already present
+        added_count = link_related(contact_list.contacts, search.contacts.all())
         
         if added_count > 0:
             messages.success(request, f"Added {added_count} contacts to '{contact_list.name}'.")
@@ -461,17 +468,8 @@ def add_companies_to_list(request, search_id):
             messages.error(request, "Selected company list not found.")
             return redirect('company_search_detail', search_id=search_id)
         
-        # Get all companies from the search
-        companies = search.companies.all()
-        
-        # Track how many companies were added
-        added_count = 0
-        
-        # Add each company to the list if not already present
-        for company in companies:
-            if company not in company_list.companies.all():
-                company_list.companies.add(company)
-                added_count += 1
+        # Add each company from the search to the list if not already present
+        added_count = link_related(company_list.companies, search.companies.all())
         
         if added_count > 0:
             messages.success(request, f"Added {added_count} companies to '{company_list.name}'.")
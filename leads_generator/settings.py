@@ -135,6 +135,13 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': f"redis://{os.environ.get('REDIS_HOST', 'redis')}:6379/1",
+    }
+}
+
 pool = ConnectionPool(host=os.environ.get('REDIS_HOST', 'redis'), port=6379, max_connections=20)
 HUEY = RedisHuey('leads', connection_pool=pool, immediate=False)
 
@@ -142,3 +149,19 @@ SERPAPI_API_KEY = os.environ.get('SERPAPI_API_KEY')
 HUNTER_API_KEY = os.environ.get('HUNTER_API_KEY')
 ZEROBOUNCE_API_KEY = os.environ.get('ZEROBOUNCE_API_KEY')
 
+# Hunter's documented limits for domain searches, and how many to run at once
+HUNTER_REQUESTS_PER_SECOND = int(os.environ.get('HUNTER_REQUESTS_PER_SECOND', 15))
+HUNTER_REQUESTS_PER_MINUTE = int(os.environ.get('HUNTER_REQUESTS_PER_MINUTE', 500))
+HUNTER_CONCURRENCY = int(os.environ.get('HUNTER_CONCURRENCY', 10))
+
+# How long paid API responses are reused for identical requests
+SERPAPI_CACHE_TTL = int(os.environ.get('SERPAPI_CACHE_TTL', 60 * 60 * 24 * 7))
+HUNTER_CACHE_TTL = int(os.environ.get('HUNTER_CACHE_TTL', 60 * 60 * 24 * 7))
+
+# Web scraping
+ROBOTS_CACHE_TTL = int(os.environ.get('ROBOTS_CACHE_TTL', 60 * 60 * 24))
+SITE_CRAWL_CACHE_TTL = int(os.environ.get('SITE_CRAWL_CACHE_TTL', 60 * 60 * 24))
+# How long a probe that found a website dead keeps it out of web scrapes
+WEBSITE_PROBE_TTL = int(os.environ.get('WEBSITE_PROBE_TTL', 60 * 60 * 24 * 7))
+PAGE_ARCHIVE_DIR = Path(os.environ.get('PAGE_ARCHIVE_DIR', BASE_DIR / 'page_archive'))
+PAGE_ARCHIVE_SEGMENT_BYTES = int(os.environ.get('PAGE_ARCHIVE_SEGMENT_BYTES', 1024 ** 3))
@@ -0,0 +1,94 @@
+import os
+import time
+
+import requests
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.builder import builder_registry
+
+from companies.models import Company
+from finder.models import WebScrapeParameters
+from finder.services import WebScrapeService
+
+CORPUS_DIR = "html_corpus"
+USER_AGENT = "Mozilla/5.0 (compatible; CompanyBot/1.0)"
+
+
+def save_corpus(limit=50, corpus_dir=CORPUS_DIR):
+    """Download the homepages of companies with a website into corpus_dir."""
+    os.makedirs(corpus_dir, exist_ok=True)
+    saved = 0
+
+    for company in Company.objects.exclude(website_url__isnull=True).exclude(website_url='')[:limit]:
+        try:
+            response = requests.get(company.website_url, headers={'User-Agent': USER_AGENT}, timeout=15)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            print(f"Skipping {company.website_url}: {str(e)}")
+            continue
+
+        if 'text/html' not in response.headers.get('Content-Type', '').lower():
+            continue
+
+        with open(os.path.join(corpus_dir, f"{company.id}.html"), "wb") as f:
+            f.write(response.content)
+        saved += 1
+
+    return saved
+
+
+def load_corpus(corpus_dir=CORPUS_DIR):
+    pages = []
+    for name in sorted(os.listdir(corpus_dir)):
+        if name.endswith(".html"):
+            with open(os.path.join(corpus_dir, name), "rb") as f:
+                pages.append(f.read().decode('utf-8', errors='replace'))
+    return pages
+
+
+def pages_per_second(pages, parse, rounds=3):
+    """Best of several rounds, so a cold cache doesn't skew the result."""
+    best = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for html in pages:
+            parse(html)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return len(pages) / best if best else float('inf')
+
+
+def benchmark(pages):
+    scanner = WebScrapeService({'target_url': 'https://example.com'})
+    links_only = SoupStrainer('a', href=True)
+
+    results = [("fast scan", "links", pages_per_second(pages, lambda html: list(scanner.link_pattern.finditer(html))))]
+    for parser in WebScrapeParameters.HTMLParser.values:
+        if builder_registry.lookup(parser) is None:
+            print(f"{parser} is not installed, skipping")
+            continue
+        results.append((parser, "full", pages_per_second(pages, lambda html: BeautifulSoup(html, parser))))
+        results.append((parser, "links", pages_per_second(
+            pages, lambda html: BeautifulSoup(html, parser, parse_only=links_only)
+        )))
+    return results
+
+
+# Usage:
+#   python manage.py runscript benchmark_html_parsers --script-args fetch 50
+#   python manage.py runscript benchmark_html_parsers
+def run(*args):
+    if args and args[0] == "fetch":
+        limit = int(args[1]) if len(args) > 1 else 50
+        saved = save_corpus(limit)
+        print(f"Saved {saved} pages to {CORPUS_DIR}")
+        return
+
+    corpus_dir = args[0] if args else CORPUS_DIR
+    pages = load_corpus(corpus_dir)
+    if not pages:
+        print(f"No pages in {corpus_dir}, run with --script-args fetch first")
+        return
+
+    print(f"Benchmarking {len(pages)} pages ({sum(len(html) for html in pages) // 1024} KB)")
+    for parser, mode, rate in benchmark(pages):
+        print(f"{parser:<12} {mode:<6} {rate:>10.1f} pages/s")